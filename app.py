@@ -1,140 +1,61 @@
 import streamlit as st
 import json
-import os
 import uuid
-from datetime import datetime, timezone
-from io import BytesIO
+from datetime import datetime, timedelta, timezone
 
 import pandas as pd
 import plotly.express as px
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
 # -------------------------------
 # ENGINE IMPORT
 # -------------------------------
 try:
-    from engine import run_biolot, BIOL0T_ENGINE_VERSION
+    from engine import BIOL0T_ENGINE_VERSION
+    from engine import default_uncertainty, run_biolot_montecarlo
+    from engine import sweep_tornado
+    from engine import run_portfolio, get_result_cache
+    from engine import IncrementalPortfolio
 except Exception as e:
     st.error("Hesap motoru (engine) yüklenemedi.")
     st.code(str(e))
     st.stop()
 
 # -------------------------------
-# DEFAULT INPUTS
+# AUDIT LOG (Append-only, segmentli + indeksli)
 # -------------------------------
-DEFAULT_INPUTS = {
-    "electricity_kwh_year": 2500000.0,
-    "natural_gas_m3_year": 180000.0,
-    "area_m2": 20000.0,
-    "carbon_price": 85.5,
-    "grid_factor": 0.43,
-    "gas_factor": 2.0,
-    "delta_t": 2.4,
-    "energy_sensitivity": 0.04,
-    "beta": 0.5,
-    "water_baseline": 12000.0,
-    "water_actual": 8000.0,
-    "pump_kwh_per_m3": 0.4,
-}
+from audit import append_audit_log, append_event_log, get_audit_store, get_audit_writer, start_audit_compaction
+from audit import EXPORT_EXTENSIONS, EXPORT_MIME, available_compressions, export_to_tempfile
+
+start_audit_compaction()
 
 # -------------------------------
-# AUDIT LOG (Append-only)
+# RAPOR (PDF + ETS senaryo yardımcıları)
 # -------------------------------
-AUDIT_LOG_DIR = "audit_logs"
-AUDIT_LOG_FILE = os.path.join(AUDIT_LOG_DIR, "runs.jsonl")
-
-
-def append_audit_log(run_id: str, facility_id: str, inputs: dict, outputs: dict) -> None:
-    os.makedirs(AUDIT_LOG_DIR, exist_ok=True)
-    record = {
-        "run_id": run_id,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "engine_version": str(BIOL0T_ENGINE_VERSION),
-        "facility_id": facility_id,
-        "event_type": "FACILITY_RUN",
-        "inputs": inputs,
-        "summary": {
-            "scope1_ton": outputs.get("carbon", {}).get("scope1_ton"),
-            "scope2_ton": outputs.get("carbon", {}).get("scope2_ton"),
-            "total_ton": outputs.get("carbon", {}).get("total_ton"),
-            "total_saved_eur": outputs.get("total_operational_gain", {}).get("total_saved_eur"),
-        },
-    }
-    with open(AUDIT_LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-
-def append_event_log(event_type: str, payload: dict) -> None:
-    os.makedirs(AUDIT_LOG_DIR, exist_ok=True)
-    record = {
-        "run_id": str(uuid.uuid4()),
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "engine_version": str(BIOL0T_ENGINE_VERSION),
-        "facility_id": payload.get("facility_id"),
-        "event_type": event_type,
-        "payload": payload,
-    }
-    with open(AUDIT_LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-
-def read_audit_log_text() -> str:
-    if not os.path.exists(AUDIT_LOG_FILE):
-        return ""
-    with open(AUDIT_LOG_FILE, "r", encoding="utf-8") as f:
-        return f.read()
-
+from report import ets_disclaimer_text, ets_projection, portfolio_digest, portfolio_pdf_path
 
 # -------------------------------
-# FONT SETUP (Türkçe karakterler için)
+# DEFAULT INPUTS (şema + toplu içe aktarım)
 # -------------------------------
-def setup_fonts():
-    """
-    Repo içinde şu dosyalar olmalı:
-      fonts/DejaVuSans.ttf
-      fonts/DejaVuSans-Bold.ttf
-    """
-    base_font = "Helvetica"
-    bold_font = "Helvetica-Bold"
-
-    try:
-        pdfmetrics.registerFont(TTFont("DejaVuSans", "fonts/DejaVuSans.ttf"))
-        pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", "fonts/DejaVuSans-Bold.ttf"))
-        base_font = "DejaVuSans"
-        bold_font = "DejaVuSans-Bold"
-    except Exception:
-        pass
-
-    return base_font, bold_font
-
+from facilities import (
+    DEFAULT_INPUTS,
+    FACILITY_ID_COLUMN,
+    INPUT_LABELS,
+    INPUT_MIN_VALUES,
+    apply_page_edits,
+    facilities_page_frame,
+    facility_template,
+    parse_facility_table,
+    read_facility_file,
+)
 
 # -------------------------------
-# ETS (Scenario) helpers
+# PERFORMANS İZLEME (BIOLOT_TRACE=1 ile açılır; kapalıyken no-op)
 # -------------------------------
-def ets_projection(mode: str) -> pd.DataFrame:
-    years = [2026, 2027, 2028]
-    if mode == "Conservative":
-        prices = [25, 30, 35]
-    elif mode == "Aggressive":
-        prices = [60, 75, 90]
-    else:  # Base
-        prices = [40, 50, 60]
-    return pd.DataFrame({"Yıl": years, "Fiyat (€/tCO2)": prices})
-
-
-def ets_disclaimer_text() -> str:
-    return (
-        "Bu bölüm **senaryo amaçlıdır**. Resmi ETS/karbon vergisi metodolojisi yürürlüğe girdiğinde "
-        "hesaplama parametreleri ve raporlama formatı **resmi metodolojiye göre güncellenecektir**."
-    )
+from telemetry import ENABLED as TRACE_ENABLED
+from telemetry import KEEP_RERUNS, METRICS_FILE, begin_rerun, breakdown_frame, end_rerun, span
 
+if TRACE_ENABLED:
+    begin_rerun("app", key=st.session_state.setdefault("trace_key", uuid.uuid4().hex))
 
 # -------------------------------
 # QUICK RECOMMENDATION (Explainable demo)
@@ -187,165 +108,41 @@ def render_quick_recommendation(totals: dict) -> None:
 
 
 # -------------------------------
-# PDF BUILDER (STABLE)
+# SESSION STATE
 # -------------------------------
-def build_portfolio_pdf_bytes(portfolio: dict, df: pd.DataFrame, ets_price: float, ets_mode: str) -> bytes:
-    base_font, bold_font = setup_fonts()
-    styles = getSampleStyleSheet()
-    story = []
+if "facilities" not in st.session_state:
+    st.session_state["facilities"] = [{"facility_id": "FAC-001", "inputs": dict(DEFAULT_INPUTS)}]
+if "portfolio_result" not in st.session_state:
+    st.session_state["portfolio_result"] = None
+if "editor_version" not in st.session_state:
+    st.session_state["editor_version"] = 0
+if "portfolio_agg" not in st.session_state:
+    st.session_state["portfolio_agg"] = None
 
-    now_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
-    story.append(Paragraph(f"<font name='{bold_font}'>BIOLOT – Portföy Raporu</font>", styles["Title"]))
-    story.append(Spacer(1, 10))
-    story.append(Paragraph(f"<font name='{base_font}'>Oluşturulma: {now_utc}</font>", styles["Normal"]))
-    story.append(Paragraph(f"<font name='{base_font}'>Motor Versiyonu: {BIOL0T_ENGINE_VERSION}</font>", styles["Normal"]))
-    story.append(Spacer(1, 12))
+def live_portfolio():
+    """Çalıştırılmış portföy varsa artımlı toplayıcıyı döner (yoksa None)."""
+    if st.session_state.get("portfolio_result") is None:
+        return None
+    return st.session_state.get("portfolio_agg")
 
-    totals = portfolio["portfolio_totals"]
 
-    # --- KPI TABLOSU ---
-    kpi_data = [
-        ["Gösterge", "Değer"],
-        ["Toplam Emisyon (tCO2e/yıl)", f"{totals['total_ton']:.2f}"],
-        ["Scope 1 (t/yıl)", f"{totals['scope1_ton']:.2f}"],
-        ["Scope 2 (t/yıl)", f"{totals['scope2_ton']:.2f}"],
-        ["Toplam Enerji Tasarrufu (kWh/yıl)", f"{totals['total_saved_kwh']:.0f}"],
-        ["Toplam Kaçınılan Maliyet (€ / yıl)", f"{totals['total_saved_eur']:.2f}"],
-        ["Toplam Önlenen CO2 (t/yıl)", f"{totals['total_saved_co2_ton']:.3f}"],
-    ]
-
-    t = Table(kpi_data, hAlign="LEFT", colWidths=[240, 250])
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), bold_font),
-        ("FONTNAME", (0, 1), (-1, -1), base_font),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-
-    # --- ETS SECTION ---
-    total_tco2 = float(totals["total_ton"])
-    ets_liability = total_tco2 * float(ets_price)
-    df_proj = ets_projection(ets_mode)
-
-    story.append(Paragraph(
-        f"<font name='{bold_font}'>Karbon Vergisi / ETS Hazırlık Modülü (Senaryo)</font>",
-        styles["Heading2"]
-    ))
-    story.append(Spacer(1, 6))
-
-    ets_table = [
-        ["Gösterge", "Değer"],
-        ["Toplam Emisyon (tCO2e/yıl)", f"{total_tco2:.2f}"],
-        ["Seçili Karbon Fiyatı (€/tCO2)", f"{float(ets_price):.2f}"],
-        ["Tahmini Yükümlülük (€)", f"{ets_liability:.0f}"],
-        ["Senaryo", str(ets_mode)],
-    ]
-    t_ets = Table(ets_table, hAlign="LEFT", colWidths=[240, 250])
-    t_ets.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), bold_font),
-        ("FONTNAME", (0, 1), (-1, -1), base_font),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(t_ets)
-    story.append(Spacer(1, 8))
-
-    proj_table = [["Yıl", "Fiyat (€/tCO2)"]] + df_proj.values.tolist()
-    t_proj = Table(proj_table, hAlign="LEFT", colWidths=[80, 120])
-    t_proj.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), bold_font),
-        ("FONTNAME", (0, 1), (-1, -1), base_font),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(t_proj)
-    story.append(Spacer(1, 6))
-
-    story.append(Paragraph(f"<font name='{base_font}'>{ets_disclaimer_text()}</font>", styles["Normal"]))
-    story.append(Spacer(1, 12))
-
-    # --- TESİS ÖZETİ TABLOSU (SAYFA TAŞMASINI ÖNLEYEN VERSİYON) ---
-    story.append(Paragraph(f"<font name='{bold_font}'>Tesis Özeti (Tablo)</font>", styles["Heading2"]))
-    story.append(Spacer(1, 6))
-
-    if len(df) > 0:
-        df_pdf = df.head(15).copy()
-
-        rename_map = {
-            "tesis_id": "Tesis",
-            "toplam_emisyon_ton": "Top.Emis(t)",
-            "scope1_ton": "S1(t)",
-            "scope2_ton": "S2(t)",
-            "tasarruf_eur": "Tasarr(€)",
-            "tasarruf_kwh": "Tasarr(kWh)",
-        }
-        df_pdf = df_pdf.rename(columns=rename_map)
-
-        keep_cols = ["Tesis", "Top.Emis(t)", "S1(t)", "S2(t)", "Tasarr(€)", "Tasarr(kWh)"]
-        df_pdf = df_pdf[[c for c in keep_cols if c in df_pdf.columns]]
-
-        for c in df_pdf.columns:
-            if c != "Tesis":
-                df_pdf[c] = pd.to_numeric(df_pdf[c], errors="coerce").fillna(0.0)
-
-        if "Top.Emis(t)" in df_pdf.columns:
-            df_pdf["Top.Emis(t)"] = df_pdf["Top.Emis(t)"].map(lambda x: f"{x:,.1f}")
-        if "S1(t)" in df_pdf.columns:
-            df_pdf["S1(t)"] = df_pdf["S1(t)"].map(lambda x: f"{x:,.1f}")
-        if "S2(t)" in df_pdf.columns:
-            df_pdf["S2(t)"] = df_pdf["S2(t)"].map(lambda x: f"{x:,.1f}")
-        if "Tasarr(€)" in df_pdf.columns:
-            df_pdf["Tasarr(€)"] = df_pdf["Tasarr(€)"].map(lambda x: f"{x:,.0f}")
-        if "Tasarr(kWh)" in df_pdf.columns:
-            df_pdf["Tasarr(kWh)"] = df_pdf["Tasarr(kWh)"].map(lambda x: f"{x:,.0f}")
-
-        table_data = [df_pdf.columns.tolist()] + df_pdf.values.tolist()
-        col_widths = [70, 80, 60, 60, 70, 90]
-
-        t2 = Table(table_data, hAlign="LEFT", colWidths=col_widths, repeatRows=1)
-        t2.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONTNAME", (0, 0), (-1, 0), bold_font),
-            ("FONTNAME", (0, 1), (-1, -1), base_font),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("PADDING", (0, 0), (-1, -1), 4),
-            ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-        ]))
-        story.append(t2)
-    else:
-        story.append(Paragraph(f"<font name='{base_font}'>Tablo için veri yok.</font>", styles["Normal"]))
-
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        title="BIOLOT Portföy Raporu",
-        leftMargin=24,
-        rightMargin=24,
-        topMargin=24,
-        bottomMargin=24,
-    )
-    doc.build(story)
-    return buf.getvalue()
+def audit_records(records: list) -> None:
+    """Hesaplanan tesis kayıtlarına run_id verir ve tek grup-commit ile audit log'a yazar."""
+    if not records:
+        return
+    with get_audit_writer().batch():
+        for rec in records:
+            rec["run_id"] = str(uuid.uuid4())
+            append_audit_log(rec["run_id"], facility_id=rec["facility_id"], inputs=rec["inputs"], outputs=rec["outputs"])
 
 
-# -------------------------------
-# SESSION STATE
-# -------------------------------
-if "facilities" not in st.session_state:
-    st.session_state["facilities"] = [{"facility_id": "FAC-001", "inputs": dict(DEFAULT_INPUTS)}]
-if "portfolio_result" not in st.session_state:
-    st.session_state["portfolio_result"] = None
+def add_to_live_portfolio(facilities: list) -> None:
+    """Yeni tesisleri (yalnızca onları hesaplayarak) mevcut portföy sonucuna ekler."""
+    agg = live_portfolio()
+    if agg is not None and facilities:
+        records = [{"facility_id": f["facility_id"], "inputs": f["inputs"]} for f in facilities]
+        audit_records(agg.add_many(records, cache=get_result_cache()))
 
 if "ets_price" not in st.session_state:
     st.session_state["ets_price"] = 50.0
@@ -374,79 +171,99 @@ with col2:
         elif new_facility_id in ids:
             st.warning("Bu tesis ID zaten var. Farklı bir ID yaz.")
         else:
-            st.session_state["facilities"].append({"facility_id": new_facility_id, "inputs": dict(DEFAULT_INPUTS)})
-            st.session_state["portfolio_result"] = None
+            new_fac = {"facility_id": new_facility_id, "inputs": dict(DEFAULT_INPUTS)}
+            st.session_state["facilities"].append(new_fac)
+            add_to_live_portfolio([new_fac])
+            # Editör kimliği anahtar + satır sayısından gelir; satır kayınca eski düzenlemeler yeni satıra uygulanmasın
+            st.session_state["editor_version"] += 1
             st.success(f"{new_facility_id} eklendi.")
 
 remove_options = ["(silme)"] + [f["facility_id"] for f in st.session_state["facilities"]]
 remove_id = st.selectbox("Silmek istediğin tesisi seç", remove_options)
 if st.button("🗑️ Seçili Tesisi Sil", disabled=(remove_id == "(silme)")):
     st.session_state["facilities"] = [f for f in st.session_state["facilities"] if f["facility_id"] != remove_id]
-    st.session_state["portfolio_result"] = None
+    agg = live_portfolio()
+    if agg is not None and remove_id in agg:
+        agg.remove(remove_id)
+    if not st.session_state["facilities"]:
+        st.session_state["portfolio_result"] = None
+    st.session_state["editor_version"] += 1
     st.success(f"{remove_id} silindi.")
 
+st.divider()
+st.subheader("Toplu İçe Aktarım (CSV / Parquet)")
+
+imp1, imp2 = st.columns([3, 1])
+with imp1:
+    upload = st.file_uploader("Tesis dosyası", type=["csv", "parquet"], key="facility_upload")
+with imp2:
+    import_mode = st.radio("Mod", ["Ekle", "Değiştir"], horizontal=True, key="facility_import_mode")
+    st.download_button(
+        "📄 Şablon CSV",
+        data=facility_template().to_csv(index=False).encode("utf-8"),
+        file_name="biolot_tesis_sablon.csv",
+        mime="text/csv",
+        use_container_width=True,
+    )
+
+if st.button("📥 İçe Aktar", disabled=upload is None):
+    try:
+        table = read_facility_file(upload, name=upload.name)
+    except Exception as e:
+        st.error(f"Dosya okunamadı: {e}")
+    else:
+        existing = [] if import_mode == "Değiştir" else [f["facility_id"] for f in st.session_state["facilities"]]
+        imported, errors, warnings = parse_facility_table(table, existing_ids=existing)
+        for w in warnings:
+            st.warning(w)
+        if errors:
+            st.error("Geçersiz satırlar içe aktarılmadı:\n\n" + "\n".join(f"- {e}" for e in errors))
+        if imported:
+            if import_mode == "Değiştir":
+                st.session_state["facilities"] = imported
+                st.session_state["portfolio_result"] = None
+            else:
+                st.session_state["facilities"].extend(imported)
+                add_to_live_portfolio(imported)
+            st.session_state["editor_version"] += 1
+            st.success(f"{len(imported)} tesis içe aktarıldı.")
+
 st.divider()
 st.subheader("Tesis Girdileri")
 
 if len(st.session_state["facilities"]) == 0:
-    st.warning("Hiç tesis yok. Üstten 'Tesis Ekle' ile en az 1 tesis ekle.")
+    st.warning("Hiç tesis yok. Üstten 'Tesis Ekle' ya da toplu içe aktarım ile en az 1 tesis ekle.")
 else:
-    for idx, fac in enumerate(st.session_state["facilities"]):
-        fid = fac["facility_id"]
-        inp = fac["inputs"]
-
-        with st.expander(f"🏭 {fid} – Girdileri Düzenle", expanded=(idx == 0)):
-            a, b, c = st.columns(3)
-
-            with a:
-                inp["electricity_kwh_year"] = st.number_input(
-                    "Yıllık Elektrik (kWh)", min_value=0.0, value=float(inp["electricity_kwh_year"]), key=f"{fid}_el"
-                )
-                inp["natural_gas_m3_year"] = st.number_input(
-                    "Yıllık Doğalgaz (m³)", min_value=0.0, value=float(inp["natural_gas_m3_year"]), key=f"{fid}_gas"
-                )
-                inp["area_m2"] = st.number_input(
-                    "Toplam Alan (m²)", min_value=1.0, value=float(inp["area_m2"]), key=f"{fid}_area"
-                )
-
-            with b:
-                inp["carbon_price"] = st.number_input(
-                    "Karbon Fiyatı (€/ton)", min_value=0.0, value=float(inp["carbon_price"]), key=f"{fid}_cp"
-                )
-                inp["grid_factor"] = st.number_input(
-                    "Elektrik Emisyon Faktörü (kgCO2/kWh)", min_value=0.0, value=float(inp["grid_factor"]), key=f"{fid}_gf"
-                )
-                inp["gas_factor"] = st.number_input(
-                    "Gaz Emisyon Faktörü (kgCO2/m³)", min_value=0.0, value=float(inp["gas_factor"]), key=f"{fid}_gaf"
-                )
-
-            with c:
-                inp["delta_t"] = st.number_input(
-                    "Mikroklima Etkisi (°C)", min_value=0.0, value=float(inp["delta_t"]), key=f"{fid}_dt"
-                )
-                inp["energy_sensitivity"] = st.number_input(
-                    "1°C Başına Enerji Azalış Oranı", min_value=0.0, value=float(inp["energy_sensitivity"]), key=f"{fid}_es"
-                )
-                inp["beta"] = st.number_input(
-                    "Bina Elastikiyet Katsayısı", min_value=0.0, value=float(inp["beta"]), key=f"{fid}_beta"
-                )
-
-            st.markdown("**Su / Pompa**")
-            w1, w2, w3 = st.columns(3)
-            with w1:
-                inp["water_baseline"] = st.number_input(
-                    "Referans Su (m³/yıl)", min_value=0.0, value=float(inp["water_baseline"]), key=f"{fid}_wb"
-                )
-            with w2:
-                inp["water_actual"] = st.number_input(
-                    "Mevcut Su (m³/yıl)", min_value=0.0, value=float(inp["water_actual"]), key=f"{fid}_wa"
-                )
-            with w3:
-                inp["pump_kwh_per_m3"] = st.number_input(
-                    "Pompa Enerji İndeksi (kWh/m³)", min_value=0.0, value=float(inp["pump_kwh_per_m3"]), key=f"{fid}_pk"
-                )
-
-            fac["inputs"] = inp
+    # Yalnızca aktif sayfa render edilir; rerun maliyeti portföy boyutundan bağımsız
+    n_fac = len(st.session_state["facilities"])
+    pg1, pg2, pg3 = st.columns([1, 1, 2])
+    with pg1:
+        page_size = st.selectbox("Sayfa boyutu", [25, 50, 100], key="editor_page_size")
+    n_pages = max(1, -(-n_fac // page_size))
+    with pg2:
+        page = int(st.number_input("Sayfa", min_value=1, max_value=n_pages, value=1, step=1, key="editor_page"))
+    start = (min(page, n_pages) - 1) * page_size
+    stop = min(start + page_size, n_fac)
+    with pg3:
+        st.caption(f"{n_fac} tesis • {start + 1}–{stop} gösteriliyor • sayfa {min(page, n_pages)}/{n_pages}")
+
+    page_df = facilities_page_frame(st.session_state["facilities"], start, stop)
+    column_config = {FACILITY_ID_COLUMN: st.column_config.TextColumn("Tesis ID", disabled=True)}
+    for c, label in INPUT_LABELS.items():
+        column_config[c] = st.column_config.NumberColumn(label, min_value=INPUT_MIN_VALUES[c], required=True)
+
+    edited_df = st.data_editor(
+        page_df,
+        column_config=column_config,
+        hide_index=True,
+        num_rows="fixed",
+        use_container_width=True,
+        key=f"facility_editor_{st.session_state['editor_version']}_{page_size}_{start}",
+    )
+    agg = live_portfolio()
+    for fac in apply_page_edits(st.session_state["facilities"], start, page_df, edited_df):
+        if agg is not None:
+            agg.mark_dirty(fac["facility_id"], fac["inputs"])
 
 st.divider()
 st.subheader("Portföy Analizi")
@@ -458,6 +275,26 @@ if run_all:
         st.error("Çalıştırmak için en az 1 tesis eklemelisin.")
         st.stop()
 
+    progress = st.progress(0.0, text="Tesisler hesaplanıyor...")
+
+    def _on_progress(done: int, total: int, partial: dict) -> None:
+        progress.progress(
+            done / total,
+            text=f"{done}/{total} tesis • Emisyon: {partial['total_ton']:,.0f} t • Tasarruf: {partial['total_saved_eur']:,.0f} €",
+        )
+
+    # Rerun (yeni etkileşim) on_progress içinde istisna fırlatır; runner bekleyen parçaları iptal eder
+    # Girdisi değişmemiş tesisler süreç genelindeki LRU önbellekten gelir
+    cache = get_result_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+    with span("engine.run_portfolio"):
+        result = run_portfolio(st.session_state["facilities"], on_progress=_on_progress, cache=cache)
+    progress.empty()
+    st.caption(
+        f"Önbellek: {cache.hits - hits_before} isabet • {cache.misses - misses_before} yeniden hesaplandı "
+        f"• {len(cache)} kayıt"
+    )
+
     portfolio = {
         "meta": {
             "portfolio_id": "BIOLOT-PORTFOLIO",
@@ -465,41 +302,36 @@ if run_all:
             "generated_at": datetime.now(timezone.utc).isoformat(),
             "facility_count": len(st.session_state["facilities"]),
         },
-        "facilities": [],
-        "portfolio_totals": {
-            "scope1_ton": 0.0,
-            "scope2_ton": 0.0,
-            "total_ton": 0.0,
-            "total_saved_kwh": 0.0,
-            "total_saved_co2_ton": 0.0,
-            "total_saved_eur": 0.0,
-        },
+        "facilities": result["facilities"],
+        "portfolio_totals": result["portfolio_totals"],
     }
 
-    for fac in st.session_state["facilities"]:
-        fid = fac["facility_id"]
-        inp = fac["inputs"]
-
-        out = run_biolot(**inp)
-
-        run_id = str(uuid.uuid4())
-        append_audit_log(run_id, facility_id=fid, inputs=inp, outputs=out)
-
-        portfolio["facilities"].append({"facility_id": fid, "run_id": run_id, "inputs": inp, "outputs": out})
-
-        c = out.get("carbon", {})
-        t = out.get("total_operational_gain", {})
-
-        portfolio["portfolio_totals"]["scope1_ton"] += float(c.get("scope1_ton", 0.0))
-        portfolio["portfolio_totals"]["scope2_ton"] += float(c.get("scope2_ton", 0.0))
-        portfolio["portfolio_totals"]["total_ton"] += float(c.get("total_ton", 0.0))
-        portfolio["portfolio_totals"]["total_saved_kwh"] += float(t.get("total_saved_kwh", 0.0))
-        portfolio["portfolio_totals"]["total_saved_co2_ton"] += float(t.get("total_saved_co2_ton", 0.0))
-        portfolio["portfolio_totals"]["total_saved_eur"] += float(t.get("total_saved_eur", 0.0))
+    # Tüm tesis kayıtları tek grup-commit ile yazılır
+    audit_records(portfolio["facilities"])
 
     st.session_state["portfolio_result"] = portfolio
+    st.session_state["portfolio_agg"] = IncrementalPortfolio.from_records(portfolio["facilities"])
+    st.session_state["portfolio_revision"] = st.session_state["portfolio_agg"].revision
+    st.session_state["portfolio_hash"] = portfolio_digest(portfolio)
     st.success("Portföy analizi tamamlandı.")
 
+# -------------------------------
+# ARTIMLI PORTFÖY (yalnızca değişen tesisler yeniden hesaplanır)
+# -------------------------------
+agg = live_portfolio()
+if agg is not None:
+    with span("engine.refresh"):
+        changed = agg.refresh(cache=get_result_cache())
+    audit_records(changed)
+    if agg.revision != st.session_state.get("portfolio_revision"):
+        live = st.session_state["portfolio_result"]
+        live["facilities"] = list(agg.records.values())
+        live["portfolio_totals"] = agg.totals()
+        live["meta"]["facility_count"] = len(agg)
+        live["meta"]["generated_at"] = datetime.now(timezone.utc).isoformat()
+        st.session_state["portfolio_revision"] = agg.revision
+        st.session_state["portfolio_hash"] = None
+
 portfolio = st.session_state.get("portfolio_result")
 
 if portfolio:
@@ -574,22 +406,19 @@ if portfolio:
     # -------------------------------
     # Facility table + charts
     # -------------------------------
-    rows = []
-    for f in portfolio["facilities"]:
-        fid = f["facility_id"]
-        out = f["outputs"]
-        carbon = out.get("carbon", {})
-        gain = out.get("total_operational_gain", {})
-        rows.append({
-            "tesis_id": fid,
-            "toplam_emisyon_ton": float(carbon.get("total_ton", 0.0)),
-            "scope1_ton": float(carbon.get("scope1_ton", 0.0)),
-            "scope2_ton": float(carbon.get("scope2_ton", 0.0)),
-            "tasarruf_eur": float(gain.get("total_saved_eur", 0.0)),
-            "tasarruf_kwh": float(gain.get("total_saved_kwh", 0.0)),
-        })
-
-    df = pd.DataFrame(rows).sort_values("toplam_emisyon_ton", ascending=False)
+    # Tablo artımlı toplayıcının kolon dizilerinden gelir (tesis başına döngü yok)
+    with span("frame.build"):
+        df = (
+            st.session_state["portfolio_agg"].frame()
+            .rename(columns={
+                "facility_id": "tesis_id",
+                "total_ton": "toplam_emisyon_ton",
+                "total_saved_eur": "tasarruf_eur",
+                "total_saved_kwh": "tasarruf_kwh",
+            })
+            [["tesis_id", "toplam_emisyon_ton", "scope1_ton", "scope2_ton", "tasarruf_eur", "tasarruf_kwh"]]
+            .sort_values("toplam_emisyon_ton", ascending=False)
+        )
 
     st.divider()
     st.subheader("Tesis Tablosu")
@@ -599,25 +428,108 @@ if portfolio:
     st.subheader("Grafikler")
 
     df_chart = df.set_index("tesis_id")
-    st.bar_chart(df_chart[["scope1_ton", "scope2_ton", "toplam_emisyon_ton"]], use_container_width=True)
-    st.bar_chart(df_chart[["tasarruf_eur"]], use_container_width=True)
-    st.bar_chart(df_chart[["tasarruf_kwh"]], use_container_width=True)
+    with span("chart.emissions"):
+        st.bar_chart(df_chart[["scope1_ton", "scope2_ton", "toplam_emisyon_ton"]], use_container_width=True)
+    with span("chart.saved_eur"):
+        st.bar_chart(df_chart[["tasarruf_eur"]], use_container_width=True)
+    with span("chart.saved_kwh"):
+        st.bar_chart(df_chart[["tasarruf_kwh"]], use_container_width=True)
+
+    # -------------------------------
+    # Monte Carlo uncertainty (P10/P50/P90)
+    # -------------------------------
+    st.divider()
+    st.subheader("Belirsizlik Analizi (Monte Carlo)")
+    st.caption("Mikroklima etkisi, enerji duyarlılığı ve bina katsayısı için üçgen dağılım varsayılır.")
+
+    mc1, mc2, mc3 = st.columns(3)
+    with mc1:
+        mc_fid = st.selectbox("Tesis", [f["facility_id"] for f in portfolio["facilities"]], key="mc_fid")
+    with mc2:
+        mc_rel = st.slider("Belirsizlik (±%)", min_value=5, max_value=75, value=25, step=5, key="mc_rel")
+    with mc3:
+        mc_n = st.selectbox("Örnek sayısı", [100_000, 250_000, 1_000_000], index=0, key="mc_n")
+
+    if st.button("🎲 Monte Carlo Çalıştır", use_container_width=True):
+        mc_inp = next(f["inputs"] for f in portfolio["facilities"] if f["facility_id"] == mc_fid)
+        mc = run_biolot_montecarlo(
+            mc_inp,
+            uncertainty=default_uncertainty(mc_inp, rel=mc_rel / 100.0),
+            n_samples=mc_n,
+            seed=0,
+        )
+        mc_labels = {
+            "total_saved_kwh": "Tasarruf (kWh/yıl)",
+            "total_saved_co2_ton": "Önlenen CO2 (t/yıl)",
+            "total_saved_eur": "Kaçınılan Maliyet (€/yıl)",
+        }
+        st.dataframe(
+            pd.DataFrame([
+                {"Gösterge": mc_labels[m], "P10": v["p10"], "P50": v["p50"], "P90": v["p90"], "Ortalama": v["mean"]}
+                for m, v in mc["metrics"].items()
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    # -------------------------------
+    # Sensitivity (tornado)
+    # -------------------------------
+    st.divider()
+    st.subheader("Duyarlılık Analizi (Tornado)")
+
+    tr1, tr2 = st.columns(2)
+    with tr1:
+        tornado_metric = st.selectbox(
+            "Gösterge",
+            ["total_saved_eur", "total_saved_kwh", "total_saved_co2_ton", "total_ton", "risk_eur"],
+            key="tornado_metric",
+        )
+    with tr2:
+        tornado_rel = st.slider("Parametre oynatma (±%)", min_value=5, max_value=50, value=20, step=5, key="tornado_rel")
+
+    tornado = sweep_tornado(
+        [f["inputs"] for f in portfolio["facilities"]],
+        rel=tornado_rel / 100.0,
+        metric=tornado_metric,
+    )
+    df_tornado = pd.DataFrame(tornado)
+    fig_t = px.bar(
+        df_tornado.melt(id_vars="parameter", value_vars=["delta_low", "delta_high"], var_name="yön", value_name="fark"),
+        x="fark",
+        y="parameter",
+        color="yön",
+        orientation="h",
+        barmode="overlay",
+    )
+    fig_t.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), yaxis=dict(autorange="reversed"))
+    st.plotly_chart(fig_t, use_container_width=True)
 
     st.divider()
     st.subheader("PDF Export (Yatırımcı Raporu)")
 
-    pdf_bytes = build_portfolio_pdf_bytes(
-        portfolio,
-        df,
+    # PDF yalnızca indirme tıklanınca, tüm tesislerle sayfa sayfa diske yazılır;
+    # aynı portföy + ETS ayarı için disk önbelleğindeki dosya döner
+    pdf_args = dict(
+        portfolio=portfolio,
+        df=df,
         ets_price=float(st.session_state["ets_price"]),
         ets_mode=str(st.session_state["ets_mode"]),
+        portfolio_hash=st.session_state.get("portfolio_hash"),
     )
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    def _open_pdf():
+        # İndirme tıklamasında çalışır; rerun dışında tek başına kaydedilir
+        with span("report.pdf_build"), open(portfolio_pdf_path(**pdf_args), "rb") as f:
+            return f.read()
+
     st.download_button(
         "⬇️ PDF Raporunu İndir",
-        data=pdf_bytes,
+        data=_open_pdf,
         file_name=f"biolot_portfoy_raporu_v{BIOL0T_ENGINE_VERSION}_{ts}.pdf",
         mime="application/pdf",
+        on_click="ignore",
         use_container_width=True,
     )
 
@@ -625,7 +537,8 @@ if portfolio:
     st.subheader("Denetlenebilir Çıktılar")
 
     with st.expander("Portföy JSON (indirilebilir)"):
-        json_text = json.dumps(portfolio, ensure_ascii=False, indent=2, sort_keys=True)
+        with span("json.dumps_portfolio"):
+            json_text = json.dumps(portfolio, ensure_ascii=False, indent=2, sort_keys=True)
         st.download_button(
             "⬇️ Portföy JSON'u indir",
             data=json_text.encode("utf-8"),
@@ -638,16 +551,70 @@ if portfolio:
     st.divider()
     st.subheader("Audit Log")
 
-    log_text = read_audit_log_text()
-    if log_text:
+    audit_store = get_audit_store()
+    with span("audit.count"):
+        log_count = audit_store.count()
+    if log_count:
+        st.caption(f"Toplam kayıt: {log_count}")
+        with st.expander("Son kayıtlar"):
+            with span("audit.find"):
+                recent = audit_store.find(limit=20, descending=True)
+            st.dataframe(
+                pd.DataFrame([
+                    {k: r.get(k) for k in ("generated_at", "event_type", "facility_id", "run_id")}
+                    for r in recent
+                ]),
+                use_container_width=True,
+                hide_index=True,
+            )
+        with st.expander("Yazıcı metrikleri"):
+            st.json(get_audit_writer().metrics())
+
+        # Dışa aktarım yalnızca indirme tıklanınca, parça parça sıkıştırılarak üretilir
+        e1, e2, e3 = st.columns(3)
+        with e1:
+            exp_range = st.date_input("Tarih aralığı (boş: tümü)", value=[], key="audit_exp_range")
+        with e2:
+            exp_fid = st.selectbox(
+                "Tesis",
+                ["(tümü)", "PORTFOLIO"] + [f["facility_id"] for f in portfolio["facilities"]],
+                key="audit_exp_fid",
+            )
+        with e3:
+            exp_comp = st.selectbox("Sıkıştırma", available_compressions(), key="audit_exp_comp")
+
+        exp_filters = {"compression": exp_comp}
+        if exp_fid != "(tümü)":
+            exp_filters["facility_id"] = exp_fid
+        if len(exp_range) == 2:
+            d0, d1 = exp_range
+            exp_filters["since"] = datetime(d0.year, d0.month, d0.day, tzinfo=timezone.utc)
+            exp_filters["until"] = datetime(d1.year, d1.month, d1.day, tzinfo=timezone.utc) + timedelta(days=1)
+
         st.download_button(
-            "⬇️ Audit log dosyasını indir (runs.jsonl)",
-            data=log_text.encode("utf-8"),
-            file_name="runs.jsonl",
-            mime="application/jsonl",
+            "⬇️ Audit log dosyasını indir",
+            data=lambda: export_to_tempfile(audit_store, **exp_filters),
+            file_name=f"runs{EXPORT_EXTENSIONS[exp_comp]}",
+            mime=EXPORT_MIME[exp_comp],
+            on_click="ignore",
             use_container_width=True,
         )
     else:
         st.info("Henüz audit log yok. Portföy çalıştırınca oluşur.")
 else:
     st.info("Üstten tesis ekleyip girdileri düzenledikten sonra 'Tüm Tesisleri Çalıştır' butonuna bas.")
+
+# -------------------------------
+# PERFORMANS PANELİ (yalnızca BIOLOT_TRACE açıkken)
+# -------------------------------
+if TRACE_ENABLED:
+    end_rerun()
+    with st.sidebar.expander("⏱️ Rerun süreleri"):
+        trace_n = st.slider("Son rerun sayısı", 1, max(KEEP_RERUNS, 2), min(10, KEEP_RERUNS), key="trace_n")
+        trace_df = breakdown_frame(trace_n)
+        if trace_df.empty:
+            st.caption("Henüz kayıt yok.")
+        else:
+            # Kolonlar: toplam + span başına ms (aynı span birden çok kez çağrıldıysa toplamı)
+            st.dataframe(trace_df.iloc[::-1], use_container_width=True, hide_index=True)
+        st.caption(f"Kayıt dosyası: {METRICS_FILE}")
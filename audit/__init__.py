@@ -0,0 +1,25 @@
+# audit package
+
+from audit.store import AuditLogStore
+from audit.compaction import AuditCompactor, compact_closed_segments, read_compacted
+from audit.writer import BufferedAuditWriter
+from audit.export import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MIME,
+    available_compressions,
+    export_to_file,
+    export_to_tempfile,
+    iter_export_chunks,
+)
+from audit.log import (
+    AUDIT_LOG_DIR,
+    AUDIT_PARQUET_DIR,
+    append_audit_log,
+    append_event_log,
+    event_record,
+    facility_run_record,
+    get_audit_store,
+    get_audit_writer,
+    read_audit_log_text,
+    start_audit_compaction,
+)
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from engine.batch import ENGINE_INPUT_COLUMNS
+
+SUMMARY_COLUMNS = ("scope1_ton", "scope2_ton", "total_ton", "total_saved_eur")
+MANIFEST_FILE = "_compacted.json"
+
+COMPACT_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("generated_at", pa.timestamp("us", tz="UTC")),
+        ("engine_version", pa.string()),
+        ("facility_id", pa.string()),
+        ("event_type", pa.string()),
+    ]
+    + [(f"inputs_{c}", pa.float64()) for c in ENGINE_INPUT_COLUMNS]
+    + [(f"summary_{c}", pa.float64()) for c in SUMMARY_COLUMNS]
+    + [
+        ("payload", pa.string()),
+        ("date", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("event_type", pa.string())]), flavor="hive"
+)
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _flatten(record):
+    inputs = record.get("inputs") or {}
+    summary = record.get("summary") or {}
+    row = {
+        "run_id": record.get("run_id"),
+        "generated_at": record.get("generated_at"),
+        "engine_version": record.get("engine_version"),
+        "facility_id": record.get("facility_id"),
+        "event_type": record.get("event_type") or "UNKNOWN",
+        "payload": json.dumps(record["payload"], ensure_ascii=False) if "payload" in record else None,
+    }
+    for c in ENGINE_INPUT_COLUMNS:
+        row[f"inputs_{c}"] = _num(inputs.get(c))
+    for c in SUMMARY_COLUMNS:
+        row[f"summary_{c}"] = _num(summary.get(c))
+    return row
+
+
+def _to_table(rows):
+    df = pd.DataFrame(rows)
+    df["generated_at"] = pd.to_datetime(df["generated_at"], utc=True, format="ISO8601", errors="coerce")
+    df["date"] = df["generated_at"].dt.strftime("%Y-%m-%d").fillna("unknown")
+    return pa.Table.from_pandas(df, schema=COMPACT_SCHEMA, preserve_index=False)
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(out_dir, names):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sorted(names), f)
+    os.replace(tmp, path)
+
+
+def compact_segment(segment_path, segment_name, out_dir, batch_rows=50_000):
+    """Tek bir JSONL segmentini tarih / event_type bölümlü Parquet dosyalarına yazar."""
+    stem = segment_name.rsplit(".", 1)[0]
+
+    def flush(rows, batch_no):
+        ds.write_dataset(
+            _to_table(rows),
+            out_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"{stem}-b{batch_no:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    rows, batch_no, n = [], 0, 0
+    with open(segment_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(_flatten(json.loads(line)))
+            except ValueError:
+                continue
+            if len(rows) >= batch_rows:
+                flush(rows, batch_no)
+                n += len(rows)
+                rows, batch_no = [], batch_no + 1
+    if rows:
+        flush(rows, batch_no)
+        n += len(rows)
+    return n
+
+
+def compact_closed_segments(store, out_dir):
+    """
+    Kapalı ve henüz dönüştürülmemiş segmentleri Parquet'e çevirir.
+    Yeniden çalıştırmak güvenlidir: dosya adları segment + parti numarasından
+    türetilir, yarıda kalan bir segment baştan yazılır.
+    Döner: bu turda dönüştürülen segment adları.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done = set(_read_manifest(out_dir))
+    compacted = []
+    for seg in store.segments():
+        if not seg["closed"] or seg["name"] in done or not os.path.exists(seg["path"]):
+            continue
+        compact_segment(seg["path"], seg["name"], out_dir)
+        done.add(seg["name"])
+        _write_manifest(out_dir, done)
+        compacted.append(seg["name"])
+    return compacted
+
+
+class AuditCompactor:
+    """Kapalı segmentleri periyodik olarak Parquet'e çeviren arka plan işi."""
+
+    def __init__(self, store, out_dir, interval_s=300.0):
+        self.store = store
+        self.out_dir = out_dir
+        self.interval_s = float(interval_s)
+        self.last_error = None
+        self.compacted = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-compactor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def run_once(self):
+        try:
+            names = compact_closed_segments(self.store, self.out_dir)
+            self.compacted.extend(names)
+            self.last_error = None
+            return names
+        except Exception as e:
+            self.last_error = str(e)
+            return []
+
+    def _run(self):
+        while True:
+            self.run_once()
+            if self._stop.wait(self.interval_s):
+                return
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+
+
+def read_compacted(out_dir, columns=None, facility_id=None, event_type=None, since=None, until=None):
+    """
+    Parquet arşivinden yalnızca istenen kolonları okur. Tarih ve event_type
+    filtreleri bölüm budamasıyla, facility_id satır grubu istatistikleriyle
+    uygulanır. `since`/`until`: datetime ya da ISO metin (until hariç).
+    """
+    if not os.path.isdir(out_dir):
+        return pd.DataFrame(columns=list(columns) if columns else COMPACT_SCHEMA.names)
+    dataset = ds.dataset(out_dir, format="parquet", schema=COMPACT_SCHEMA, partitioning=PARTITIONING,
+                         exclude_invalid_files=True)
+
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    if event_type is not None:
+        _and(ds.field("event_type") == event_type)
+    if facility_id is not None:
+        _and(ds.field("facility_id") == facility_id)
+    if since is not None:
+        ts = pd.Timestamp(since)
+        ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+        _and(ds.field("date") >= ts.strftime("%Y-%m-%d"))
+        _and(ds.field("generated_at") >= pa.scalar(ts.to_pydatetime(), pa.timestamp("us", tz="UTC")))
+    if until is not None:
+        ts = pd.Timestamp(until)
+        ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+        _and(ds.field("date") <= ts.strftime("%Y-%m-%d"))
+        _and(ds.field("generated_at") < pa.scalar(ts.to_pydatetime(), pa.timestamp("us", tz="UTC")))
+
+    return dataset.to_table(columns=list(columns) if columns else None, filter=expr).to_pandas()
@@ -0,0 +1,114 @@
+import gzip
+import io
+import tempfile
+
+try:
+    import zstandard
+except ImportError:  # opsiyonel bağımlılık
+    zstandard = None
+
+EXPORT_COMPRESSIONS = ("gzip", "zstd", "none")
+EXPORT_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "none": ".jsonl"}
+EXPORT_MIME = {"gzip": "application/gzip", "zstd": "application/zstd", "none": "application/jsonl"}
+
+
+def available_compressions():
+    return [c for c in EXPORT_COMPRESSIONS if c != "zstd" or zstandard is not None]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Sıkıştırıcının çıktısını toplayıp parça parça teslim eden yazılabilir akış."""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        out, self.parts = b"".join(self.parts), []
+        return out
+
+
+def _iter_source(store, facility_id, event_type, since, until, chunk_bytes):
+    if facility_id is None and event_type is None and since is None and until is None:
+        # Filtre yok: segment dosyaları olduğu gibi, sabit boyutlu parçalarla
+        for seg in store.segments():
+            try:
+                f = open(seg["path"], "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                while True:
+                    block = f.read(chunk_bytes)
+                    if not block:
+                        break
+                    yield block
+        return
+    locations = store.iter_locations(facility_id, event_type, since, until)
+    buf, size = [], 0
+    for line in store.iter_raw(locations):
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def iter_export_chunks(store, facility_id=None, event_type=None, since=None, until=None,
+                       compression="gzip", chunk_bytes=1 << 20):
+    """
+    Audit log'u (isteğe bağlı tarih / tesis / olay filtresiyle) sıkıştırılmış
+    parçalar halinde üretir. Bellekte en fazla bir kaynak parçası ve
+    sıkıştırıcı tamponu tutulur.
+    """
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Geçersiz sıkıştırma: {compression} ({', '.join(EXPORT_COMPRESSIONS)})")
+    source = _iter_source(store, facility_id, event_type, since, until, chunk_bytes)
+
+    if compression == "none":
+        yield from source
+        return
+
+    sink = _ChunkSink()
+    if compression == "gzip":
+        comp = gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=6, mtime=0)
+    else:
+        if zstandard is None:
+            raise RuntimeError("zstd sıkıştırma için 'zstandard' paketi kurulu değil.")
+        comp = zstandard.ZstdCompressor(level=3).stream_writer(sink, closefd=False)
+    for block in source:
+        comp.write(block)
+        out = sink.drain()
+        if out:
+            yield out
+    comp.close()
+    out = sink.drain()
+    if out:
+        yield out
+
+
+def export_to_file(fileobj, store, **filters):
+    """Dışa aktarımı açık bir ikili dosyaya akıtır; yazılan bayt sayısını döner."""
+    n = 0
+    for chunk in iter_export_chunks(store, **filters):
+        fileobj.write(chunk)
+        n += len(chunk)
+    return n
+
+
+def export_to_tempfile(store, max_memory_bytes=8 << 20, **filters):
+    """
+    Dışa aktarımı geçici dosyaya yazar (küçükse bellekte kalır) ve başa sarılmış
+    dosya nesnesini döner; st.download_button'a doğrudan verilebilir.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes)
+    export_to_file(tmp, store, **filters)
+    tmp.seek(0)
+    return tmp
@@ -0,0 +1,106 @@
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from engine import BIOL0T_ENGINE_VERSION
+
+from audit.compaction import AuditCompactor
+from audit.store import AuditLogStore
+from audit.writer import BufferedAuditWriter
+
+AUDIT_LOG_DIR = "audit_logs"
+AUDIT_PARQUET_DIR = os.path.join(AUDIT_LOG_DIR, "parquet")
+
+_stores = {}
+_writers = {}
+_compactors = {}
+_stores_lock = threading.Lock()
+
+
+def _root_key(root: str) -> str:
+    # Tekil nesneler mutlak yolla anahtarlanır; çalışma klasörü değişince başka log dizininin nesnesi dönmez
+    return os.path.abspath(root)
+
+
+def get_audit_store(root: str = AUDIT_LOG_DIR) -> AuditLogStore:
+    """Süreç genelinde tek store (Streamlit oturumları arasında paylaşılır)."""
+    key = _root_key(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = AuditLogStore(root)
+        return store
+
+
+def get_audit_writer(root: str = AUDIT_LOG_DIR) -> BufferedAuditWriter:
+    """Süreç genelinde tek grup-commit yazıcı."""
+    store = get_audit_store(root)
+    key = _root_key(root)
+    with _stores_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = BufferedAuditWriter(store)
+        return writer
+
+
+def start_audit_compaction(root: str = AUDIT_LOG_DIR, out_dir: str = AUDIT_PARQUET_DIR,
+                           interval_s: float = 300.0) -> AuditCompactor:
+    """Kapalı segmentleri Parquet'e çeviren arka plan işini (süreç başına bir kez) başlatır."""
+    store = get_audit_store(root)
+    key = _root_key(root)
+    with _stores_lock:
+        compactor = _compactors.get(key)
+        if compactor is None:
+            compactor = _compactors[key] = AuditCompactor(store, out_dir, interval_s).start()
+        return compactor
+
+
+def facility_run_record(run_id: str, facility_id: str, inputs: dict, outputs: dict) -> dict:
+    return {
+        "run_id": run_id,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "engine_version": str(BIOL0T_ENGINE_VERSION),
+        "facility_id": facility_id,
+        "event_type": "FACILITY_RUN",
+        "inputs": inputs,
+        "summary": {
+            "scope1_ton": outputs.get("carbon", {}).get("scope1_ton"),
+            "scope2_ton": outputs.get("carbon", {}).get("scope2_ton"),
+            "total_ton": outputs.get("carbon", {}).get("total_ton"),
+            "total_saved_eur": outputs.get("total_operational_gain", {}).get("total_saved_eur"),
+        },
+    }
+
+
+def event_record(event_type: str, payload: dict) -> dict:
+    return {
+        "run_id": str(uuid.uuid4()),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "engine_version": str(BIOL0T_ENGINE_VERSION),
+        "facility_id": payload.get("facility_id"),
+        "event_type": event_type,
+        "payload": payload,
+    }
+
+
+def append_audit_log(run_id: str, facility_id: str, inputs: dict, outputs: dict) -> None:
+    """Aktif `get_audit_writer().batch()` varsa ona, yoksa zaman pencereli tampona yazar."""
+    get_audit_writer().write(facility_run_record(run_id, facility_id, inputs, outputs))
+
+
+def append_event_log(event_type: str, payload: dict) -> None:
+    writer = get_audit_writer()
+    writer.write(event_record(event_type, payload))
+    writer.flush()
+
+
+def read_audit_log_text() -> str:
+    get_audit_writer().flush()
+    store = get_audit_store()
+    parts = []
+    for seg in store.segments():
+        if os.path.exists(seg["path"]):
+            with open(seg["path"], "r", encoding="utf-8") as f:
+                parts.append(f.read())
+    return "".join(parts)
@@ -0,0 +1,344 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca süreç içi kilit
+    fcntl = None
+
+_SEGMENT_RE = re.compile(r"^runs-(\d{6})\.jsonl$")
+LEGACY_SEGMENT = "runs.jsonl"
+INDEX_FILE = "index.sqlite3"
+LOCK_FILE = ".write.lock"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    name TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0,
+    indexed_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS records (
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    run_id TEXT,
+    facility_id TEXT,
+    event_type TEXT,
+    generated_at TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_records_position ON records(segment, offset);
+CREATE INDEX IF NOT EXISTS ix_records_run_id ON records(run_id);
+CREATE INDEX IF NOT EXISTS ix_records_facility ON records(facility_id, generated_at);
+CREATE INDEX IF NOT EXISTS ix_records_event ON records(event_type, generated_at);
+CREATE INDEX IF NOT EXISTS ix_records_generated_at ON records(generated_at);
+"""
+
+
+def _ts(value):
+    """datetime / ISO metin -> kayıtlardaki UTC ISO biçimi (sözlüksel sıralanabilir)."""
+    if value is None or isinstance(value, str):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+class AuditLogStore:
+    """
+    Segmentli, indeksli append-only audit log.
+
+    Kayıtlar `runs-000001.jsonl`, `runs-000002.jsonl` ... segmentlerine yazılır;
+    segment boyut (`max_segment_bytes`) ya da yaş (`max_segment_age_s`) sınırını
+    aşınca kapatılıp yenisine geçilir. Eski tek dosya `runs.jsonl` varsa kapalı
+    segment 0 olarak okunur.
+
+    Yan indeks (`index.sqlite3`) her kayıt için segment/ofset/uzunluk ile
+    run_id, facility_id, event_type, generated_at tutar; nokta ve aralık
+    sorguları B-ağacı üzerinden O(log n) çalışır, dosyalar taranmaz.
+    İndekslenmemiş kuyruk (ör. yarıda kalan yazma, başka süreç) açılışta ve
+    sorgu öncesinde yalnızca eksik baytlar okunarak tamamlanır.
+    """
+
+    def __init__(self, root, max_segment_bytes=64 * 1024 * 1024, max_segment_age_s=24 * 3600):
+        self.root = root
+        self.max_segment_bytes = int(max_segment_bytes)
+        self.max_segment_age_s = float(max_segment_age_s)
+        self._lock = threading.RLock()
+        self._flock_depth = 0
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(root, INDEX_FILE), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Eski indeksler: NULL zaman damgaları '' yapılır ki sayfalama indeksi kullanabilsin
+        self._conn.execute("UPDATE records SET generated_at = '' WHERE generated_at IS NULL")
+        with self._write_lock():
+            self._discover_segments()
+            self.catch_up()
+
+    # -------------------------------
+    # Segments
+    # -------------------------------
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _discover_segments(self):
+        known = {r[0] for r in self._conn.execute("SELECT name FROM segments")}
+        for name in sorted(os.listdir(self.root)):
+            if name in known:
+                continue
+            if name == LEGACY_SEGMENT:
+                seq, closed = 0, 1
+            else:
+                m = _SEGMENT_RE.match(name)
+                if not m:
+                    continue
+                seq, closed = int(m.group(1)), 0
+            self._conn.execute(
+                "INSERT OR IGNORE INTO segments(name, seq, created_at, closed) VALUES (?, ?, ?, ?)",
+                (name, seq, os.path.getmtime(self._path(name)), closed),
+            )
+        # En son segment dışındaki açık segmentler kapatılır
+        rows = self._conn.execute("SELECT name FROM segments WHERE closed = 0 ORDER BY seq").fetchall()
+        for (name,) in rows[:-1]:
+            self._conn.execute("UPDATE segments SET closed = 1 WHERE name = ?", (name,))
+
+    def segments(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, seq, created_at, closed, indexed_bytes FROM segments ORDER BY seq"
+            ).fetchall()
+        return [
+            {"name": n, "path": self._path(n), "seq": s, "created_at": c, "closed": bool(cl), "indexed_bytes": b}
+            for n, s, c, cl, b in rows
+        ]
+
+    def _active_segment(self, incoming_bytes=0):
+        row = self._conn.execute(
+            "SELECT name, seq, created_at FROM segments WHERE closed = 0 ORDER BY seq DESC LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            name, seq, created_at = row
+            path = self._path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            too_big = size > 0 and size + incoming_bytes > self.max_segment_bytes
+            too_old = time.time() - created_at > self.max_segment_age_s
+            if not (too_big or too_old):
+                return name
+            self._conn.execute("UPDATE segments SET closed = 1 WHERE name = ?", (name,))
+        last = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM segments").fetchone()[0]
+        name = f"runs-{last + 1:06d}.jsonl"
+        self._conn.execute(
+            "INSERT INTO segments(name, seq, created_at, closed) VALUES (?, ?, ?, 0)",
+            (name, last + 1, time.time()),
+        )
+        return name
+
+    def roll_over(self):
+        """Aktif segmenti kapatır; sonraki yazma yeni segment açar."""
+        with self._write_lock():
+            self._conn.execute("UPDATE segments SET closed = 1 WHERE closed = 0")
+
+    # -------------------------------
+    # Index maintenance
+    # -------------------------------
+    @staticmethod
+    def _index_row(segment, offset, length, record):
+        return (
+            segment,
+            offset,
+            length,
+            record.get("run_id"),
+            record.get("facility_id"),
+            record.get("event_type"),
+            record.get("generated_at") or "",
+        )
+
+    def _catch_up_segment(self, name, indexed_bytes):
+        path = self._path(name)
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path)
+        if size <= indexed_bytes:
+            return
+        rows = []
+        offset = indexed_bytes
+        with open(path, "rb") as f:
+            f.seek(indexed_bytes)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # yarım satır: yazan taraf tamamlayınca indekslenir
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {}
+                rows.append(self._index_row(name, offset, len(line), record))
+                offset += len(line)
+        self._conn.execute("BEGIN")
+        self._conn.executemany("INSERT OR IGNORE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.execute("UPDATE segments SET indexed_bytes = ? WHERE name = ?", (offset, name))
+        self._conn.execute("COMMIT")
+
+    def catch_up(self, only_open=False):
+        """Dosyada olup indekste olmayan kuyrukları indeksler."""
+        with self._write_lock():
+            sql = "SELECT name, indexed_bytes FROM segments"
+            if only_open:
+                sql += " WHERE closed = 0"
+            for name, indexed_bytes in self._conn.execute(sql).fetchall():
+                self._catch_up_segment(name, indexed_bytes)
+
+    # -------------------------------
+    # Write
+    # -------------------------------
+    def append(self, record, fsync=False):
+        return self.append_many([record], fsync=fsync)
+
+    @contextmanager
+    def _write_lock(self):
+        """Süreç içi RLock + (POSIX'te) süreçler arası flock; iç içe çağrılabilir."""
+        with self._lock:
+            if fcntl is None or self._flock_depth:
+                self._flock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._flock_depth -= 1
+                return
+            with open(self._path(LOCK_FILE), "a") as lock_f:
+                fcntl.flock(lock_f, fcntl.LOCK_EX)
+                self._flock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._flock_depth = 0
+                    fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+    def append_many(self, records, fsync=False):
+        """
+        Kayıtları aktif segmente tek bir write ile ekler ve indeksler.
+        `fsync=True` ise veri diske zorlanmadan dönülmez.
+        Döner: yazılan bayt sayısı.
+        """
+        lines = [(json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in records]
+        if not lines:
+            return 0
+        payload = b"".join(lines)
+        with self._write_lock():
+            self.catch_up(only_open=True)
+            name = self._active_segment(len(payload))
+            with open(self._path(name), "ab") as f:
+                start = f.seek(0, os.SEEK_END)
+                f.write(payload)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            rows = []
+            offset = start
+            for record, line in zip(records, lines):
+                rows.append(self._index_row(name, offset, len(line), record))
+                offset += len(line)
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR IGNORE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("UPDATE segments SET indexed_bytes = ? WHERE name = ?", (offset, name))
+            self._conn.execute("COMMIT")
+        return len(payload)
+
+    # -------------------------------
+    # Read
+    # -------------------------------
+    def _where(self, run_id=None, facility_id=None, event_type=None, since=None, until=None):
+        clauses, params = [], []
+        for col, val in (("run_id", run_id), ("facility_id", facility_id), ("event_type", event_type)):
+            if val is not None:
+                clauses.append(f"{col} = ?")
+                params.append(val)
+        if since is not None:
+            clauses.append("generated_at >= ?")
+            params.append(_ts(since))
+        if until is not None:
+            clauses.append("generated_at < ?")
+            params.append(_ts(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def locate(self, run_id=None, facility_id=None, event_type=None, since=None, until=None,
+               limit=None, descending=False):
+        """Eşleşen kayıtların (segment, offset, length) konumları, generated_at sırasıyla."""
+        self.catch_up(only_open=True)
+        where, params = self._where(run_id, facility_id, event_type, since, until)
+        sql = f"SELECT segment, offset, length FROM records{where} ORDER BY generated_at"
+        sql += " DESC" if descending else ""
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def iter_locations(self, facility_id=None, event_type=None, since=None, until=None, page_size=10_000):
+        """
+        locate()'un sayfalı hali: konumlar (generated_at, rowid) anahtarıyla
+        `page_size`'lık sayfalar halinde çekilir; her sayfa generated_at indeksinden
+        kaldığı yerden okunur (yeniden tarama/sıralama yok). Kilit sayfa başına kısa
+        süre tutulur ve bellek sonuç sayısından bağımsızdır.
+        """
+        self.catch_up(only_open=True)
+        where, params = self._where(None, facility_id, event_type, since, until)
+        key = "AND" if where else "WHERE"
+        sql = (
+            f"SELECT segment, offset, length, generated_at, rowid FROM records{where} "
+            f"{key} (generated_at, rowid) > (?, ?) "
+            "ORDER BY generated_at, rowid LIMIT ?"
+        )
+        last = ("", -1)
+        while True:
+            with self._lock:
+                page = self._conn.execute(sql, params + [last[0], last[1], int(page_size)]).fetchall()
+            for segment, offset, length, _, _ in page:
+                yield segment, offset, length
+            if len(page) < page_size:
+                return
+            last = (page[-1][3], page[-1][4])
+
+    def iter_raw(self, locations):
+        """Konum listesindeki ham JSONL satırlarını (bytes) sırasıyla üretir."""
+        handles = {}
+        try:
+            for segment, offset, length in locations:
+                f = handles.get(segment)
+                if f is None:
+                    f = handles[segment] = open(self._path(segment), "rb")
+                f.seek(offset)
+                yield f.read(length)
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def find(self, facility_id=None, event_type=None, since=None, until=None, limit=None, descending=False):
+        locations = self.locate(None, facility_id, event_type, since, until, limit, descending)
+        return [json.loads(line) for line in self.iter_raw(locations)]
+
+    def get(self, run_id):
+        locations = self.locate(run_id=run_id, limit=1)
+        for line in self.iter_raw(locations):
+            return json.loads(line)
+        return None
+
+    def count(self, facility_id=None, event_type=None, since=None, until=None):
+        self.catch_up(only_open=True)
+        where, params = self._where(None, facility_id, event_type, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM records{where}", params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,147 @@
+import atexit
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DURABILITY_POLICIES = ("none", "batch", "interval")
+
+
+class BufferedAuditWriter:
+    """
+    Grup-commit audit yazıcısı.
+
+    - `batch()` bağlamı içindeki kayıtlar (ör. bir portföy koşusu) çıkışta
+      tek bir write ile yazılır.
+    - Bağlam dışındaki `write()` çağrıları tamponda birikir; `max_batch`
+      dolunca ya da arka plan iş parçacığı her `flush_interval_s` saniyede
+      bir tamponu boşaltır.
+    - Dayanıklılık: "none" (fsync yok, işletim sistemine bırak), "batch"
+      (her grup yazımında fsync), "interval" (en fazla `fsync_interval_s`
+      saniyede bir fsync).
+    - Aynı süreçteki Streamlit oturumları tek yazıcıyı paylaşır; süreçler arası
+      güvenlik store'un dosya kilidiyle sağlanır.
+    - Süreç kapanırken (atexit) tampondaki kayıtlar yazılır.
+    """
+
+    def __init__(self, store, max_batch=1000, flush_interval_s=1.0, durability="none",
+                 fsync_interval_s=5.0, latency_window=1024):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Geçersiz dayanıklılık politikası: {durability} ({', '.join(DURABILITY_POLICIES)})")
+        self.store = store
+        self.max_batch = int(max_batch)
+        self.flush_interval_s = float(flush_interval_s)
+        self.durability = durability
+        self.fsync_interval_s = float(fsync_interval_s)
+
+        self._buf = []
+        self._buf_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._local = threading.local()
+        self._last_fsync = 0.0
+
+        self._latencies_ms = deque(maxlen=latency_window)
+        self._stats = {"batches": 0, "records": 0, "bytes": 0, "fsyncs": 0}
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------
+    # Write API
+    # -------------------------------
+    def write(self, record):
+        pending = getattr(self._local, "batch", None)
+        if pending is not None:
+            pending.append(record)
+            return
+        with self._buf_lock:
+            self._buf.append(record)
+            full = len(self._buf) >= self.max_batch
+        if full:
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Bağlam içindeki tüm write() çağrılarını tek grup olarak yazar. Gövde
+        istisnayla çıkarsa grup atılır (yarım grup yazılmaz) ve istisna yükselir.
+        """
+        outer = getattr(self._local, "batch", None)
+        if outer is not None:
+            yield  # iç içe batch: dıştaki toplar
+            return
+        self._local.batch = []
+        try:
+            yield
+        except BaseException:
+            self._local.batch = None
+            raise
+        records, self._local.batch = self._local.batch, None
+        self._commit(records)
+
+    def flush(self):
+        with self._buf_lock:
+            records, self._buf = self._buf, []
+        try:
+            self._commit(records)
+        except Exception:
+            with self._buf_lock:
+                self._buf[:0] = records  # kayıp yok: bir sonraki flush tekrar dener
+            raise
+
+    def _commit(self, records):
+        if not records:
+            return
+        with self._commit_lock:
+            now = time.monotonic()
+            fsync = self.durability == "batch" or (
+                self.durability == "interval" and now - self._last_fsync >= self.fsync_interval_s
+            )
+            t0 = time.perf_counter()
+            n_bytes = self.store.append_many(records, fsync=fsync)
+            self._latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+            if fsync:
+                self._last_fsync = now
+                self._stats["fsyncs"] += 1
+            self._stats["batches"] += 1
+            self._stats["records"] += len(records)
+            self._stats["bytes"] += n_bytes
+
+    # -------------------------------
+    # Background flush
+    # -------------------------------
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception:
+                pass  # kayıtlar tampona geri kondu, bir sonraki turda tekrar denenir
+
+    def close(self):
+        atexit.unregister(self.close)
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval_s + 1.0)
+        self.flush()
+
+    # -------------------------------
+    # Metrics
+    # -------------------------------
+    def metrics(self):
+        lat = sorted(self._latencies_ms)
+
+        def pct(q):
+            return lat[min(len(lat) - 1, int(q * len(lat)))] if lat else 0.0
+
+        with self._buf_lock:
+            pending = len(self._buf)
+        return {
+            **self._stats,
+            "pending": pending,
+            "durability": self.durability,
+            "write_ms_last": self._latencies_ms[-1] if lat else 0.0,
+            "write_ms_p50": pct(0.50),
+            "write_ms_p95": pct(0.95),
+            "write_ms_max": lat[-1] if lat else 0.0,
+        }
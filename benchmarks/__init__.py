@@ -0,0 +1,6 @@
+# benchmarks package (çevrimdışı performans ölçümleri)
+#
+# Çalıştırma (repo kökünden):
+#   python -m benchmarks.run                  # ölç + taban çizgisiyle karşılaştır
+#   python -m benchmarks.run --save           # taban çizgisini güncelle
+#   python -m benchmarks.run --quick -k audit # küçük boyutlar, ada göre filtre
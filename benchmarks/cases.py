@@ -0,0 +1,241 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import bench
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED = 20240601
+
+
+def facility_inputs(n, seed=SEED):
+    """Tekrarlanabilir rastgele tesis girdileri (run_biolot anahtar kelimeleri)."""
+    from engine import ENGINE_INPUT_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    cols = {
+        "electricity_kwh_year": rng.uniform(1e5, 2e7, n),
+        "natural_gas_m3_year": rng.uniform(0.0, 2e6, n),
+        "area_m2": rng.uniform(500.0, 1e5, n),
+        "carbon_price": np.full(n, 85.5),
+        "grid_factor": np.full(n, 0.43),
+        "gas_factor": np.full(n, 2.0),
+        "delta_t": rng.uniform(0.0, 5.0, n),
+        "energy_sensitivity": np.full(n, 0.04),
+        "beta": rng.uniform(0.2, 1.0, n),
+        "water_baseline": rng.uniform(1e3, 5e4, n),
+        "water_actual": rng.uniform(1e3, 5e4, n),
+        "pump_kwh_per_m3": np.full(n, 0.4),
+    }
+    rows = zip(*(cols[c].tolist() for c in ENGINE_INPUT_COLUMNS))
+    return cols, [dict(zip(ENGINE_INPUT_COLUMNS, r)) for r in rows]
+
+
+def facilities(n):
+    _, rows = facility_inputs(n)
+    return [{"facility_id": f"F{i:06d}", "inputs": r} for i, r in enumerate(rows)]
+
+
+def enter_workdir(name):
+    """Ölçüme özel boş çalışma klasörü (audit_logs vb. göreli yollar buraya düşer)."""
+    path = os.path.join(os.getcwd(), name)
+    os.makedirs(path, exist_ok=True)
+    os.chdir(path)
+    return path
+
+
+# =========================
+# Motor
+# =========================
+@bench("engine.run_biolot", params=(1_000,))
+def engine_scalar(n):
+    from engine import run_biolot
+
+    _, rows = facility_inputs(n)
+
+    def op():
+        for r in rows:
+            run_biolot(**r)
+    return op, n
+
+
+@bench("engine.kernel.run_scalar", params=(1_000,))
+def engine_kernel_scalar(n):
+    from engine import run_scalar
+
+    _, rows = facility_inputs(n)
+
+    def op():
+        for r in rows:
+            run_scalar(**r)
+    return op, n
+
+
+@bench("engine.run_biolot_batch", params=(1_000, 100_000), quick_params=(1_000,))
+def engine_batch(n):
+    from engine import run_biolot_batch
+
+    cols, _ = facility_inputs(n)
+    return (lambda: run_biolot_batch(cols)), n
+
+
+@bench("engine.run_biolot_hourly_batch", params=(100, 1_000), quick_params=(100,))
+def engine_hourly_batch(n):
+    from engine import STEPS_PER_YEAR, run_biolot_hourly_batch
+
+    cols, _ = facility_inputs(n)
+    delta = np.random.default_rng(SEED).normal(2.0, 2.5, STEPS_PER_YEAR["1h"])
+    return (lambda: run_biolot_hourly_batch(delta, cols)), n
+
+
+# =========================
+# Portföy toplama
+# =========================
+@bench("portfolio.run_portfolio", params=(10, 1_000, 100_000), quick_params=(10, 1_000))
+def portfolio_run(n):
+    from engine import run_portfolio
+
+    facs = facilities(n)
+    return (lambda: run_portfolio(facs)), n
+
+
+@bench("portfolio.from_records", params=(10, 1_000, 100_000), quick_params=(10, 1_000))
+def portfolio_from_records(n):
+    from engine import IncrementalPortfolio, run_portfolio
+
+    records = run_portfolio(facilities(n))["facilities"]
+    return (lambda: IncrementalPortfolio.from_records(records).totals()), n
+
+
+@bench("portfolio.incremental_update", params=(10, 1_000, 100_000), quick_params=(10, 1_000))
+def portfolio_incremental_update(n):
+    from engine import IncrementalPortfolio, run_biolot, run_portfolio
+
+    records = run_portfolio(facilities(n))["facilities"]
+    agg = IncrementalPortfolio.from_records(records)
+    rec = dict(records[n // 2])
+    rec["outputs"] = run_biolot(**{**rec["inputs"], "delta_t": rec["inputs"]["delta_t"] + 0.5})
+
+    def op():
+        agg.update(rec)
+        agg.totals()
+    return op, 1
+
+
+# =========================
+# Audit log
+# =========================
+def _prefill_audit(n):
+    from audit import facility_run_record, get_audit_writer
+    from engine import run_biolot
+
+    inputs = facility_inputs(1)[1][0]
+    outputs = run_biolot(**inputs)
+    writer = get_audit_writer()
+    with writer.batch():
+        for i in range(n):
+            writer.write(facility_run_record(f"prefill-{i}", f"F{i % 1000:06d}", inputs, outputs))
+    writer.flush()
+    return inputs, outputs
+
+
+@bench("audit.append_audit_log", params=(1_000, 10_000, 100_000), quick_params=(1_000, 10_000))
+def audit_append(n, batch=100):
+    from audit import append_audit_log, get_audit_writer
+
+    enter_workdir(f"audit-append-{n}")
+    inputs, outputs = _prefill_audit(n)
+    writer = get_audit_writer()
+
+    def op():
+        for i in range(batch):
+            append_audit_log(f"run-{i}", "F000001", inputs, outputs)
+        writer.flush()
+    return op, batch
+
+
+@bench("audit.read_audit_log_text", params=(1_000, 10_000, 100_000), quick_params=(1_000, 10_000))
+def audit_read_text(n):
+    from audit import read_audit_log_text
+
+    enter_workdir(f"audit-read-{n}")
+    _prefill_audit(n)
+    return read_audit_log_text, n
+
+
+# =========================
+# PDF rapor
+# =========================
+@bench("report.build_portfolio_pdf_bytes", params=(10, 100, 1_000), quick_params=(10, 100))
+def report_pdf(n):
+    from engine import IncrementalPortfolio, run_portfolio
+    from report import build_portfolio_pdf_bytes
+
+    result = run_portfolio(facilities(n))
+    df = (
+        IncrementalPortfolio.from_records(result["facilities"]).frame()
+        .rename(columns={
+            "facility_id": "tesis_id",
+            "total_ton": "toplam_emisyon_ton",
+            "total_saved_eur": "tasarruf_eur",
+            "total_saved_kwh": "tasarruf_kwh",
+        })
+    )
+    portfolio = {"portfolio_totals": result["portfolio_totals"]}
+    return (lambda: build_portfolio_pdf_bytes(portfolio, df, 85.5, "Baz", full_table=True)), n
+
+
+# =========================
+# Dijital ikiz plan modu
+# =========================
+def _plan_inputs(n_sensors):
+    from twin import level_data_uri, load_site_data
+
+    site = load_site_data(os.path.join(REPO_ROOT, "data", "zones.json"), os.path.join(REPO_ROOT, "data", "sensors.json"))
+    img_path = os.path.join(REPO_ROOT, "assets", "site_plan.jpg")
+    uri, width, height, scale = level_data_uri(img_path, 1600)
+    rng = np.random.default_rng(SEED)
+    sensors = [
+        {"id": f"S{i}", "name": f"Sensör {i}", "x": float(x), "y": float(y), "last": {"temp_c": float(t)}}
+        for i, (x, y, t) in enumerate(zip(rng.uniform(0, width, n_sensors), rng.uniform(0, height, n_sensors),
+                                          rng.uniform(20, 35, n_sensors)))
+    ]
+    return site.zones, sensors, uri, width, height, scale, img_path
+
+
+@bench("twin.plan_figure", params=(5, 1_000))
+def twin_plan_figure(n_sensors):
+    from twin import add_sensor_layer, plan_figure
+
+    zones, sensors, uri, width, height, scale, _ = _plan_inputs(n_sensors)
+
+    def op():
+        fig, _ = plan_figure(uri, width, height, scale, zones, True)
+        add_sensor_layer(fig, sensors, width, height)
+        return fig
+    return op, 1
+
+
+@bench("twin.plan_figure_json", params=(5, 1_000))
+def twin_plan_figure_json(n_sensors):
+    from twin import add_sensor_layer, plan_figure
+
+    zones, sensors, uri, width, height, scale, _ = _plan_inputs(n_sensors)
+    fig, _ = plan_figure(uri, width, height, scale, zones, True)
+    add_sensor_layer(fig, sensors, width, height)
+    # st.plotly_chart her rerun'da figürü JSON'a çevirir
+    return fig.to_json, 1
+
+
+@bench("twin.plan_level_data_uri", params=(1600,))
+def twin_plan_level(max_side):
+    from twin import level_data_uri
+
+    *_, img_path = _plan_inputs(0)
+    return (lambda: level_data_uri(img_path, max_side)), 1
+
+
+def frame_summary(results):
+    """Sonuç listesini okunabilir tabloya çevirir."""
+    return pd.DataFrame(results)[["name", "median_s", "min_s", "units_per_s", "number", "repeat"]]
@@ -0,0 +1,66 @@
+import gc
+import statistics
+import time
+
+# Kayıtlı ölçümler: ad -> (fonksiyon, parametre listesi)
+REGISTRY = {}
+
+
+def bench(name, params=(None,), quick_params=None):
+    """
+    Ölçüm kaydı dekoratörü. Fonksiyon `params` içindeki her değer için çağrılır ve
+    (ölçülecek çağrılabilir, iş birimi sayısı) döner; hazırlık süresi ölçüme girmez.
+    `quick_params` verilirse --quick modunda onlar kullanılır.
+    """
+    def wrap(fn):
+        REGISTRY[name] = (fn, tuple(params), tuple(quick_params) if quick_params is not None else tuple(params))
+        return fn
+    return wrap
+
+
+def measure(fn, repeat=5, min_time_s=0.05):
+    """
+    `fn`i önce bir kez ısındırır, sonra döngü sayısını en az `min_time_s` sürecek
+    şekilde ayarlayıp `repeat` kez ölçer. GC ölçüm sırasında kapalıdır.
+    Döner: {"min_s", "median_s", "number", "repeat"} (çağrı başına saniye).
+    """
+    fn()
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time_s or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time_s / elapsed) + 1))
+
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append((time.perf_counter() - t0) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"min_s": min(times), "median_s": statistics.median(times), "number": number, "repeat": repeat}
+
+
+def compare(results, baseline, threshold):
+    """
+    Sonuçları taban çizgisiyle karşılaştırır (medyan süre).
+    Döner: [(ad, taban_s, şimdi_s, oran)] — oran > 1 + threshold olanlar gerileme.
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    rows = []
+    for r in results:
+        b = base.get(r["name"])
+        if b is None or b["median_s"] <= 0:
+            continue
+        rows.append((r["name"], b["median_s"], r["median_s"], r["median_s"] / b["median_s"]))
+    regressions = [row for row in rows if row[3] > 1.0 + threshold]
+    return rows, regressions
@@ -0,0 +1,125 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baselines", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def run_cases(pattern=None, quick=False, repeat=5, min_time_s=0.05, log=print):
+    """
+    Kayıtlı ölçümleri geçici bir çalışma klasöründe çalıştırır (audit_logs vb. repo
+    dışında kalır). Döner: sonuç sözlükleri listesi.
+    """
+    from benchmarks import cases  # noqa: F401  (ölçümleri kaydeder)
+    from benchmarks.harness import REGISTRY, measure
+    from report import setup_fonts
+
+    setup_fonts()  # font yolları repo köküne göreli; çalışma klasörü değişmeden önce kaydet
+
+    workdir = tempfile.mkdtemp(prefix="biolot-bench-")
+    cwd = os.getcwd()
+    results = []
+    try:
+        for name, (fn, params, quick_params) in REGISTRY.items():
+            if pattern and not fnmatch.fnmatch(name, f"*{pattern}*"):
+                continue
+            for p in (quick_params if quick else params):
+                os.chdir(workdir)
+                label = name if p is None else f"{name}[{p}]"
+                op, units = fn(p) if p is not None else fn()
+                stats = measure(op, repeat=repeat, min_time_s=min_time_s)
+                row = {"name": label, **stats, "units": units, "units_per_s": units / stats["median_s"]}
+                results.append(row)
+                log(f"{label:<48} {stats['median_s'] * 1e3:>12.3f} ms  {row['units_per_s']:>14,.0f} /s")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="BIOLOT performans ölçümleri")
+    parser.add_argument("-k", "--filter", help="ada göre filtre (alt dize)")
+    parser.add_argument("--quick", action="store_true", help="küçük boyutlar (hızlı duman testi)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="tekrar başına en az süre (s)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="taban çizgisi JSON dosyası")
+    parser.add_argument("--save", action="store_true", help="sonuçları taban çizgisi olarak yaz")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="gerileme eşiği (medyan süre oranı - 1), varsayılan 0.25")
+    parser.add_argument("--output", help="sonuçları ayrıca bu JSON dosyasına yaz")
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.filter, args.quick, args.repeat, args.min_time)
+    doc = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "quick": args.quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+
+    if args.save:
+        if os.path.exists(args.baseline) and args.filter:
+            # Filtreli koşu: yalnızca ölçülen girdileri güncelle
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                old = json.load(f)
+            fresh = {r["name"] for r in results}
+            doc["results"] = [r for r in old.get("results", []) if r["name"] not in fresh] + results
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"\nTaban çizgisi yazıldı: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nTaban çizgisi yok ({args.baseline}); --save ile oluşturun.")
+        return 0
+
+    from benchmarks.harness import compare
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows, regressions = compare(results, baseline, args.threshold)
+    if baseline.get("environment", {}).get("machine") != environment()["machine"]:
+        print("\nUyarı: taban çizgisi farklı bir makinede alınmış; oranlar yalnızca yaklaşıktır.")
+    print(f"\n{'ölçüm':<48} {'taban ms':>12} {'şimdi ms':>12} {'oran':>8}")
+    for name, base_s, now_s, ratio in rows:
+        mark = "  GERİLEME" if ratio > 1.0 + args.threshold else ""
+        print(f"{name:<48} {base_s * 1e3:>12.3f} {now_s * 1e3:>12.3f} {ratio:>8.2f}{mark}")
+    if regressions:
+        print(f"\n{len(regressions)} ölçüm eşiği (+%{args.threshold * 100:.0f}) aştı.")
+        return 1
+    print("\nGerileme yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    sys.exit(main())
@@ -1,6 +1,9 @@
 BIOL0T_ENGINE_VERSION = "0.1.0"
 
 # engine/__init__.py
+# Formüller engine/kernel.py'de; buradaki fonksiyonlar sözlük döndüren sarmalayıcılardır.
+
+from engine import kernel
 
 def calc_scope12(
     electricity_kwh_year,
@@ -9,10 +12,13 @@ def calc_scope12(
     gas_factor_kg_per_m3=2.0,
     carbon_price_eur_per_ton=85.5
 ):
-    scope2_ton = (electricity_kwh_year * grid_factor_kg_per_kwh) / 1000.0
-    scope1_ton = (natural_gas_m3_year * gas_factor_kg_per_m3) / 1000.0
-    total_ton = scope1_ton + scope2_ton
-    risk_eur = total_ton * carbon_price_eur_per_ton
+    scope1_ton, scope2_ton, total_ton, risk_eur = kernel.scope12(
+        electricity_kwh_year,
+        natural_gas_m3_year,
+        grid_factor_kg_per_kwh,
+        gas_factor_kg_per_m3,
+        carbon_price_eur_per_ton,
+    )
     return {
         "scope1_ton": scope1_ton,
         "scope2_ton": scope2_ton,
@@ -29,17 +35,14 @@ def calc_hvac_savings_simple(
     grid_factor_kg_per_kwh=0.43,
     carbon_price_eur_per_ton=85.5
 ):
-    external_energy_effect = delta_t_c * energy_sensitivity_per_c
-    hvac_reduction = external_energy_effect * beta
-
-    if hvac_reduction < 0:
-        hvac_reduction = 0.0
-    if hvac_reduction > 0.30:
-        hvac_reduction = 0.30
-
-    saved_kwh = electricity_kwh_year * hvac_reduction
-    saved_co2_ton = (saved_kwh * grid_factor_kg_per_kwh) / 1000.0
-    saved_eur = saved_co2_ton * carbon_price_eur_per_ton
+    hvac_reduction, saved_kwh, saved_co2_ton, saved_eur = kernel.hvac(
+        electricity_kwh_year,
+        delta_t_c,
+        energy_sensitivity_per_c,
+        beta,
+        grid_factor_kg_per_kwh,
+        carbon_price_eur_per_ton,
+    )
 
     return {
         "hvac_reduction_ratio": hvac_reduction,
@@ -56,13 +59,13 @@ def calc_water_savings(
     grid_factor_kg_per_kwh=0.43,
     carbon_price_eur_per_ton=85.5
 ):
-    saved_water_m3 = water_baseline_m3_year - water_actual_m3_year
-    if saved_water_m3 < 0:
-        saved_water_m3 = 0.0
-
-    saved_pump_kwh = saved_water_m3 * pump_kwh_per_m3
-    saved_co2_ton = (saved_pump_kwh * grid_factor_kg_per_kwh) / 1000.0
-    saved_eur = saved_co2_ton * carbon_price_eur_per_ton
+    saved_water_m3, saved_pump_kwh, saved_co2_ton, saved_eur = kernel.water(
+        water_baseline_m3_year,
+        water_actual_m3_year,
+        pump_kwh_per_m3,
+        grid_factor_kg_per_kwh,
+        carbon_price_eur_per_ton,
+    )
 
     return {
         "saved_water_m3": saved_water_m3,
@@ -139,3 +142,13 @@ def run_biolot(
             "total_saved_eur": toplam_euro,
         },
     }
+
+
+from engine.batch import ENGINE_INPUT_COLUMNS, ENGINE_OUTPUT_COLUMNS, run_biolot_batch  # noqa: E402
+from engine.kernel import HVAC_REDUCTION_CAP, run_batch, run_scalar  # noqa: E402
+from engine.montecarlo import default_uncertainty, run_biolot_montecarlo  # noqa: E402
+from engine.sweep import SWEEP_PARAMETERS, build_cartesian_axes, sweep_cartesian, sweep_tornado  # noqa: E402
+from engine.portfolio import PORTFOLIO_TOTAL_KEYS, PortfolioCancelled, batch_outputs, run_portfolio  # noqa: E402
+from engine.cache import ResultCache, get_result_cache, input_key  # noqa: E402
+from engine.aggregate import IncrementalPortfolio, NeumaierSum, compute_outputs  # noqa: E402
+from engine.hourly import STEPS_PER_YEAR, interval_profile, run_biolot_hourly, run_biolot_hourly_batch, simulate_hvac_hourly  # noqa: E402
@@ -0,0 +1,210 @@
+import math
+
+import numpy as np
+
+from engine.batch import ENGINE_INPUT_COLUMNS, run_biolot_batch
+from engine.cache import input_key
+from engine.portfolio import PORTFOLIO_TOTAL_KEYS, _total_value, batch_outputs
+
+
+class NeumaierSum:
+    """
+    Telafili (Neumaier / Kahan-Babuška) toplam. Ekleme ve çıkarma O(1);
+    uzun ekle/çıkar dizilerinde yuvarlama hatası toplam sayısından bağımsız kalır.
+    """
+
+    __slots__ = ("total", "comp")
+
+    def __init__(self, value=0.0):
+        self.total = float(value)
+        self.comp = 0.0
+
+    def add(self, x):
+        x = float(x)
+        t = self.total + x
+        if abs(self.total) >= abs(x):
+            self.comp += (self.total - t) + x
+        else:
+            self.comp += (x - t) + self.total
+        self.total = t
+
+    def sub(self, x):
+        self.add(-float(x))
+
+    @property
+    def value(self):
+        return self.total + self.comp
+
+
+def compute_outputs(inputs_list, cache=None):
+    """Girdi listesi için run_biolot biçimli çıktılar; önbellekte olmayanlar tek batch'te hesaplanır."""
+    from engine import BIOL0T_ENGINE_VERSION
+
+    outputs = [None] * len(inputs_list)
+    keys = None
+    if cache is not None:
+        keys = [input_key(inp, BIOL0T_ENGINE_VERSION) for inp in inputs_list]
+        outputs = cache.get_many(keys, BIOL0T_ENGINE_VERSION)
+    todo = [i for i, out in enumerate(outputs) if out is None]
+    if todo:
+        todo_inputs = [inputs_list[i] for i in todo]
+        result = run_biolot_batch({c: [float(inp[c]) for inp in todo_inputs] for c in ENGINE_INPUT_COLUMNS})
+        for i, out in zip(todo, batch_outputs(todo_inputs, result)):
+            outputs[i] = out
+        if cache is not None:
+            cache.put_many(((keys[i], outputs[i]) for i in todo), BIOL0T_ENGINE_VERSION)
+    return outputs
+
+
+class IncrementalPortfolio:
+    """
+    Portföy toplamlarını ve tesis tablosunu delta ile güncel tutar.
+
+    - add / remove / update yalnızca ilgili tesisin katkısını toplamlara uygular.
+    - Tesis tablosu kolon dizilerinde tutulur (silmede son satırla yer değiştirme),
+      tam DataFrame yalnızca `frame()` çağrıldığında ve değişiklik varsa oluşturulur.
+    - `mark_dirty` ile işaretlenen tesisler `refresh()` ile tek vektörel çağrıda
+      yeniden hesaplanır; maliyet O(değişen tesis).
+    - `revision` her değişiklikte artar (çağıranın senkron kontrolü için).
+    """
+
+    def __init__(self, capacity=1024):
+        self.totals_acc = {k: NeumaierSum() for k in PORTFOLIO_TOTAL_KEYS}
+        self.records = {}
+        self._slot = {}
+        self._ids = []
+        self._values = np.zeros((max(1, int(capacity)), len(PORTFOLIO_TOTAL_KEYS)), dtype=np.float64)
+        self._dirty = {}
+        self._frame = None
+        self.revision = 0
+
+    @classmethod
+    def from_records(cls, records):
+        """{"facility_id", "inputs", "outputs", ...} kayıtlarından başlatır."""
+        agg = cls(capacity=len(records))
+        for rec in records:
+            agg._slot[rec["facility_id"]] = len(agg._ids)
+            agg._ids.append(rec["facility_id"])
+            agg.records[rec["facility_id"]] = rec
+        if len(agg._slot) != len(records):
+            raise KeyError("Tekrarlanan tesis ID")
+        if records:
+            agg._values[:len(records)] = [agg._row(rec["outputs"]) for rec in records]
+        agg.rebase()
+        return agg
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, facility_id):
+        return facility_id in self._slot
+
+    # --- delta işlemleri ---
+
+    def _row(self, outputs):
+        return [_total_value(outputs, k) for k in PORTFOLIO_TOTAL_KEYS]
+
+    def add(self, record):
+        fid = record["facility_id"]
+        if fid in self._slot:
+            raise KeyError(f"Tesis zaten var: {fid}")
+        if len(self._ids) == len(self._values):
+            self._values = np.concatenate([self._values, np.zeros_like(self._values)])
+        row = self._row(record["outputs"])
+        slot = len(self._ids)
+        self._slot[fid] = slot
+        self._ids.append(fid)
+        self._values[slot] = row
+        for k, v in zip(PORTFOLIO_TOTAL_KEYS, row):
+            self.totals_acc[k].add(v)
+        self.records[fid] = record
+        self._frame = None
+        self.revision += 1
+
+    def add_many(self, records, cache=None):
+        """Kayıtları ekler; "outputs" alanı olmayanlar tek vektörel çağrıda hesaplanır."""
+        records = list(records)
+        missing = [r for r in records if "outputs" not in r]
+        if missing:
+            outputs = compute_outputs([r["inputs"] for r in missing], cache)
+            for r, out in zip(missing, outputs):
+                r["outputs"] = out
+        for r in records:
+            self.add(r)
+        return records
+
+    def remove(self, facility_id):
+        slot = self._slot.pop(facility_id)
+        for k, v in zip(PORTFOLIO_TOTAL_KEYS, self._values[slot].tolist()):
+            self.totals_acc[k].sub(v)
+        last = len(self._ids) - 1
+        if slot != last:
+            moved = self._ids[last]
+            self._ids[slot] = moved
+            self._values[slot] = self._values[last]
+            self._slot[moved] = slot
+        self._ids.pop()
+        self.records.pop(facility_id)
+        self._dirty.pop(facility_id, None)
+        self._frame = None
+        self.revision += 1
+
+    def update(self, record):
+        fid = record["facility_id"]
+        slot = self._slot[fid]
+        row = self._row(record["outputs"])
+        old = self._values[slot].tolist()
+        for k, o, n in zip(PORTFOLIO_TOTAL_KEYS, old, row):
+            self.totals_acc[k].sub(o)
+            self.totals_acc[k].add(n)
+        self._values[slot] = row
+        self.records[fid] = record
+        self._dirty.pop(fid, None)
+        self._frame = None
+        self.revision += 1
+
+    # --- kirli tesis takibi ---
+
+    def mark_dirty(self, facility_id, inputs):
+        """Tesisi güncel girdileriyle kirli işaretler; hesap `refresh()`e kadar ertelenir."""
+        if facility_id in self._slot:
+            self._dirty[facility_id] = inputs
+
+    @property
+    def dirty(self):
+        return frozenset(self._dirty)
+
+    def refresh(self, cache=None):
+        """Kirli tesisleri yeniden hesaplayıp delta olarak uygular. Döner: güncellenen kayıtlar."""
+        if not self._dirty:
+            return []
+        fids = list(self._dirty)
+        inputs_list = [self._dirty[f] for f in fids]
+        updated = []
+        for fid, inp, out in zip(fids, inputs_list, compute_outputs(inputs_list, cache)):
+            rec = {**self.records[fid], "inputs": inp, "outputs": out}
+            self.update(rec)
+            updated.append(rec)
+        return updated
+
+    # --- okuma ---
+
+    def totals(self):
+        return {k: acc.value for k, acc in self.totals_acc.items()}
+
+    def rebase(self):
+        """Toplamları tablo kolonlarından math.fsum eşdeğeri kesinlikte yeniden kurar."""
+        cols = self._values[:len(self._ids)]
+        for j, k in enumerate(PORTFOLIO_TOTAL_KEYS):
+            self.totals_acc[k] = NeumaierSum(math.fsum(cols[:, j].tolist()))
+        return self.totals()
+
+    def frame(self):
+        """facility_id + toplam kolonları; değişiklik yoksa önceki DataFrame döner."""
+        if self._frame is None:
+            import pandas as pd
+
+            df = pd.DataFrame(self._values[:len(self._ids)].copy(), columns=list(PORTFOLIO_TOTAL_KEYS))
+            df.insert(0, "facility_id", list(self._ids))
+            self._frame = df
+        return self._frame
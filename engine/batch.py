@@ -0,0 +1,114 @@
+import numpy as np
+
+from engine import kernel
+from engine.kernel import ENGINE_INPUT_COLUMNS, ENGINE_OUTPUT_COLUMNS
+
+
+def calc_scope12_batch(
+    electricity_kwh_year,
+    natural_gas_m3_year,
+    grid_factor_kg_per_kwh,
+    gas_factor_kg_per_m3,
+    carbon_price_eur_per_ton,
+):
+    scope1_ton, scope2_ton, total_ton, risk_eur = kernel.scope12_batch(
+        electricity_kwh_year,
+        natural_gas_m3_year,
+        grid_factor_kg_per_kwh,
+        gas_factor_kg_per_m3,
+        carbon_price_eur_per_ton,
+    )
+    return {
+        "scope1_ton": scope1_ton,
+        "scope2_ton": scope2_ton,
+        "total_ton": total_ton,
+        "risk_eur": risk_eur
+    }
+
+
+def calc_hvac_savings_batch(
+    electricity_kwh_year,
+    delta_t_c,
+    energy_sensitivity_per_c,
+    beta,
+    grid_factor_kg_per_kwh,
+    carbon_price_eur_per_ton,
+):
+    hvac_reduction, saved_kwh, saved_co2_ton, saved_eur = kernel.hvac_batch(
+        electricity_kwh_year,
+        delta_t_c,
+        energy_sensitivity_per_c,
+        beta,
+        grid_factor_kg_per_kwh,
+        carbon_price_eur_per_ton,
+    )
+    return {
+        "hvac_reduction_ratio": hvac_reduction,
+        "saved_kwh": saved_kwh,
+        "saved_co2_ton": saved_co2_ton,
+        "saved_eur": saved_eur
+    }
+
+
+def calc_water_savings_batch(
+    water_baseline_m3_year,
+    water_actual_m3_year,
+    pump_kwh_per_m3,
+    grid_factor_kg_per_kwh,
+    carbon_price_eur_per_ton,
+):
+    saved_water_m3, saved_pump_kwh, saved_co2_ton, saved_eur = kernel.water_batch(
+        water_baseline_m3_year,
+        water_actual_m3_year,
+        pump_kwh_per_m3,
+        grid_factor_kg_per_kwh,
+        carbon_price_eur_per_ton,
+    )
+    return {
+        "saved_water_m3": saved_water_m3,
+        "saved_pump_kwh": saved_pump_kwh,
+        "saved_co2_ton": saved_co2_ton,
+        "saved_eur": saved_eur
+    }
+
+
+def _as_columns(data, overrides):
+    """
+    DataFrame / dict / kwargs -> aynı uzunlukta float64 kolonlar.
+    Skaler girdiler (ör. tek karbon fiyatı) tüm satırlara yayılır.
+    """
+    source = {}
+    if data is not None:
+        if hasattr(data, "columns"):
+            source = {c: data[c].to_numpy() for c in data.columns if c in ENGINE_INPUT_COLUMNS}
+        else:
+            source = dict(data)
+    source.update(overrides)
+
+    missing = [c for c in ENGINE_INPUT_COLUMNS if c not in source]
+    if missing:
+        raise KeyError(f"Eksik girdi kolonları: {', '.join(missing)}")
+
+    arrays = [np.asarray(source[c], dtype=np.float64) for c in ENGINE_INPUT_COLUMNS]
+    arrays = np.broadcast_arrays(*[np.atleast_1d(a) for a in arrays])
+    if arrays[0].ndim != 1:
+        raise ValueError("Girdi kolonları tek boyutlu olmalı.")
+    return dict(zip(ENGINE_INPUT_COLUMNS, arrays))
+
+
+def run_biolot_batch(data=None, **columns):
+    """
+    run_biolot'un kolon bazlı (vektörize) hali.
+
+    `data` bir pandas DataFrame ya da kolon adı -> dizi sözlüğü olabilir;
+    tek tek kolonlar anahtar kelime ile de verilebilir/ezilebilir.
+    Sonuç ENGINE_OUTPUT_COLUMNS kolonlarını taşıyan bir sözlüktür;
+    girdi DataFrame ise aynı indeksli bir DataFrame döner.
+    """
+    cols = _as_columns(data, columns)
+    result = kernel.run_batch(cols)
+
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(result, index=data.index)
+    return result
@@ -0,0 +1,115 @@
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+
+from engine.batch import ENGINE_INPUT_COLUMNS
+
+_KEY_STRUCT = struct.Struct("<" + "d" * len(ENGINE_INPUT_COLUMNS))
+
+
+def input_key(inputs, engine_version):
+    """
+    12 girdi + motor versiyonu için kanonik anahtar. Değerler float64'e
+    çevrilip sabit kolon sırasıyla paketlenir; 1 ile 1.0, -0.0 ile 0.0 aynı
+    anahtarı verir, sözlük sırası ve fazladan alanlar anahtarı etkilemez.
+    """
+    values = [float(inputs[c]) + 0.0 for c in ENGINE_INPUT_COLUMNS]
+    h = hashlib.blake2b(_KEY_STRUCT.pack(*values), digest_size=16)
+    h.update(str(engine_version).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    run_biolot çıktıları için boyutu sınırlı LRU önbellek (thread-safe).
+
+    - Anahtar: input_key(inputs, engine_version).
+    - Farklı bir motor versiyonu görüldüğünde önbellek tamamen boşaltılır.
+    - Saklanan çıktılar paylaşılır; çağıranlar salt-okunur kullanmalıdır.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = int(max_entries)
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, engine_version):
+        engine_version = str(engine_version)
+        if self.version != engine_version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self.version = engine_version
+
+    def get_many(self, keys, engine_version):
+        """Anahtar listesi için çıktıları (yoksa None) döner; isabetleri LRU'da tazeler."""
+        with self._lock:
+            self._check_version(engine_version)
+            out = []
+            for k in keys:
+                v = self._data.get(k)
+                if v is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(k)
+                    self.hits += 1
+                out.append(v)
+            return out
+
+    def put_many(self, items, engine_version):
+        """(anahtar, çıktı) çiftlerini ekler; sınır aşılırsa en eski kayıtlar atılır."""
+        with self._lock:
+            self._check_version(engine_version)
+            for k, v in items:
+                self._data[k] = v
+                self._data.move_to_end(k)
+            overflow = len(self._data) - self.max_entries
+            for _ in range(max(0, overflow)):
+                self._data.popitem(last=False)
+            self.evictions += max(0, overflow)
+
+    def get(self, key, engine_version):
+        return self.get_many([key], engine_version)[0]
+
+    def put(self, key, value, engine_version):
+        self.put_many([(key, value)], engine_version)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "engine_version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Süreç genelinde tek önbellek (Streamlit oturumları arasında paylaşılır)."""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
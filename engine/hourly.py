@@ -0,0 +1,236 @@
+import numpy as np
+
+from engine.batch import (
+    _as_columns,
+    calc_scope12_batch,
+    calc_water_savings_batch,
+)
+from engine.kernel import HVAC_REDUCTION_CAP
+
+# Yıllık adım sayısı (saatlik / çeyrek saatlik)
+STEPS_PER_YEAR = {"1h": 8760, "15m": 35040}
+STEP_MS = {"1h": 3_600_000, "15m": 900_000}
+
+# Aynı anda tutulan (tesis x adım) hücre sayısı üst sınırı (~32 MB float64)
+MAX_CHUNK_CELLS = 4_000_000
+
+
+def interval_profile(ts_ms, values, start_ms, resolution="1h"):
+    """
+    Zaman damgalı ölçümleri yılın adımlarına (saat / çeyrek saat) ortalar.
+    `start_ms` yılın ilk adımının başlangıcı; yıl dışındaki ölçümler mod ile katlanır.
+    Ölçüm düşmeyen adımlar NaN. Döner: (steps,) float64.
+    """
+    steps = STEPS_PER_YEAR[resolution]
+    ts_ms = np.asarray(ts_ms, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    ok = np.isfinite(values)
+    idx = ((ts_ms[ok] - int(start_ms)) // STEP_MS[resolution]) % steps
+    counts = np.bincount(idx, minlength=steps)
+    sums = np.bincount(idx, weights=values[ok], minlength=steps)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def fill_profile(profile, fallback):
+    """NaN adımları `fallback` (skaler ya da aynı uzunlukta dizi) ile doldurur."""
+    profile = np.asarray(profile, dtype=np.float64)
+    return np.where(np.isfinite(profile), profile, fallback)
+
+
+def flat_load_profile(steps):
+    """Eşit dağılımlı yük profili (toplamı 1)."""
+    return np.full(steps, 1.0 / steps)
+
+
+def _normalize_rows(profile):
+    profile = np.asarray(profile, dtype=np.float64)
+    total = profile.sum(axis=-1, keepdims=True)
+    if np.any(total <= 0):
+        raise ValueError("Yük profili pozitif toplamlı olmalı.")
+    return profile / total
+
+
+def simulate_hvac_hourly(
+    electricity_kwh_year,
+    delta_t_profile,
+    energy_sensitivity_per_c,
+    beta,
+    grid_factor_kg_per_kwh,
+    carbon_price_eur_per_ton,
+    load_profile=None,
+    return_intervals=False,
+):
+    """
+    HVAC tasarrufunun adım bazlı (8760 / 35040) simülasyonu.
+
+    - electricity_kwh_year, katsayılar: skaler ya da (F,) tesis dizisi
+    - delta_t_profile: (T,) tüm tesislerde ortak ya da (F, T) tesis başına ΔT (°C)
+    - load_profile: yıllık elektriğin adımlara dağılımı, (T,) ya da (F, T); verilmezse düz
+    Her adımda oran = clip(ΔT * duyarlılık * beta, 0, 0.30); %30 sınırı adım başına uygulanır.
+    Tesisler parça parça işlenir, (F, T) matris bellekte tek seferde tutulmaz.
+    Döner: calc_hvac_savings_batch ile aynı anahtarlar (hvac_reduction_ratio yıllık
+    etkin orandır) + "capped_steps"; return_intervals=True ise "saved_kwh_intervals" (F, T).
+    """
+    delta = np.asarray(delta_t_profile, dtype=np.float64)
+    steps = delta.shape[-1]
+    load = _normalize_rows(flat_load_profile(steps) if load_profile is None else load_profile)
+    if load.shape[-1] != steps:
+        raise ValueError("Yük profili ve ΔT profili aynı adım sayısında olmalı.")
+
+    elec, sens, b, grid, price = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in
+          (electricity_kwh_year, energy_sensitivity_per_c, beta, grid_factor_kg_per_kwh, carbon_price_eur_per_ton)]
+    )
+    n = max(len(elec), delta.shape[0] if delta.ndim == 2 else 1, load.shape[0] if load.ndim == 2 else 1)
+    elec, sens, b, grid, price = (np.broadcast_to(v, (n,)) for v in (elec, sens, b, grid, price))
+
+    saved_kwh = np.empty(n)
+    capped = np.empty(n, dtype=np.int64)
+    intervals = np.empty((n, steps)) if return_intervals else None
+
+    chunk = max(1, MAX_CHUNK_CELLS // steps)
+    for start in range(0, n, chunk):
+        sl = slice(start, min(n, start + chunk))
+        d = delta[sl] if delta.ndim == 2 else delta[None, :]
+        w = load[sl] if load.ndim == 2 else load[None, :]
+        raw = d * sens[sl][:, None] * b[sl][:, None]  # kernel.hvac_ratio ile aynı işlem sırası
+        ratio = np.clip(raw, 0.0, HVAC_REDUCTION_CAP)
+        saved = (elec[sl][:, None] * w) * ratio
+        saved_kwh[sl] = saved.sum(axis=1)
+        capped[sl] = np.count_nonzero(raw > HVAC_REDUCTION_CAP, axis=1)
+        if intervals is not None:
+            intervals[sl] = saved
+
+    saved_co2_ton = (saved_kwh * grid) / 1000.0
+    saved_eur = saved_co2_ton * price
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio_eff = np.where(elec > 0, saved_kwh / np.where(elec > 0, elec, 1.0), 0.0)
+
+    result = {
+        "hvac_reduction_ratio": ratio_eff,
+        "saved_kwh": saved_kwh,
+        "saved_co2_ton": saved_co2_ton,
+        "saved_eur": saved_eur,
+        "capped_steps": capped,
+    }
+    if intervals is not None:
+        result["saved_kwh_intervals"] = intervals
+    return result
+
+
+def run_biolot_hourly_batch(delta_t_profile, data=None, load_profile=None, **columns):
+    """
+    run_biolot_batch'in saatlik HVAC'lı hali: karbon ve su yıllık formüllerle,
+    HVAC `simulate_hvac_hourly` ile hesaplanır. `delta_t` kolonu verilmişse
+    profildeki NaN adımlar için yedek değer olarak kullanılır.
+    Döner: ENGINE_OUTPUT_COLUMNS + "hvac_capped_steps" (DataFrame girdide DataFrame).
+    """
+    has_fallback = "delta_t" in columns or (data is not None and "delta_t" in data)
+    if not has_fallback:
+        columns["delta_t"] = np.nan
+    cols = _as_columns(data, columns)
+
+    delta = np.asarray(delta_t_profile, dtype=np.float64)
+    if np.isnan(delta).any():
+        fallback = cols["delta_t"]
+        if delta.ndim == 1 and np.all(fallback == fallback[0]):
+            delta = fill_profile(delta, fallback[0])  # ortak profil ortak kalır
+        else:
+            delta = fill_profile(delta, fallback[:, None])
+        if np.isnan(delta).any():
+            raise ValueError("ΔT profilinde boş adım var ve yedek delta_t verilmedi.")
+
+    karbon = calc_scope12_batch(
+        cols["electricity_kwh_year"],
+        cols["natural_gas_m3_year"],
+        cols["grid_factor"],
+        cols["gas_factor"],
+        cols["carbon_price"],
+    )
+
+    hvac = simulate_hvac_hourly(
+        cols["electricity_kwh_year"],
+        delta,
+        cols["energy_sensitivity"],
+        cols["beta"],
+        cols["grid_factor"],
+        cols["carbon_price"],
+        load_profile=load_profile,
+    )
+
+    su = calc_water_savings_batch(
+        cols["water_baseline"],
+        cols["water_actual"],
+        cols["pump_kwh_per_m3"],
+        cols["grid_factor"],
+        cols["carbon_price"],
+    )
+
+    result = {
+        "scope1_ton": karbon["scope1_ton"],
+        "scope2_ton": karbon["scope2_ton"],
+        "total_ton": karbon["total_ton"],
+        "risk_eur": karbon["risk_eur"],
+        "hvac_reduction_ratio": hvac["hvac_reduction_ratio"],
+        "hvac_saved_kwh": hvac["saved_kwh"],
+        "hvac_saved_co2_ton": hvac["saved_co2_ton"],
+        "hvac_saved_eur": hvac["saved_eur"],
+        "saved_water_m3": su["saved_water_m3"],
+        "saved_pump_kwh": su["saved_pump_kwh"],
+        "water_saved_co2_ton": su["saved_co2_ton"],
+        "water_saved_eur": su["saved_eur"],
+        # toplam kazanç
+        "total_saved_kwh": hvac["saved_kwh"] + su["saved_pump_kwh"],
+        "total_saved_co2_ton": hvac["saved_co2_ton"] + su["saved_co2_ton"],
+        "total_saved_eur": hvac["saved_eur"] + su["saved_eur"],
+        "hvac_capped_steps": hvac["capped_steps"],
+    }
+
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(result, index=data.index)
+    return result
+
+
+def run_biolot_hourly(delta_t_profile, load_profile=None, **inputs):
+    """
+    Tek tesis için run_biolot ile aynı yapıda sonuç; HVAC bölümü adım bazlı
+    simülasyondan gelir ve "mode", "steps", "capped_steps" alanlarını taşır.
+    `inputs` run_biolot'un 12 anahtar kelime girdisidir (delta_t yedek değerdir).
+    """
+    from engine import BIOL0T_ENGINE_VERSION
+
+    r = run_biolot_hourly_batch(delta_t_profile, load_profile=load_profile, **inputs)
+    v = {k: float(a[0]) for k, a in r.items()}
+    steps = np.asarray(delta_t_profile).shape[-1]
+    return {
+        "engine_version": BIOL0T_ENGINE_VERSION,
+        "inputs": dict(inputs),
+        "carbon": {
+            "scope1_ton": v["scope1_ton"],
+            "scope2_ton": v["scope2_ton"],
+            "total_ton": v["total_ton"],
+            "risk_eur": v["risk_eur"],
+        },
+        "hvac": {
+            "hvac_reduction_ratio": v["hvac_reduction_ratio"],
+            "saved_kwh": v["hvac_saved_kwh"],
+            "saved_co2_ton": v["hvac_saved_co2_ton"],
+            "saved_eur": v["hvac_saved_eur"],
+            "mode": "hourly" if steps == STEPS_PER_YEAR["1h"] else f"{steps}-step",
+            "steps": int(steps),
+            "capped_steps": int(r["hvac_capped_steps"][0]),
+        },
+        "water": {
+            "saved_water_m3": v["saved_water_m3"],
+            "saved_pump_kwh": v["saved_pump_kwh"],
+            "saved_co2_ton": v["water_saved_co2_ton"],
+            "saved_eur": v["water_saved_eur"],
+        },
+        "total_operational_gain": {
+            "total_saved_kwh": v["total_saved_kwh"],
+            "total_saved_co2_ton": v["total_saved_co2_ton"],
+            "total_saved_eur": v["total_saved_eur"],
+        },
+    }
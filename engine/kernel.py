@@ -0,0 +1,163 @@
+import numpy as np
+
+# engine/kernel.py
+#
+# BIOLOT formüllerinin tek kaynağı. Her formül iki yoldan sunulur:
+# - skaler hızlı yol (saf Python float; tek tesis / UI çağrıları)
+# - NumPy toplu yol (portföy, Monte Carlo, tarama)
+# İşlem sırası iki yolda aynıdır; aynı girdide sonuçlar bit düzeyinde eşittir
+# (bkz. tests/test_kernel_parity.py). Anlam engine/__init__.py'deki run_biolot'a göredir:
+# HVAC oranı [0, 0.30] aralığına kırpılır, su tasarrufu negatif olamaz.
+
+HVAC_REDUCTION_CAP = 0.30
+
+# run_biolot ile aynı sırada 12 girdi kolonu
+ENGINE_INPUT_COLUMNS = (
+    "electricity_kwh_year",
+    "natural_gas_m3_year",
+    "area_m2",
+    "carbon_price",
+    "grid_factor",
+    "gas_factor",
+    "delta_t",
+    "energy_sensitivity",
+    "beta",
+    "water_baseline",
+    "water_actual",
+    "pump_kwh_per_m3",
+)
+
+ENGINE_OUTPUT_COLUMNS = (
+    "scope1_ton",
+    "scope2_ton",
+    "total_ton",
+    "risk_eur",
+    "hvac_reduction_ratio",
+    "hvac_saved_kwh",
+    "hvac_saved_co2_ton",
+    "hvac_saved_eur",
+    "saved_water_m3",
+    "saved_pump_kwh",
+    "water_saved_co2_ton",
+    "water_saved_eur",
+    "total_saved_kwh",
+    "total_saved_co2_ton",
+    "total_saved_eur",
+)
+
+
+# =========================
+# Skaler yol
+# =========================
+def scope12(electricity_kwh_year, natural_gas_m3_year, grid_factor, gas_factor, carbon_price):
+    """Döner: (scope1_ton, scope2_ton, total_ton, risk_eur)"""
+    scope2_ton = (electricity_kwh_year * grid_factor) / 1000.0
+    scope1_ton = (natural_gas_m3_year * gas_factor) / 1000.0
+    total_ton = scope1_ton + scope2_ton
+    return scope1_ton, scope2_ton, total_ton, total_ton * carbon_price
+
+
+def hvac_ratio(delta_t, energy_sensitivity, beta):
+    """ΔT -> HVAC azalış oranı, [0, 0.30] aralığında."""
+    ratio = delta_t * energy_sensitivity * beta
+    if ratio < 0:
+        return 0.0
+    if ratio > HVAC_REDUCTION_CAP:
+        return HVAC_REDUCTION_CAP
+    return ratio
+
+
+def hvac(electricity_kwh_year, delta_t, energy_sensitivity, beta, grid_factor, carbon_price):
+    """Döner: (hvac_reduction_ratio, saved_kwh, saved_co2_ton, saved_eur)"""
+    ratio = hvac_ratio(delta_t, energy_sensitivity, beta)
+    saved_kwh = electricity_kwh_year * ratio
+    saved_co2_ton = (saved_kwh * grid_factor) / 1000.0
+    return ratio, saved_kwh, saved_co2_ton, saved_co2_ton * carbon_price
+
+
+def water(water_baseline, water_actual, pump_kwh_per_m3, grid_factor, carbon_price):
+    """Döner: (saved_water_m3, saved_pump_kwh, saved_co2_ton, saved_eur)"""
+    saved_water_m3 = water_baseline - water_actual
+    if saved_water_m3 < 0:
+        saved_water_m3 = 0.0
+    saved_pump_kwh = saved_water_m3 * pump_kwh_per_m3
+    saved_co2_ton = (saved_pump_kwh * grid_factor) / 1000.0
+    return saved_water_m3, saved_pump_kwh, saved_co2_ton, saved_co2_ton * carbon_price
+
+
+def run_scalar(
+    electricity_kwh_year,
+    natural_gas_m3_year,
+    area_m2,
+    carbon_price,
+    grid_factor,
+    gas_factor,
+    delta_t,
+    energy_sensitivity,
+    beta,
+    water_baseline,
+    water_actual,
+    pump_kwh_per_m3,
+):
+    """Tek tesis; ENGINE_OUTPUT_COLUMNS sırasında 15 değerlik demet döner."""
+    c = scope12(electricity_kwh_year, natural_gas_m3_year, grid_factor, gas_factor, carbon_price)
+    h = hvac(electricity_kwh_year, delta_t, energy_sensitivity, beta, grid_factor, carbon_price)
+    w = water(water_baseline, water_actual, pump_kwh_per_m3, grid_factor, carbon_price)
+    # toplam kazanç
+    return c + h + w + (h[1] + w[1], h[2] + w[2], h[3] + w[3])
+
+
+# =========================
+# Toplu (NumPy) yol
+# =========================
+def scope12_batch(electricity_kwh_year, natural_gas_m3_year, grid_factor, gas_factor, carbon_price):
+    scope2_ton = (electricity_kwh_year * grid_factor) / 1000.0
+    scope1_ton = (natural_gas_m3_year * gas_factor) / 1000.0
+    total_ton = scope1_ton + scope2_ton
+    return scope1_ton, scope2_ton, total_ton, total_ton * carbon_price
+
+
+def hvac_ratio_batch(delta_t, energy_sensitivity, beta):
+    return np.clip(delta_t * energy_sensitivity * beta, 0.0, HVAC_REDUCTION_CAP)
+
+
+def hvac_batch(electricity_kwh_year, delta_t, energy_sensitivity, beta, grid_factor, carbon_price):
+    ratio = hvac_ratio_batch(delta_t, energy_sensitivity, beta)
+    saved_kwh = electricity_kwh_year * ratio
+    saved_co2_ton = (saved_kwh * grid_factor) / 1000.0
+    return ratio, saved_kwh, saved_co2_ton, saved_co2_ton * carbon_price
+
+
+def water_batch(water_baseline, water_actual, pump_kwh_per_m3, grid_factor, carbon_price):
+    saved_water_m3 = np.maximum(water_baseline - water_actual, 0.0)
+    saved_pump_kwh = saved_water_m3 * pump_kwh_per_m3
+    saved_co2_ton = (saved_pump_kwh * grid_factor) / 1000.0
+    return saved_water_m3, saved_pump_kwh, saved_co2_ton, saved_co2_ton * carbon_price
+
+
+def run_batch(cols):
+    """Kolon sözlüğü (ENGINE_INPUT_COLUMNS) -> ENGINE_OUTPUT_COLUMNS sözlüğü."""
+    c = scope12_batch(
+        cols["electricity_kwh_year"],
+        cols["natural_gas_m3_year"],
+        cols["grid_factor"],
+        cols["gas_factor"],
+        cols["carbon_price"],
+    )
+    h = hvac_batch(
+        cols["electricity_kwh_year"],
+        cols["delta_t"],
+        cols["energy_sensitivity"],
+        cols["beta"],
+        cols["grid_factor"],
+        cols["carbon_price"],
+    )
+    w = water_batch(
+        cols["water_baseline"],
+        cols["water_actual"],
+        cols["pump_kwh_per_m3"],
+        cols["grid_factor"],
+        cols["carbon_price"],
+    )
+    values = c + h + w + (h[1] + w[1], h[2] + w[2], h[3] + w[3])
+    return dict(zip(ENGINE_OUTPUT_COLUMNS, values))
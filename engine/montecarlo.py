@@ -0,0 +1,148 @@
+import numpy as np
+
+from engine.batch import ENGINE_INPUT_COLUMNS, run_biolot_batch
+
+MC_METRICS = ("total_saved_kwh", "total_saved_co2_ton", "total_saved_eur")
+MC_UNCERTAIN_DEFAULTS = ("delta_t", "energy_sensitivity", "beta")
+
+_DIST_PARAMS = {
+    "fixed": ("value",),
+    "normal": ("mean", "std"),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "lognormal": ("median", "sigma"),
+}
+
+
+def _check_spec(name, spec):
+    kind = spec.get("dist")
+    if kind not in _DIST_PARAMS:
+        raise ValueError(f"{name}: bilinmeyen dağılım '{kind}' (desteklenen: {', '.join(_DIST_PARAMS)})")
+    missing = [p for p in _DIST_PARAMS[kind] if p not in spec]
+    if missing:
+        raise ValueError(f"{name}: '{kind}' dağılımı için eksik parametre: {', '.join(missing)}")
+
+
+def _draw(rng, spec, size):
+    kind = spec["dist"]
+    if kind == "fixed":
+        return np.full(size, float(spec["value"]))
+    if kind == "normal":
+        return rng.normal(spec["mean"], spec["std"], size)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if kind == "triangular":
+        if spec["low"] == spec["high"]:
+            return np.full(size, float(spec["mode"]))
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    return rng.lognormal(np.log(spec["median"]), spec["sigma"], size)
+
+
+def default_uncertainty(inputs, rel=0.25, names=MC_UNCERTAIN_DEFAULTS):
+    """Seçili girdiler için nominal değer etrafında ±rel üçgen dağılım."""
+    return {
+        n: {
+            "dist": "triangular",
+            "low": float(inputs[n]) * (1.0 - rel),
+            "mode": float(inputs[n]),
+            "high": float(inputs[n]) * (1.0 + rel),
+        }
+        for n in names
+    }
+
+
+def _iter_chunks(inputs, uncertainty, n_samples, chunk_size, seeds, metrics):
+    # Her parça kendi alt-tohumunu kullanır: iki geçiş aynı `seeds` listesini
+    # alır, aynı örnekler yeniden üretilir, bellekte tüm örnekler hiç tutulmaz.
+    for i, ss in enumerate(seeds):
+        size = min(chunk_size, n_samples - i * chunk_size)
+        rng = np.random.default_rng(ss)
+        cols = {c: float(inputs[c]) for c in ENGINE_INPUT_COLUMNS}
+        for name in sorted(uncertainty):
+            cols[name] = _draw(rng, uncertainty[name], size)
+        out = run_biolot_batch(cols)
+        yield {m: np.broadcast_to(out[m], (size,)) for m in metrics}
+
+
+def _hist_percentile(counts, edges, q):
+    cum = np.cumsum(counts)
+    target = q / 100.0 * cum[-1]
+    i = int(np.searchsorted(cum, target, side="left"))
+    i = min(i, len(counts) - 1)
+    below = cum[i - 1] if i > 0 else 0
+    frac = (target - below) / counts[i] if counts[i] else 0.0
+    return float(edges[i] + frac * (edges[i + 1] - edges[i]))
+
+
+def run_biolot_montecarlo(
+    inputs,
+    uncertainty=None,
+    n_samples=100_000,
+    chunk_size=100_000,
+    seed=None,
+    percentiles=(10, 50, 90),
+    metrics=MC_METRICS,
+    bins=4096,
+):
+    """
+    Tek tesis için Monte Carlo belirsizlik analizi.
+
+    `uncertainty`: girdi adı -> dağılım sözlüğü, ör.
+        {"delta_t": {"dist": "triangular", "low": 1.8, "mode": 2.4, "high": 3.0}}
+    Verilmezse delta_t / energy_sensitivity / beta için ±%25 üçgen kullanılır.
+
+    Örnekler `chunk_size`'lık parçalarla iki geçişte işlenir (1: min/max/ortalama,
+    2: sabit kutulu histogram), bellek kullanımı örnek sayısından bağımsızdır.
+    Yüzdelikler histogramdan interpolasyonla bulunur; hata en fazla
+    (max - min) / bins kadardır. `seed=None` ise tohum bir kez üretilir ve
+    sonuçta "seed" olarak döner (aynı koşu o değerle tekrarlanabilir).
+    """
+    if uncertainty is None:
+        uncertainty = default_uncertainty(inputs)
+    for name, spec in uncertainty.items():
+        if name not in ENGINE_INPUT_COLUMNS:
+            raise KeyError(f"Bilinmeyen girdi: {name}")
+        _check_spec(name, spec)
+    n_samples = int(n_samples)
+    chunk_size = max(1, min(int(chunk_size), n_samples))
+    if n_samples <= 0:
+        raise ValueError("n_samples pozitif olmalı.")
+
+    # Alt-tohumlar bir kez türetilir; iki geçiş birebir aynı örnekleri görür
+    ss = np.random.SeedSequence(seed)
+    seeds = ss.spawn(-(-n_samples // chunk_size))
+
+    lo = {m: np.inf for m in metrics}
+    hi = {m: -np.inf for m in metrics}
+    total = {m: 0.0 for m in metrics}
+    total_sq = {m: 0.0 for m in metrics}
+    for chunk in _iter_chunks(inputs, uncertainty, n_samples, chunk_size, seeds, metrics):
+        for m, v in chunk.items():
+            lo[m] = min(lo[m], float(v.min()))
+            hi[m] = max(hi[m], float(v.max()))
+            total[m] += float(v.sum())
+            total_sq[m] += float(np.dot(v, v))
+
+    edges = {m: np.linspace(lo[m], hi[m], bins + 1) for m in metrics if hi[m] > lo[m]}
+    counts = {m: np.zeros(bins, dtype=np.int64) for m in edges}
+    if edges:
+        for chunk in _iter_chunks(inputs, uncertainty, n_samples, chunk_size, seeds, tuple(edges)):
+            for m, v in chunk.items():
+                counts[m] += np.histogram(v, bins=edges[m])[0]
+
+    summary = {}
+    for m in metrics:
+        mean = total[m] / n_samples
+        var = max(total_sq[m] / n_samples - mean * mean, 0.0)
+        row = {"mean": mean, "std": var ** 0.5, "min": lo[m], "max": hi[m]}
+        for q in percentiles:
+            row[f"p{q:g}"] = _hist_percentile(counts[m], edges[m], q) if m in edges else lo[m]
+        summary[m] = row
+
+    return {
+        "n_samples": n_samples,
+        "seed": ss.entropy,
+        "percentiles": list(percentiles),
+        "uncertainty": uncertainty,
+        "metrics": summary,
+    }
@@ -0,0 +1,143 @@
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from engine.batch import ENGINE_INPUT_COLUMNS, run_biolot_batch
+from engine.cache import input_key
+
+PORTFOLIO_TOTAL_KEYS = (
+    "scope1_ton",
+    "scope2_ton",
+    "total_ton",
+    "total_saved_kwh",
+    "total_saved_co2_ton",
+    "total_saved_eur",
+)
+
+
+class PortfolioCancelled(Exception):
+    pass
+
+
+def batch_outputs(inputs_list, result):
+    """run_biolot_batch sonucunu satır başına run_biolot biçimli sözlüklere çevirir."""
+    from engine import BIOL0T_ENGINE_VERSION
+
+    cols = {k: v.tolist() for k, v in result.items()}
+    outputs = []
+    for i, inp in enumerate(inputs_list):
+        outputs.append({
+            "engine_version": BIOL0T_ENGINE_VERSION,
+            "inputs": dict(inp),
+            "carbon": {
+                "scope1_ton": cols["scope1_ton"][i],
+                "scope2_ton": cols["scope2_ton"][i],
+                "total_ton": cols["total_ton"][i],
+                "risk_eur": cols["risk_eur"][i],
+            },
+            "hvac": {
+                "hvac_reduction_ratio": cols["hvac_reduction_ratio"][i],
+                "saved_kwh": cols["hvac_saved_kwh"][i],
+                "saved_co2_ton": cols["hvac_saved_co2_ton"][i],
+                "saved_eur": cols["hvac_saved_eur"][i],
+            },
+            "water": {
+                "saved_water_m3": cols["saved_water_m3"][i],
+                "saved_pump_kwh": cols["saved_pump_kwh"][i],
+                "saved_co2_ton": cols["water_saved_co2_ton"][i],
+                "saved_eur": cols["water_saved_eur"][i],
+            },
+            "total_operational_gain": {
+                "total_saved_kwh": cols["total_saved_kwh"][i],
+                "total_saved_co2_ton": cols["total_saved_co2_ton"][i],
+                "total_saved_eur": cols["total_saved_eur"][i],
+            },
+        })
+    return outputs
+
+
+def _total_value(outputs, key):
+    """run_biolot çıktısından portföy toplamına giren alanı okur."""
+    section = outputs["carbon"] if key in outputs["carbon"] else outputs["total_operational_gain"]
+    return section[key]
+
+
+def _run_chunk(inputs_list):
+    """Bir tesis parçasını hesaplar; (çıktılar, parça toplamları) döner."""
+    result = run_biolot_batch({c: [float(inp[c]) for inp in inputs_list] for c in ENGINE_INPUT_COLUMNS})
+    partial = {k: math.fsum(result[k].tolist()) for k in PORTFOLIO_TOTAL_KEYS}
+    return batch_outputs(inputs_list, result), partial
+
+
+def run_portfolio(facilities, workers=4, chunk_size=500, executor="thread", on_progress=None, cancel_event=None,
+                  cache=None):
+    """
+    Portföyü `chunk_size`'lık parçalara bölüp iş parçacığı / süreç havuzunda hesaplar.
+
+    - `on_progress(done, total, partial_totals)` her parça bittiğinde çağrılır.
+    - `cancel_event` set edilirse ya da on_progress bir istisna fırlatırsa
+      (ör. Streamlit rerun) bekleyen parçalar iptal edilir.
+    - Toplamlar parça sırasına göre fsum ile birleştirilir; sonuç tamamlanma
+      sırasından bağımsız ve deterministiktir.
+    - `cache` (ResultCache) verilirse girdisi değişmemiş tesisler önbellekten
+      alınır, yalnızca ıskalananlar hesaplanıp önbelleğe yazılır.
+
+    Döner: {"facilities": [{"facility_id", "inputs", "outputs"}, ...], "portfolio_totals": {...}}
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError("executor 'thread' ya da 'process' olmalı.")
+    from engine import BIOL0T_ENGINE_VERSION
+
+    cancel_event = cancel_event or threading.Event()
+    outputs_by_pos = [None] * len(facilities)
+    keys = None
+    if cache is not None:
+        keys = [input_key(f["inputs"], BIOL0T_ENGINE_VERSION) for f in facilities]
+        outputs_by_pos = cache.get_many(keys, BIOL0T_ENGINE_VERSION)
+    todo = [i for i, out in enumerate(outputs_by_pos) if out is None]
+    hits = [out for out in outputs_by_pos if out is not None]
+    cached_partial = {k: math.fsum(_total_value(out, k) for out in hits) for k in PORTFOLIO_TOTAL_KEYS}
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    partials = [None] * len(chunks)
+
+    pool_cls = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    pool = pool_cls(max_workers=max(1, min(workers, len(chunks) or 1)))
+    try:
+        pending = {
+            pool.submit(_run_chunk, [facilities[i]["inputs"] for i in chunk]): idx
+            for idx, chunk in enumerate(chunks)
+        }
+        done_count = len(hits)
+        if hits and on_progress is not None:
+            on_progress(done_count, len(facilities), dict(cached_partial))
+        while pending:
+            if cancel_event.is_set():
+                raise PortfolioCancelled()
+            finished, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                idx = pending.pop(fut)
+                outs, partials[idx] = fut.result()
+                for i, out in zip(chunks[idx], outs):
+                    outputs_by_pos[i] = out
+                if cache is not None:
+                    cache.put_many(((keys[i], out) for i, out in zip(chunks[idx], outs)), BIOL0T_ENGINE_VERSION)
+                done_count += len(chunks[idx])
+            if finished and on_progress is not None:
+                running = {
+                    k: math.fsum([cached_partial[k]] + [p[k] for p in partials if p is not None])
+                    for k in PORTFOLIO_TOTAL_KEYS
+                }
+                on_progress(done_count, len(facilities), running)
+    except BaseException:
+        cancel_event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+
+    merged = [
+        {"facility_id": fac["facility_id"], "inputs": fac["inputs"], "outputs": out}
+        for fac, out in zip(facilities, outputs_by_pos)
+    ]
+    totals = {k: math.fsum([cached_partial[k]] + [p[k] for p in partials]) for k in PORTFOLIO_TOTAL_KEYS}
+    return {"facilities": merged, "portfolio_totals": totals}
@@ -0,0 +1,118 @@
+import numpy as np
+
+from engine.batch import ENGINE_INPUT_COLUMNS, ENGINE_OUTPUT_COLUMNS, run_biolot_batch
+
+SWEEP_PARAMETERS = ("carbon_price", "grid_factor", "gas_factor", "delta_t", "beta", "pump_kwh_per_m3")
+
+
+def _base_columns(facilities):
+    """DataFrame / girdi sözlükleri listesi / tek girdi sözlüğü -> kolon dizileri."""
+    if hasattr(facilities, "columns"):
+        return {c: facilities[c].to_numpy(dtype=np.float64) for c in ENGINE_INPUT_COLUMNS}
+    if isinstance(facilities, dict):
+        facilities = [facilities]
+    return {
+        c: np.fromiter((float(f[c]) for f in facilities), dtype=np.float64, count=len(facilities))
+        for c in ENGINE_INPUT_COLUMNS
+    }
+
+
+def _check(names, metric):
+    for n in names:
+        if n not in ENGINE_INPUT_COLUMNS:
+            raise KeyError(f"Bilinmeyen girdi: {n}")
+    if metric not in ENGINE_OUTPUT_COLUMNS:
+        raise KeyError(f"Bilinmeyen çıktı: {metric}")
+
+
+def _reduce_scenarios(base, names, n_scenarios, multipliers_for, metric, chunk_size):
+    """
+    (tesis, senaryo) çiftlerini düz bir indeks uzayında `chunk_size`'lık
+    parçalarla değerlendirir ve metriği senaryo başına portföy toplamına indirger.
+    Bellek: O(chunk_size + n_scenarios); tam ızgara hiç oluşturulmaz.
+    """
+    n_fac = len(base[ENGINE_INPUT_COLUMNS[0]])
+    totals = np.zeros(n_scenarios, dtype=np.float64)
+    n_total = n_fac * n_scenarios
+    for start in range(0, n_total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, n_total), dtype=np.int64)
+        fac = flat // n_scenarios
+        scen = flat % n_scenarios
+        cols = {c: base[c][fac] for c in ENGINE_INPUT_COLUMNS}
+        mult = multipliers_for(scen)
+        for j, n in enumerate(names):
+            cols[n] = cols[n] * mult[:, j]
+        values = run_biolot_batch(cols)[metric]
+        totals += np.bincount(scen, weights=values, minlength=n_scenarios)
+    return totals
+
+
+def build_oat_grid(params=SWEEP_PARAMETERS, rel=0.2):
+    """
+    Tek-seferde-bir (one-at-a-time) ızgara: satır 0 baz senaryo, ardından her
+    parametre için (1 - rel) ve (1 + rel) çarpanları. Döner: (senaryo x parametre) çarpan matrisi.
+    """
+    params = tuple(params)
+    grid = np.ones((1 + 2 * len(params), len(params)), dtype=np.float64)
+    for j in range(len(params)):
+        grid[1 + 2 * j, j] = 1.0 - rel
+        grid[2 + 2 * j, j] = 1.0 + rel
+    return grid
+
+
+def build_cartesian_axes(params=SWEEP_PARAMETERS, rel=0.2, steps=5):
+    """Her parametre için [1 - rel, 1 + rel] aralığında `steps` adet çarpan."""
+    return {p: np.linspace(1.0 - rel, 1.0 + rel, steps) for p in params}
+
+
+def sweep_cartesian(facilities, axes, metric="total_saved_eur", chunk_size=262_144):
+    """
+    Kartezyen ızgara taraması. `axes`: parametre -> çarpan dizisi (tesisin kendi
+    girdisine göre göreli). Senaryo indeksleri parça parça np.unravel_index ile
+    üretilir. Döner: {"axes": ..., "values": ızgara şekilli portföy toplamı}.
+    """
+    names = tuple(axes)
+    _check(names, metric)
+    axis_values = [np.asarray(axes[n], dtype=np.float64) for n in names]
+    shape = tuple(len(a) for a in axis_values)
+    n_scenarios = int(np.prod(shape)) if shape else 1
+
+    def multipliers_for(scen):
+        idx = np.unravel_index(scen, shape)
+        return np.stack([a[i] for a, i in zip(axis_values, idx)], axis=1)
+
+    base = _base_columns(facilities)
+    totals = _reduce_scenarios(base, names, n_scenarios, multipliers_for, metric, chunk_size)
+    return {"metric": metric, "axes": dict(zip(names, axis_values)), "values": totals.reshape(shape)}
+
+
+def sweep_tornado(facilities, params=SWEEP_PARAMETERS, rel=0.2, metric="total_saved_eur", chunk_size=262_144):
+    """
+    Tornado grafiği için tek-seferde-bir duyarlılık. Her parametre ±rel
+    oranında oynatılır, diğerleri tesisin kendi değerinde kalır.
+    Döner: salınıma (swing) göre azalan sıralı satır listesi.
+    """
+    params = tuple(params)
+    _check(params, metric)
+    grid = build_oat_grid(params, rel)
+    base = _base_columns(facilities)
+    totals = _reduce_scenarios(base, params, len(grid), lambda scen: grid[scen], metric, chunk_size)
+
+    base_value = float(totals[0])
+    rows = []
+    for j, p in enumerate(params):
+        low = float(totals[1 + 2 * j])
+        high = float(totals[2 + 2 * j])
+        rows.append({
+            "parameter": p,
+            "low_multiplier": 1.0 - rel,
+            "high_multiplier": 1.0 + rel,
+            "base": base_value,
+            "low": low,
+            "high": high,
+            "delta_low": low - base_value,
+            "delta_high": high - base_value,
+            "swing": abs(high - low),
+        })
+    rows.sort(key=lambda r: r["swing"], reverse=True)
+    return rows
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# DEFAULT INPUTS (tesis girdi şeması)
+# -------------------------------
+DEFAULT_INPUTS = {
+    "electricity_kwh_year": 2500000.0,
+    "natural_gas_m3_year": 180000.0,
+    "area_m2": 20000.0,
+    "carbon_price": 85.5,
+    "grid_factor": 0.43,
+    "gas_factor": 2.0,
+    "delta_t": 2.4,
+    "energy_sensitivity": 0.04,
+    "beta": 0.5,
+    "water_baseline": 12000.0,
+    "water_actual": 8000.0,
+    "pump_kwh_per_m3": 0.4,
+}
+
+# Alt sınırlar (eski number_input min_value değerleri)
+INPUT_MIN_VALUES = {c: (1.0 if c == "area_m2" else 0.0) for c in DEFAULT_INPUTS}
+
+INPUT_LABELS = {
+    "electricity_kwh_year": "Yıllık Elektrik (kWh)",
+    "natural_gas_m3_year": "Yıllık Doğalgaz (m³)",
+    "area_m2": "Toplam Alan (m²)",
+    "carbon_price": "Karbon Fiyatı (€/ton)",
+    "grid_factor": "Elektrik Emisyon Faktörü (kgCO2/kWh)",
+    "gas_factor": "Gaz Emisyon Faktörü (kgCO2/m³)",
+    "delta_t": "Mikroklima Etkisi (°C)",
+    "energy_sensitivity": "1°C Başına Enerji Azalış Oranı",
+    "beta": "Bina Elastikiyet Katsayısı",
+    "water_baseline": "Referans Su (m³/yıl)",
+    "water_actual": "Mevcut Su (m³/yıl)",
+    "pump_kwh_per_m3": "Pompa Enerji İndeksi (kWh/m³)",
+}
+
+FACILITY_ID_COLUMN = "facility_id"
+MAX_REPORTED_ERRORS = 20
+
+
+def read_facility_file(file, name=None) -> pd.DataFrame:
+    """CSV ya da Parquet dosyasını (yol veya yüklenen dosya nesnesi) DataFrame'e okur."""
+    name = (name or getattr(file, "name", None) or str(file)).lower()
+    ext = os.path.splitext(name)[1]
+    if ext == ".parquet":
+        return pd.read_parquet(file)
+    if ext == ".csv":
+        return pd.read_csv(file, dtype={FACILITY_ID_COLUMN: str})
+    raise ValueError(f"Desteklenmeyen dosya türü: {ext or name} (csv / parquet)")
+
+
+def facility_template() -> pd.DataFrame:
+    return pd.DataFrame([{FACILITY_ID_COLUMN: "FAC-001", **DEFAULT_INPUTS}])
+
+
+def parse_facility_table(df: pd.DataFrame, existing_ids=()) -> tuple[list, list, list]:
+    """
+    Toplu içe aktarım tablosunu DEFAULT_INPUTS şemasına göre doğrular.
+
+    - `facility_id` zorunlu, boş olamaz, dosyada ve `existing_ids` içinde tekrar edemez.
+    - Eksik girdi kolonları varsayılan değerle doldurulur (uyarı olarak bildirilir).
+    - Şemada olmayan kolonlar yok sayılır (uyarı).
+    - Sayısal olmayan ya da alt sınırın altındaki hücreler satırı geçersiz kılar.
+
+    Döner: (geçerli tesisler, hatalar, uyarılar). Kontroller kolon bazlı yapılır.
+    """
+    errors, warnings = [], []
+    if FACILITY_ID_COLUMN not in df.columns:
+        return [], [f"'{FACILITY_ID_COLUMN}' kolonu zorunlu."], []
+
+    unknown = [c for c in df.columns if c != FACILITY_ID_COLUMN and c not in DEFAULT_INPUTS]
+    if unknown:
+        warnings.append(f"Şemada olmayan kolonlar yok sayıldı: {', '.join(map(str, unknown))}")
+    missing = [c for c in DEFAULT_INPUTS if c not in df.columns]
+    if missing:
+        warnings.append(f"Eksik kolonlar varsayılan değerle dolduruldu: {', '.join(missing)}")
+
+    ids = df[FACILITY_ID_COLUMN].astype("string").str.strip()
+    bad = ids.isna() | (ids == "")
+    dup_in_file = ids.duplicated(keep="first") & ~bad
+    dup_existing = ids.isin(list(existing_ids)) & ~bad
+
+    values = {}
+    for c, default in DEFAULT_INPUTS.items():
+        if c in df.columns:
+            col = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            col = np.full(len(df), default)
+        values[c] = col
+        invalid = np.isnan(col) | (col < INPUT_MIN_VALUES[c])
+        for i in np.flatnonzero(invalid)[:MAX_REPORTED_ERRORS]:
+            errors.append(f"Satır {i + 2}: '{c}' geçersiz (sayı ve ≥ {INPUT_MIN_VALUES[c]:g} olmalı).")
+        bad |= invalid
+
+    for i in np.flatnonzero((ids.isna() | (ids == "")).to_numpy())[:MAX_REPORTED_ERRORS]:
+        errors.append(f"Satır {i + 2}: tesis ID boş.")
+    for i in np.flatnonzero(dup_in_file.to_numpy())[:MAX_REPORTED_ERRORS]:
+        errors.append(f"Satır {i + 2}: '{ids.iloc[i]}' dosyada tekrar ediyor.")
+    for i in np.flatnonzero(dup_existing.to_numpy())[:MAX_REPORTED_ERRORS]:
+        errors.append(f"Satır {i + 2}: '{ids.iloc[i]}' portföyde zaten var.")
+    bad |= dup_in_file | dup_existing
+
+    keep = np.flatnonzero(~bad.to_numpy())
+    cols = {c: values[c][keep].tolist() for c in DEFAULT_INPUTS}
+    id_list = ids.to_numpy()[keep].tolist()
+    facilities = [
+        {"facility_id": fid, "inputs": {c: cols[c][j] for c in DEFAULT_INPUTS}}
+        for j, fid in enumerate(id_list)
+    ]
+    if len(errors) >= MAX_REPORTED_ERRORS:
+        errors = errors[:MAX_REPORTED_ERRORS] + [f"... toplam {int(bad.sum())} satır geçersiz."]
+    return facilities, errors, warnings
+
+
+def facilities_page_frame(facilities: list, start: int, stop: int) -> pd.DataFrame:
+    """Editör için yalnızca bir sayfalık tesisi DataFrame'e çevirir."""
+    page = facilities[start:stop]
+    df = pd.DataFrame.from_records([f["inputs"] for f in page], columns=list(DEFAULT_INPUTS))
+    df.insert(0, FACILITY_ID_COLUMN, [f["facility_id"] for f in page])
+    return df
+
+
+def apply_page_edits(facilities: list, start: int, before: pd.DataFrame, after: pd.DataFrame) -> list:
+    """Editörde değişen hücreleri tesis girdilerine yazar; değişen tesis kayıtlarını döner."""
+    cols = list(DEFAULT_INPUTS)
+    old = before[cols].to_numpy(dtype=np.float64)
+    new = after[cols].to_numpy(dtype=np.float64)
+    changed = np.flatnonzero(((old != new) & ~(np.isnan(old) & np.isnan(new))).any(axis=1))
+    for i in changed:
+        inp = facilities[start + i]["inputs"]
+        for j, c in enumerate(cols):
+            v = new[i, j]
+            if not np.isnan(v):
+                inp[c] = max(float(v), INPUT_MIN_VALUES[c])
+    return [facilities[start + i] for i in changed]
@@ -1,51 +1,87 @@
 import numpy as np
+import uuid
 
-import json
-import base64
-from io import BytesIO
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import pandas as pd
 import streamlit as st
-
-# Harita modu
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 
 # Plan modu
-from PIL import Image
 import plotly.graph_objects as go
 
 # BIOLOT motor
 from engine import run_biolot
 
+# Saatlik HVAC simülasyonu (sensör sıcaklık geçmişinden ΔT profili)
+from engine import STEPS_PER_YEAR, interval_profile, run_biolot_hourly
+
+# Plan görseli karo piramidi
+from twin import level_data_uri
+
+# Plan figürü (arka plan + zonlar + sensör katmanı)
+from twin import add_sensor_layer, plan_figure
+
+# Harita modu (GeoJSON + istemci tarafı kümeleme)
+from twin import build_site_map, heat_rows, sensor_rows, zones_geojson
+
+# Zon uzamsal indeksi (sensör -> zon ataması)
+from twin import validate_sensor_zones
+
+# Saha verisi (mtime/boyut ile önbellekli, doğrulanmış)
+from twin import SiteDataError, load_site_data
+
+# Sensör zaman serisi deposu
+from twin import SensorTimeSeriesStore
+
+# Zonlara kırpılmış sıcaklık alanı (IDW)
+from twin import IDW_KERNELS, raster_to_png_uri, readings_key, zone_temperature_raster
+
+# Tüm zonlar için KPI dağıtımı
+from twin import allocate_zone_kpis, zone_weights
+
+# Rerun süre ölçümü (BIOLOT_TRACE=1 ile açılır; kapalıyken no-op)
+from telemetry import ENABLED as TRACE_ENABLED
+from telemetry import begin_rerun, end_rerun, span, timed
+
 
 # =========================
 # Page
 # =========================
 st.set_page_config(page_title="BIOLOT | Dijital İkiz", layout="wide")
+if TRACE_ENABLED:
+    begin_rerun("twin", key=st.session_state.setdefault("trace_key", uuid.uuid4().hex))
 st.title("Dijital İkiz (2D) — Zonlar • Sensörler • Katmanlar")
 st.caption("Harita Modu (Leaflet) + Tesis Planı Modu (plan görseli üstü overlay)")
 
 DATA_DIR = Path("data")
 ZONES_PATH = DATA_DIR / "zones.json"
 SENSORS_PATH = DATA_DIR / "sensors.json"
+TIMESERIES_DIR = DATA_DIR / "timeseries"
 
 PLAN_IMG_PNG = Path("assets/site_plan.png")
 PLAN_IMG_JPG = Path("assets/site_plan.jpg")
+PLAN_MAX_SIDE = 1600  # plan alanına sığan en detaylı piramit seviyesi
 
 
 # =========================
 # Helpers
 # =========================
-def load_json(path: Path):
-    if not path.exists():
-        st.error(f"Dosya bulunamadı: {path.as_posix()}")
-        st.stop()
+def load_site():
+    """Saha verisi; dosyalar değişmedikçe süreç önbelleğinden (oturumlar arası) gelir."""
+    for path in (ZONES_PATH, SENSORS_PATH):
+        if not path.exists():
+            st.error(f"Dosya bulunamadı: {path.as_posix()}")
+            st.stop()
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_site_data(ZONES_PATH, SENSORS_PATH)
+    except SiteDataError as e:
+        st.error(f"Geçersiz saha verisi ({Path(e.path).as_posix()}):")
+        st.dataframe({"hata": e.errors}, use_container_width=True, hide_index=True)
+        st.stop()
     except Exception as e:
-        st.error(f"JSON okunamadı ({path.as_posix()}): {e}")
+        st.error(f"JSON okunamadı: {e}")
         st.stop()
 
 
@@ -64,48 +100,132 @@ def load_plan_image_path():
 
 
 @st.cache_data(show_spinner=False)
-def image_to_data_uri_resized(img_path: str, max_side: int = 1600) -> tuple[str, int, int]:
+def plan_image_level(img_path: str, mtime_ns: int, max_side: int = PLAN_MAX_SIDE) -> tuple[str, int, int, int]:
+    """
+    Plan görselinin sığan piramit seviyesini PNG data URI olarak döner.
+    Önbellek anahtarı mtime içerir; görsel değişince piramit ve decode yenilenir.
+    Döner: (uri, tam genişlik, tam yükseklik, seviye ölçeği)
+    """
+    return level_data_uri(img_path, max_side)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def site_map_html(
+    data_key: tuple,
+    _zones: list,
+    _sensors: list,
+    center: tuple,
+    show_zones: bool,
+    show_sensors: bool,
+    show_heatmap: bool,
+    field_key: tuple | None = None,
+    _field: dict | None = None,
+) -> str:
+    """
+    Harita HTML'i yalnızca veri (data_key = dosya mtime'ları), merkez, katman
+    seçimi ya da sıcaklık alanı (field_key) değişince yeniden üretilir;
+    diğer rerun'lar önbellekten gelir.
     """
-    ✅ En stabil yöntem: Görseli küçült -> PNG olarak base64 göm.
-    Plotly/Streamlit’te "arka plan görünmüyor" sorununu %90 çözer.
+    m = build_site_map(
+        center,
+        zones_fc=zones_geojson(_zones) if show_zones else None,
+        sensors=sensor_rows(_sensors) if show_sensors else None,
+        heat=heat_rows(_sensors) if show_heatmap else None,
+        field={"uri": _field["uri"], "bounds": _field["bounds"]} if _field else None,
+    )
+    return m.get_root().render()
+
+
+@st.cache_resource(show_spinner=False)
+def sensor_store(root: str) -> SensorTimeSeriesStore:
+    """Süreç genelinde tek zaman serisi deposu (oturumlar arasında paylaşılır)."""
+    return SensorTimeSeriesStore(root)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sensor_zone_assignment(data_key: tuple, _site) -> tuple[list, list]:
+    """
+    Sensörleri lat/lon konumundan zonlara atar ve elle yazılmış zone_id
+    etiketlerini doğrular. Veri dosyaları değişmedikçe önbellekten gelir.
+    Döner: (konumlu sensör başına hesaplanan zone_id listesi, uyuşmazlık listesi)
     """
-    img = Image.open(img_path).convert("RGBA")
-    w, h = img.size
+    index = _site.zone_index()
+    computed = index.zone_ids(index.locate(_site.sensor_latlon)) if len(_site.sensor_latlon) else []
+    return computed, validate_sensor_zones(index, _site.placed_sensors)
 
-    # Büyük görseli küçült
-    scale = min(1.0, max_side / max(w, h))
-    if scale < 1.0:
-        img = img.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
 
-    w2, h2 = img.size
+@st.cache_data(show_spinner=False, max_entries=8)
+def temperature_field(reading_key: str, data_key: tuple, _site, kernel: str, power: float) -> dict:
+    """
+    Zonlara kırpılmış sıcaklık ızgarası, renkli PNG ve zon istatistikleri.
+    Yalnızca yeni okuma (reading_key), veri dosyası ya da çekirdek değişince yeniden hesaplanır.
+    """
+    raster = zone_temperature_raster(
+        _site.zones, _site.sensors, index=_site.zone_index(), kernel=kernel, power=power
+    )
+    raster["uri"] = raster_to_png_uri(raster["grid"])
+    return raster
+
 
-    buf = BytesIO()
-    img.save(buf, format="PNG", optimize=True)
-    b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-    uri = "data:image/png;base64," + b64
-    return uri, w2, h2
+@st.cache_data(show_spinner=False, max_entries=32)
+def zone_kpi_table(out: dict, reading_key: str, data_key: tuple, scheme: str, _zones: list, _sensors: list,
+                   _sensor_zone_ids: list) -> pd.DataFrame:
+    """
+    Motor çıktısının tüm zonlara dağılımı (tek vektörel geçiş).
+    Motor çıktısı, okumalar ya da şema değişmedikçe önbellekten gelir; zon
+    değiştirmek yalnızca tablodan satır seçer.
+    """
+    placed = [s for s in _sensors if "lat" in s and "lon" in s]
+    weights = zone_weights(_zones, placed, _sensor_zone_ids)
+    return allocate_zone_kpis(out, _zones, weights, scheme=scheme)
 
 
-def clamp(v: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, v))
+@st.cache_data(show_spinner=False, max_entries=8)
+def sensor_delta_profile(reading_key: str, reference_ids: tuple, other_ids: tuple, _store) -> tuple[np.ndarray, int]:
+    """
+    Son 365 günün saatlik ΔT profili: referans (yeşilsiz) sensörlerin saatlik ortalaması
+    eksi diğer sensörlerin ortalaması. Veri olmayan saatler NaN.
+    Yeni okuma gelmedikçe (reading_key) önbellekten gelir. Döner: (profil (8760,), dolu saat sayısı)
+    """
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(hours=STEPS_PER_YEAR["1h"])
+    start_ms = int(start.timestamp() * 1000)
+
+    def group_profile(ids):
+        rows = []
+        for sid in ids:
+            data = _store.read_range(sid, start, end, fields=("temp_c",), resolution="1h")
+            rows.append(interval_profile(data["ts"], data["temp_c.mean"], start_ms))
+        if not rows:
+            return np.full(STEPS_PER_YEAR["1h"], np.nan)
+        with np.errstate(invalid="ignore"):
+            stack = np.vstack(rows)
+            counts = np.isfinite(stack).sum(axis=0)
+            return np.where(counts > 0, np.nansum(stack, axis=0) / np.maximum(counts, 1), np.nan)
+
+    profile = group_profile(reference_ids) - group_profile(other_ids)
+    return profile, int(np.isfinite(profile).sum())
 
 
-def clamp_point_xy(x: float, y: float, width: float, height: float):
-    return clamp(x, 0, width), clamp(y, 0, height)
+@st.cache_data(show_spinner=False)
+def plan_skeleton(img_path: str, mtime_ns: int, data_key: tuple, _zones: list, show_zones: bool) -> tuple[go.Figure, int, int, int]:
+    """
+    Plan modunun statik iskeleti (arka plan + zonlar). cache_data her çağrıda kopya
+    döner, dolayısıyla sensör katmanı eklemek önbelleği bozmaz.
+    Döner: (figür, genişlik, yükseklik, kırpılan zon sayısı)
+    """
+    uri, width, height, scale = plan_image_level(img_path, mtime_ns)
+    fig, clipped_polys = plan_figure(uri, width, height, scale, _zones, show_zones)
+    return fig, width, height, clipped_polys
 
 
 # =========================
 # Load data
 # =========================
-zones_data = load_json(ZONES_PATH)
-sensors_data = load_json(SENSORS_PATH)
-
-zones = zones_data.get("zones", [])
-sensors = sensors_data.get("sensors", [])
-
-if not zones:
-    st.error("zones.json içinde 'zones' listesi boş.")
-    st.stop()
+with span("twin.load_site"):
+    site = load_site()
+zones = site.zones
+sensors = site.sensors
 
 
 # =========================
@@ -118,7 +238,11 @@ st.sidebar.divider()
 st.sidebar.header("Katmanlar")
 show_zones = st.sidebar.checkbox("Zonları göster", value=True)
 show_sensors = st.sidebar.checkbox("Sensörleri göster", value=True)
-show_heatmap = st.sidebar.checkbox("Isı haritası (sensör sıcaklığı)", value=True)
+show_field = st.sidebar.checkbox("Sıcaklık alanı (zonlara kırpılmış)", value=True)
+show_heatmap = st.sidebar.checkbox("Isı haritası (sensör yoğunluğu)", value=False)
+field_kernel = st.sidebar.selectbox("Enterpolasyon çekirdeği", list(IDW_KERNELS), index=0, disabled=not show_field)
+field_power = st.sidebar.slider("IDW üssü", min_value=1.0, max_value=4.0, value=2.0, step=0.5,
+                                disabled=not show_field or field_kernel != "idw")
 
 st.sidebar.divider()
 st.sidebar.header("Tesis Parametreleri (BIOLOT Motor)")
@@ -136,10 +260,49 @@ water_baseline = st.sidebar.number_input("Referans Su (m3/yıl)", min_value=0.0,
 water_actual = st.sidebar.number_input("Mevcut Su (m3/yıl)", min_value=0.0, value=8000.0)
 pump_kwh_per_m3 = st.sidebar.number_input("Pompa Enerji İndeksi (kWh/m3)", min_value=0.0, value=0.4)
 
+hvac_mode = st.sidebar.radio("HVAC hesabı", ["Yıllık ΔT", "Saatlik (sensör geçmişi)"], index=0)
+temp_sensors = [s for s in sensors if (s.get("last") or {}).get("temp_c") is not None]
+temp_sensor_ids = [s["id"] for s in temp_sensors]
+reference_ids = []
+if hvac_mode != "Yıllık ΔT":
+    hottest = max(temp_sensors, key=lambda s: s["last"]["temp_c"])["id"] if temp_sensors else None
+    reference_ids = st.sidebar.multiselect(
+        "Referans sensörler (yeşilsiz alan)",
+        temp_sensor_ids,
+        default=[hottest] if hottest else [],
+        help="ΔT = referans sensörlerin saatlik ortalaması - diğer sensörlerin ortalaması. "
+             "Verisi olmayan saatlerde yukarıdaki yıllık ΔT kullanılır.",
+    )
+
 st.sidebar.divider()
 zone_names = [z.get("name", "Zon") for z in zones]
 selected_zone_name = st.sidebar.selectbox("Zon seç", zone_names, index=0)
 selected_zone = next(z for z in zones if z.get("name") == selected_zone_name)
+allocation_scheme = st.sidebar.radio(
+    "KPI dağıtımı",
+    ["area", "sensor"],
+    format_func=lambda k: {"area": "Alan payı", "sensor": "Sensör ağırlıklı (sıcaklık / debi)"}[k],
+    index=0,
+)
+
+
+# =========================
+# Sensör -> zon (konumdan)
+# =========================
+DATA_KEY = site.key
+sensor_zone_ids, sensor_zone_issues = sensor_zone_assignment(DATA_KEY, site)
+selected_zone_sensor_count = sum(1 for zid in sensor_zone_ids if zid == selected_zone.get("id"))
+
+# Son okumalar geçmişe eklenir (aynı damgalı okuma tekrar yazılmaz)
+ts_store = sensor_store(TIMESERIES_DIR.as_posix())
+if ts_store.ingest_snapshot(sensors):
+    ts_store.flush()
+
+# Sıcaklık alanı: okumalar değişmedikçe önbellekten
+READING_KEY = readings_key(sensors)
+with span("twin.temperature_field"):
+    temp_field = temperature_field(READING_KEY, DATA_KEY, site, field_kernel, field_power)
+selected_zone_field = next((r for r in temp_field["stats"] if r["zone_id"] == selected_zone.get("id")), None)
 
 
 # =========================
@@ -147,7 +310,7 @@ selected_zone = next(z for z in zones if z.get("name") == selected_zone_name)
 # =========================
 total_area_m2 = sum(float(z.get("area_m2", 0)) for z in zones) or 1.0
 
-out = run_biolot(
+engine_inputs = dict(
     electricity_kwh_year=electricity_kwh_year,
     natural_gas_m3_year=natural_gas_m3_year,
     area_m2=total_area_m2,
@@ -162,45 +325,62 @@ out = run_biolot(
     pump_kwh_per_m3=pump_kwh_per_m3,
 )
 
-carbon_total = out.get("carbon", {})
-hvac_total = out.get("hvac", {})
-water_total = out.get("water", {})
-op_total = out.get("total_operational_gain", {})
-
-zone_area = float(selected_zone.get("area_m2", 0))
-zone_share = max(0.0, min(1.0, zone_area / total_area_m2))
-
-zone_kpi = {
-    "total_ton": float(carbon_total.get("total_ton", 0.0)) * zone_share,
-    "risk_eur": float(carbon_total.get("risk_eur", 0.0)) * zone_share,
-    "hvac_saved_kwh": float(hvac_total.get("saved_kwh", 0.0)) * zone_share,
-    "hvac_saved_eur": float(hvac_total.get("saved_eur", 0.0)) * zone_share,
-    "water_saved_m3": float(water_total.get("saved_water_m3", 0.0)) * zone_share,
-    "pump_saved_kwh": float(water_total.get("saved_pump_kwh", 0.0)) * zone_share,
-    "total_saved_kwh": float(op_total.get("total_saved_kwh", 0.0)) * zone_share,
-    "total_saved_eur": float(op_total.get("total_saved_eur", 0.0)) * zone_share,
-}
-
-if zone_kpi["risk_eur"] > 50000:
-    risk_flag = "YÜKSEK"
-elif zone_kpi["risk_eur"] > 20000:
-    risk_flag = "ORTA"
+hourly_coverage = None
+if hvac_mode != "Yıllık ΔT" and reference_ids:
+    others = tuple(sid for sid in temp_sensor_ids if sid not in reference_ids)
+    delta_profile, hourly_coverage = sensor_delta_profile(READING_KEY, tuple(reference_ids), others, ts_store)
+    with span("twin.engine_hourly"):
+        out = run_biolot_hourly(delta_profile, **engine_inputs)
 else:
-    risk_flag = "DÜŞÜK"
+    with span("twin.engine"):
+        out = run_biolot(**engine_inputs)
+
+# Tüm zonlar tek geçişte; seçili zon tablodan okunur
+with span("twin.zone_kpis"):
+    zone_table = zone_kpi_table(out, READING_KEY, DATA_KEY, allocation_scheme, zones, sensors, sensor_zone_ids)
+zone_row = zone_table.loc[zone_table["zone_id"] == selected_zone.get("id")].iloc[0]
+zone_kpi = zone_row.to_dict()
+zone_share = float(zone_row["share_carbon"])
+risk_flag = zone_kpi["risk_flag"]
 
 
 # =========================
 # UI blocks
 # =========================
+@timed("twin.render_right_panel")
 def render_right_panel():
     st.subheader("Zon Özeti")
     st.write(f"**Zon:** {selected_zone.get('name','-')}")
     st.write(f"**Alan:** {selected_zone.get('area_m2','-')} m²")
+    st.write(f"**Sensör (konuma göre):** {selected_zone_sensor_count}")
     st.write(f"**Pay:** %{(zone_share * 100):.1f}")
     st.write(f"**Risk Seviyesi:** {risk_flag}")
 
+    if selected_zone_field and selected_zone_field["cells"]:
+        f1, f2, f3 = st.columns(3)
+        f1.metric("Min °C", f"{selected_zone_field['min']:.1f}")
+        f2.metric("Ort. °C", f"{selected_zone_field['mean']:.1f}")
+        f3.metric("Maks °C", f"{selected_zone_field['max']:.1f}")
+        with st.expander("Zon sıcaklık alanı istatistikleri"):
+            st.dataframe(temp_field["stats"], use_container_width=True, hide_index=True)
+            st.caption(f"Izgara hücresi ≈ {temp_field['cell_m']:.1f} m")
+
+    if site.warnings:
+        with st.expander(f"Saha verisi uyarıları ({len(site.warnings)})"):
+            st.write("\n".join(f"- {w}" for w in site.warnings))
+
+    if sensor_zone_issues:
+        st.warning(f"{len(sensor_zone_issues)} sensörün zon etiketi konumuyla uyuşmuyor.")
+        with st.expander("Zon etiketi uyuşmazlıkları"):
+            st.dataframe(sensor_zone_issues, use_container_width=True, hide_index=True)
+
     st.divider()
     st.subheader("Zon KPI (BIOLOT)")
+    if hourly_coverage is not None:
+        st.caption(
+            f"HVAC saatlik simülasyon: {hourly_coverage}/{STEPS_PER_YEAR['1h']} saat sensör verisi, "
+            f"{out['hvac']['capped_steps']} saatte %30 sınırı; etkin oran %{out['hvac']['hvac_reduction_ratio'] * 100:.2f}"
+        )
     a1, a2 = st.columns(2)
     a1.metric("Zon Toplam CO2 (t/yıl)", f"{zone_kpi['total_ton']:.2f}")
     a2.metric("Zon Karbon Riski (€)", f"{zone_kpi['risk_eur']:.0f}")
@@ -217,240 +397,76 @@ def render_right_panel():
     d1.metric("Zon Toplam kWh", f"{zone_kpi['total_saved_kwh']:.0f}")
     d2.metric("Zon Toplam (€)", f"{zone_kpi['total_saved_eur']:.0f}")
 
+    with st.expander("Tüm zonlar (karşılaştırma)"):
+        st.dataframe(zone_table, use_container_width=True, hide_index=True)
+        st.download_button(
+            "⬇️ Zon KPI tablosu (CSV)",
+            data=zone_table.to_csv(index=False).encode("utf-8"),
+            file_name="biolot_zone_kpi.csv",
+            mime="text/csv",
+        )
+
     st.divider()
     with st.expander("Denetlenebilir çıktı (motor JSON)"):
         st.json(out)
 
 
+@timed("twin.render_map_mode")
 def render_map_mode():
-    center_lat, center_lon = centroid_latlon(selected_zone["polygon"])
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=17, control_scale=True)
-
-    if show_zones:
-        zones_fg = folium.FeatureGroup(name="Zonlar", show=True)
-        for z in zones:
-            poly = z.get("polygon", [])
-            if not poly:
-                continue
-            style = z.get("style", {})
-            color = style.get("color", "#2E7D32")
-            fill_color = style.get("fillColor", "#66BB6A")
-            fill_opacity = style.get("fillOpacity", 0.25)
-
-            folium.Polygon(
-                locations=poly,
-                color=color,
-                fill=True,
-                fill_color=fill_color,
-                fill_opacity=fill_opacity,
-                weight=3,
-                tooltip=z.get("name", "Zon"),
-            ).add_to(zones_fg)
-        zones_fg.add_to(m)
-
-    if show_sensors:
-        sens_fg = folium.FeatureGroup(name="Sensörler", show=True)
-        for s in sensors:
-            if "lat" not in s or "lon" not in s:
-                continue
-            folium.CircleMarker(
-                location=[s["lat"], s["lon"]],
-                radius=6,
-                color="#1565C0",
-                fill=True,
-                fill_color="#1E88E5",
-                fill_opacity=0.9,
-                tooltip=s.get("name", "Sensör"),
-            ).add_to(sens_fg)
-        sens_fg.add_to(m)
-
-    if show_heatmap:
-        heat_points = []
-        for s in sensors:
-            temp = s.get("last", {}).get("temp_c", None)
-            if temp is not None and "lat" in s and "lon" in s:
-                heat_points.append([s["lat"], s["lon"], float(temp)])
-
-        if heat_points:
-            hm_fg = folium.FeatureGroup(name="Isı Haritası (Temp)", show=True)
-            HeatMap(heat_points, radius=28, blur=20, min_opacity=0.25).add_to(hm_fg)
-            hm_fg.add_to(m)
-
-    folium.LayerControl(collapsed=False).add_to(m)
-    st_folium(m, height=620, width=None)
+    html = site_map_html(
+        DATA_KEY,
+        zones,
+        sensors,
+        centroid_latlon(selected_zone["polygon"]),
+        show_zones,
+        show_sensors,
+        show_heatmap,
+        (READING_KEY, field_kernel, field_power) if show_field else None,
+        temp_field if show_field else None,
+    )
+    components.html(html, height=620)
+
+
+@timed("twin.render_sensor_history")
+def render_sensor_history():
+    """Seçili zondaki sensörlerin sıcaklık geçmişi (uygun özet çözünürlüğünde)."""
+    placed = [s for s in sensors if "lat" in s and "lon" in s]
+    zone_sensors = [s for s, zid in zip(placed, sensor_zone_ids) if zid == selected_zone.get("id")]
+    if not zone_sensors:
+        return
+
+    st.subheader("Sensör Geçmişi")
+    hours = st.select_slider("Aralık", options=[1, 6, 24, 168, 720], value=24, format_func=lambda h: f"{h} saat")
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=hours)
+
+    series = {}
+    for s in zone_sensors:
+        level, data = ts_store.read_auto(s["id"], start, end, max_points=1500, fields=("temp_c",))
+        col = "temp_c" if level == "raw" else "temp_c.mean"
+        if len(data["ts"]):
+            idx = pd.to_datetime(data["ts"], unit="ms", utc=True)
+            series[s.get("name", s["id"])] = pd.Series(data[col], index=idx)
+
+    if series:
+        st.line_chart(pd.DataFrame(series), height=220)
+    else:
+        st.caption("Seçili aralıkta okuma yok.")
 
 
+@timed("twin.render_plan_mode")
 def render_plan_mode():
     img_path = load_plan_image_path()
     if not img_path:
         st.warning("assets/site_plan.png (veya .jpg) bulunamadı. Lütfen görseli 'assets' klasörüne yükle.")
         st.stop()
 
-    # ✅ Görseli numpy array'e çevir (go.Image için)
-    img = Image.open(img_path).convert("RGB")
-    arr = np.array(img)
-    height, width = arr.shape[0], arr.shape[1]
-
-    fig = go.Figure()
-
-    # ✅ Arka planı trace olarak koy (layout_image değil)
-    fig.add_trace(go.Image(z=arr))
-
-    clipped_polys = 0
-    clipped_points = 0
-
-    # ✅ Zonlar (polygon_px üstünden)
-    if show_zones:
-        for z in zones:
-            poly_px = z.get("polygon_px")
-            if not poly_px:
-                continue
-
-            xs, ys = [], []
-            before_clip = False
-
-            for p in poly_px:
-                x0 = float(p[0])
-                y0 = float(p[1])
-                x1, y1 = clamp_point_xy(x0, y0, width - 1, height - 1)
-                if x0 != x1 or y0 != y1:
-                    before_clip = True
-                xs.append(x1)
-                ys.append(y1)
-
-            # kapat
-            xs.append(xs[0])
-            ys.append(ys[0])
-
-            if before_clip:
-                clipped_polys += 1
-
-            fig.add_trace(
-                go.Scatter(
-                    x=xs,
-                    y=ys,
-                    mode="lines",
-                    name=z.get("name", "Zon"),
-                    line=dict(width=3),
-                )
-            )
-
-    # ✅ Sensörler (x/y plan koordinatı)
-    if show_sensors:
-        xs, ys, names = [], [], []
-        for s in sensors:
-            if "x" in s and "y" in s:
-                x0 = float(s["x"])
-                y0 = float(s["y"])
-                x1, y1 = clamp_point_xy(x0, y0, width - 1, height - 1)
-                if x0 != x1 or y0 != y1:
-                    clipped_points += 1
-                xs.append(x1)
-                ys.append(y1)
-                names.append(s.get("name", "Sensör"))
-
-        if xs:
-            fig.add_trace(
-                go.Scatter(
-                    x=xs,
-                    y=ys,
-                    mode="markers+text",
-                    text=names,
-                    textposition="top center",
-                    marker=dict(size=12),
-                    name="Sensörler",
-                )
-            )
-
-    # ✅ Piksel koordinatı: go.Image zaten (0,0) sol üst çalışır
-    # y eksenini ters çeviriyoruz ki pixel mantığı tam otursun
-    fig.update_xaxes(visible=False, range=[0, width - 1], fixedrange=True)
-    fig.update_yaxes(visible=False, range=[height - 1, 0], fixedrange=True, scaleanchor="x")
-
-    fig.update_layout(
-        height=650,
-        margin=dict(l=0, r=0, t=0, b=0),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+    # ✅ Statik iskelet (arka plan + zonlar) önbellekten; yalnızca sensör katmanı her rerun'da kurulur
+    fig, width, height, clipped_polys = plan_skeleton(
+        img_path, Path(img_path).stat().st_mtime_ns, DATA_KEY, zones, show_zones
     )
 
-    st.plotly_chart(fig, use_container_width=True)
-
-    if clipped_polys > 0 or clipped_points > 0:
-        st.warning(
-            f"Plan koordinatlarında taşma vardı ve otomatik düzeltildi. "
-            f"Zon (clamp): {clipped_polys} | Sensör (clamp): {clipped_points}."
-        )
-
-
-    # Zonlar (clamp ile sunumda taşma yok)
-    if show_zones:
-        for z in zones:
-            poly_px = z.get("polygon_px")
-            if not poly_px:
-                continue
-
-            xs, ys = [], []
-            before_clip = False
-            for p in poly_px:
-                x0, y0 = float(p[0]), float(p[1])
-                x1, y1 = clamp_point_xy(x0, y0, width, height)
-                if x0 != x1 or y0 != y1:
-                    before_clip = True
-                xs.append(x1)
-                ys.append(y1)
-
-            # kapat
-            xs.append(xs[0])
-            ys.append(ys[0])
-
-            if before_clip:
-                clipped_polys += 1
-
-            fig.add_trace(
-                go.Scatter(
-                    x=xs,
-                    y=ys,
-                    mode="lines",
-                    name=z.get("name", "Zon"),
-                    line=dict(width=3),
-                )
-            )
-
-    # Sensörler
-    if show_sensors:
-        xs, ys, names = [], [], []
-        for s in sensors:
-            if "x" in s and "y" in s:
-                x0, y0 = float(s["x"]), float(s["y"])
-                x1, y1 = clamp_point_xy(x0, y0, width, height)
-                if x0 != x1 or y0 != y1:
-                    clipped_points += 1
-                xs.append(x1)
-                ys.append(y1)
-                names.append(s.get("name", "Sensör"))
-
-        if xs:
-            fig.add_trace(
-                go.Scatter(
-                    x=xs,
-                    y=ys,
-                    mode="markers+text",
-                    text=names,
-                    textposition="top center",
-                    marker=dict(size=12),
-                    name="Sensörler",
-                )
-            )
-
-    # Piksel ekseni: (0,0) sol-üst gibi davranması için y ters
-    fig.update_xaxes(visible=False, range=[0, width], fixedrange=True)
-    fig.update_yaxes(visible=False, range=[height, 0], fixedrange=True, scaleanchor="x")
-
-    fig.update_layout(
-        height=650,
-        margin=dict(l=0, r=0, t=0, b=0),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
-    )
+    clipped_points = add_sensor_layer(fig, sensors, width, height) if show_sensors else 0
 
     st.plotly_chart(fig, use_container_width=True)
 
@@ -472,6 +488,9 @@ with left:
         render_map_mode()
     else:
         render_plan_mode()
+    render_sensor_history()
 
 with right:
     render_right_panel()
+
+end_rerun()
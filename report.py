@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from engine import BIOL0T_ENGINE_VERSION
+
+# -------------------------------
+# FONT SETUP (Türkçe karakterler için)
+# -------------------------------
+@lru_cache(maxsize=None)
+def setup_fonts():
+    """
+    Repo içinde şu dosyalar olmalı:
+      fonts/DejaVuSans.ttf
+      fonts/DejaVuSans-Bold.ttf
+    TTF kaydı süreç başına bir kez yapılır.
+    """
+    base_font = "Helvetica"
+    bold_font = "Helvetica-Bold"
+
+    try:
+        pdfmetrics.registerFont(TTFont("DejaVuSans", "fonts/DejaVuSans.ttf"))
+        pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", "fonts/DejaVuSans-Bold.ttf"))
+        base_font = "DejaVuSans"
+        bold_font = "DejaVuSans-Bold"
+    except Exception:
+        pass
+
+    return base_font, bold_font
+
+
+# -------------------------------
+# ETS (Scenario) helpers
+# -------------------------------
+def ets_projection(mode: str) -> pd.DataFrame:
+    years = [2026, 2027, 2028]
+    if mode == "Conservative":
+        prices = [25, 30, 35]
+    elif mode == "Aggressive":
+        prices = [60, 75, 90]
+    else:  # Base
+        prices = [40, 50, 60]
+    return pd.DataFrame({"Yıl": years, "Fiyat (€/tCO2)": prices})
+
+
+def ets_disclaimer_text() -> str:
+    return (
+        "Bu bölüm **senaryo amaçlıdır**. Resmi ETS/karbon vergisi metodolojisi yürürlüğe girdiğinde "
+        "hesaplama parametreleri ve raporlama formatı **resmi metodolojiye göre güncellenecektir**."
+    )
+
+
+# -------------------------------
+# PDF BUILDER (STABLE)
+# -------------------------------
+PDF_TABLE_COLUMNS = {
+    "tesis_id": ("Tesis", None),
+    "toplam_emisyon_ton": ("Top.Emis(t)", "{:,.1f}"),
+    "scope1_ton": ("S1(t)", "{:,.1f}"),
+    "scope2_ton": ("S2(t)", "{:,.1f}"),
+    "tasarruf_eur": ("Tasarr(€)", "{:,.0f}"),
+    "tasarruf_kwh": ("Tasarr(kWh)", "{:,.0f}"),
+}
+PDF_TABLE_COL_WIDTHS = [70, 80, 60, 60, 70, 90]
+PDF_PREVIEW_ROWS = 15
+PDF_ROWS_PER_TABLE = 40  # A4'te 8pt satırla bir sayfaya sığan blok
+
+
+def _computed_at_text(portfolio: dict) -> str | None:
+    raw = (portfolio.get("meta") or {}).get("generated_at")
+    if not raw:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(raw))
+    except ValueError:
+        return str(raw)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+def _report_head(portfolio: dict, ets_price: float, ets_mode: str, base_font: str, bold_font: str, styles) -> list:
+    story = []
+
+    # Gövdede yalnızca portföyün hesaplanma zamanı yer alır (önbellek anahtarının parçası);
+    # indirme anındaki saat önbellekteki dosyada bayatlayacağından yazılmaz
+    computed_at = _computed_at_text(portfolio)
+
+    story.append(Paragraph(f"<font name='{bold_font}'>BIOLOT – Portföy Raporu</font>", styles["Title"]))
+    story.append(Spacer(1, 10))
+    if computed_at:
+        story.append(Paragraph(f"<font name='{base_font}'>Portföy hesaplama zamanı: {computed_at}</font>", styles["Normal"]))
+    story.append(Paragraph(f"<font name='{base_font}'>Motor Versiyonu: {BIOL0T_ENGINE_VERSION}</font>", styles["Normal"]))
+    story.append(Spacer(1, 12))
+
+    totals = portfolio["portfolio_totals"]
+
+    # --- KPI TABLOSU ---
+    kpi_data = [
+        ["Gösterge", "Değer"],
+        ["Toplam Emisyon (tCO2e/yıl)", f"{totals['total_ton']:.2f}"],
+        ["Scope 1 (t/yıl)", f"{totals['scope1_ton']:.2f}"],
+        ["Scope 2 (t/yıl)", f"{totals['scope2_ton']:.2f}"],
+        ["Toplam Enerji Tasarrufu (kWh/yıl)", f"{totals['total_saved_kwh']:.0f}"],
+        ["Toplam Kaçınılan Maliyet (€ / yıl)", f"{totals['total_saved_eur']:.2f}"],
+        ["Toplam Önlenen CO2 (t/yıl)", f"{totals['total_saved_co2_ton']:.3f}"],
+    ]
+
+    t = Table(kpi_data, hAlign="LEFT", colWidths=[240, 250])
+    t.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTNAME", (0, 0), (-1, 0), bold_font),
+        ("FONTNAME", (0, 1), (-1, -1), base_font),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("PADDING", (0, 0), (-1, -1), 6),
+    ]))
+    story.append(t)
+    story.append(Spacer(1, 12))
+
+    # --- ETS SECTION ---
+    total_tco2 = float(totals["total_ton"])
+    ets_liability = total_tco2 * float(ets_price)
+    df_proj = ets_projection(ets_mode)
+
+    story.append(Paragraph(
+        f"<font name='{bold_font}'>Karbon Vergisi / ETS Hazırlık Modülü (Senaryo)</font>",
+        styles["Heading2"]
+    ))
+    story.append(Spacer(1, 6))
+
+    ets_table = [
+        ["Gösterge", "Değer"],
+        ["Toplam Emisyon (tCO2e/yıl)", f"{total_tco2:.2f}"],
+        ["Seçili Karbon Fiyatı (€/tCO2)", f"{float(ets_price):.2f}"],
+        ["Tahmini Yükümlülük (€)", f"{ets_liability:.0f}"],
+        ["Senaryo", str(ets_mode)],
+    ]
+    t_ets = Table(ets_table, hAlign="LEFT", colWidths=[240, 250])
+    t_ets.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTNAME", (0, 0), (-1, 0), bold_font),
+        ("FONTNAME", (0, 1), (-1, -1), base_font),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("PADDING", (0, 0), (-1, -1), 6),
+    ]))
+    story.append(t_ets)
+    story.append(Spacer(1, 8))
+
+    proj_table = [["Yıl", "Fiyat (€/tCO2)"]] + df_proj.values.tolist()
+    t_proj = Table(proj_table, hAlign="LEFT", colWidths=[80, 120])
+    t_proj.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTNAME", (0, 0), (-1, 0), bold_font),
+        ("FONTNAME", (0, 1), (-1, -1), base_font),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("PADDING", (0, 0), (-1, -1), 6),
+    ]))
+    story.append(t_proj)
+    story.append(Spacer(1, 6))
+
+    story.append(Paragraph(f"<font name='{base_font}'>{ets_disclaimer_text()}</font>", styles["Normal"]))
+    story.append(Spacer(1, 12))
+
+    return story
+
+
+def _format_columns(df: pd.DataFrame) -> tuple[list, list]:
+    """
+    Kolon bazlı biçimlendirme: sayısal dönüşüm tüm kolon için tek seferde,
+    metin biçimi str.format'ın kolon listesine map edilmesiyle yapılır
+    (satır başına lambda / DataFrame kopyası yok).
+    """
+    header, columns = [], []
+    for src, (label, fmt) in PDF_TABLE_COLUMNS.items():
+        if src not in df.columns:
+            continue
+        header.append(label)
+        if fmt is None:
+            columns.append(df[src].astype(str).tolist())
+        else:
+            values = pd.to_numeric(df[src], errors="coerce").to_numpy(dtype=np.float64, na_value=0.0)
+            columns.append(list(map(fmt.format, np.nan_to_num(values).tolist())))
+    return header, columns
+
+
+def _facility_tables(df: pd.DataFrame, base_font: str, bold_font: str, rows_per_table: int):
+    """Tesis tablosunu sayfalık bloklar halinde üretir (her blok başlık satırını tekrarlar)."""
+    style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONTNAME", (0, 0), (-1, 0), bold_font),
+        ("FONTNAME", (0, 1), (-1, -1), base_font),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("PADDING", (0, 0), (-1, -1), 4),
+        ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+    ])
+    for start in range(0, len(df), rows_per_table):
+        header, columns = _format_columns(df.iloc[start:start + rows_per_table])
+        t2 = Table([header] + [list(r) for r in zip(*columns)], hAlign="LEFT",
+                   colWidths=PDF_TABLE_COL_WIDTHS[:len(header)], repeatRows=1)
+        t2.setStyle(style)
+        yield t2
+
+
+class _LazyStory(list):
+    """
+    ReportLab'in build döngüsü listeyi baştan tüketir (len / [0] / del [0]).
+    Bu liste, boyu `low_water` altına düştükçe kalan flowable'ları üreteçten
+    çeker; böylece 20k satırlık tablo bloklarının hepsi aynı anda bellekte olmaz.
+    """
+
+    def __init__(self, head, tail, low_water=4):
+        super().__init__(head)
+        self._tail = tail
+        self._low_water = low_water
+
+    def __len__(self):
+        while self._tail is not None and list.__len__(self) < self._low_water:
+            try:
+                self.append(next(self._tail))
+            except StopIteration:
+                self._tail = None
+        return list.__len__(self)
+
+
+def write_portfolio_pdf(out, portfolio: dict, df: pd.DataFrame, ets_price: float, ets_mode: str,
+                        full_table: bool = True, rows_per_table: int = PDF_ROWS_PER_TABLE) -> None:
+    """
+    Portföy raporunu `out`a (dosya yolu ya da ikili akış) yazar.
+    full_table=True: tüm tesisler sayfa sayfa; False: ilk PDF_PREVIEW_ROWS satır.
+    """
+    base_font, bold_font = setup_fonts()
+    styles = getSampleStyleSheet()
+    story = _report_head(portfolio, ets_price, ets_mode, base_font, bold_font, styles)
+
+    # --- TESİS ÖZETİ TABLOSU (SAYFA TAŞMASINI ÖNLEYEN VERSİYON) ---
+    story.append(Paragraph(f"<font name='{bold_font}'>Tesis Özeti (Tablo)</font>", styles["Heading2"]))
+    story.append(Spacer(1, 6))
+
+    tables = iter(())
+    if len(df) > 0:
+        df_pdf = df if full_table else df.head(PDF_PREVIEW_ROWS)
+        tables = _facility_tables(df_pdf, base_font, bold_font, rows_per_table)
+    else:
+        story.append(Paragraph(f"<font name='{base_font}'>Tablo için veri yok.</font>", styles["Normal"]))
+
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        title="BIOLOT Portföy Raporu",
+        leftMargin=24,
+        rightMargin=24,
+        topMargin=24,
+        bottomMargin=24,
+    )
+    doc.build(_LazyStory(story, tables))
+
+
+def build_portfolio_pdf_bytes(portfolio: dict, df: pd.DataFrame, ets_price: float, ets_mode: str,
+                              full_table: bool = False) -> bytes:
+    buf = BytesIO()
+    write_portfolio_pdf(buf, portfolio, df, ets_price, ets_mode, full_table=full_table)
+    return buf.getvalue()
+
+
+def portfolio_digest(portfolio: dict) -> str:
+    """Portföy içeriğinin kanonik SHA-256 özeti (PDF önbellek anahtarı)."""
+    canonical = json.dumps(portfolio, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), "biolot_pdf_cache")
+
+
+def portfolio_pdf_path(portfolio: dict, df: pd.DataFrame, ets_price: float, ets_mode: str,
+                       portfolio_hash: str | None = None, cache_dir: str = PDF_CACHE_DIR,
+                       max_files: int = 32) -> str:
+    """
+    Tam tablolu raporu içerik-adresli disk önbelleğine yazar ve yolunu döner.
+    Anahtar: (portföy özeti, ets_price, ets_mode, motor versiyonu). Aynı anahtar
+    tekrar istenirse dosya yeniden üretilmez; en eski dosyalar `max_files`
+    sınırında silinir.
+    """
+    portfolio_hash = portfolio_hash or portfolio_digest(portfolio)
+    key = hashlib.sha256(
+        f"{portfolio_hash}|{float(ets_price)!r}|{ets_mode}|{BIOL0T_ENGINE_VERSION}".encode("utf-8")
+    ).hexdigest()[:32]
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.pdf")
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    # Oturumlar aynı süreçte iş parçacığıdır: her üretim kendi geçici dosyasına yazar
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=f"{key}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_portfolio_pdf(f, portfolio, df, ets_price, ets_mode, full_table=True)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    cached = sorted(
+        (os.path.join(cache_dir, n) for n in os.listdir(cache_dir) if n.endswith(".pdf")),
+        key=os.path.getmtime,
+    )
+    for old in cached[:-max_files]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return path
@@ -0,0 +1,232 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+# -------------------------------
+# Ayarlar (ortam değişkenleri)
+# -------------------------------
+# BIOLOT_TRACE: boş/0 = kapalı (varsayılan), 1/jsonl = JSONL, prom = Prometheus metin dosyası
+# BIOLOT_METRICS_FILE: çıktı yolu (varsayılan metrics/reruns.jsonl ya da metrics/biolot.prom)
+# BIOLOT_TRACE_KEEP: bellekte tutulan son rerun sayısı (debug paneli için)
+TRACE_MODE = os.environ.get("BIOLOT_TRACE", "").strip().lower()
+if TRACE_MODE in ("", "0", "false", "off", "no"):
+    TRACE_MODE = ""
+elif TRACE_MODE != "prom":
+    TRACE_MODE = "jsonl"
+ENABLED = bool(TRACE_MODE)
+
+METRICS_FILE = os.environ.get(
+    "BIOLOT_METRICS_FILE",
+    os.path.join("metrics", "biolot.prom" if TRACE_MODE == "prom" else "reruns.jsonl"),
+)
+KEEP_RERUNS = int(os.environ.get("BIOLOT_TRACE_KEEP", "50"))
+
+
+class _NullSpan:
+    """Kapalıyken dönen paylaşılan no-op bağlam yöneticisi."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Rerun:
+    """Tek bir script çalıştırmasının span toplamları."""
+
+    __slots__ = ("script", "key", "started", "started_at", "spans")
+
+    def __init__(self, script, key):
+        self.script = script
+        self.key = key
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.spans = {}
+
+    def add(self, name, seconds):
+        acc = self.spans.get(name)
+        if acc is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            acc[0] += seconds
+            acc[1] += 1
+
+    def record(self, complete):
+        return {
+            "ts": self.started_at,
+            "script": self.script,
+            "complete": complete,
+            "total_ms": (time.perf_counter() - self.started) * 1000.0,
+            "spans": {k: {"ms": v[0] * 1000.0, "count": v[1]} for k, v in self.spans.items()},
+        }
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _add_span(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+_local = threading.local()
+_open = {}  # oturum anahtarı -> açık rerun
+_recent = deque(maxlen=KEEP_RERUNS)
+_prom_totals = {}  # (script, span) -> [saniye, adet]
+_prom_reruns = {}  # script -> [saniye, adet]
+_lock = threading.Lock()
+
+
+def span(name):
+    """
+    Bölüm zamanlayıcısı: `with span("engine.run_portfolio"): ...`
+    Kapalıyken paylaşılan no-op nesne döner (ek iş yok).
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name=None):
+    """Fonksiyon dekoratörü; kapalıyken fonksiyonu olduğu gibi döner (sıfır ek yük)."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add_span(label, time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+def begin_rerun(script, key=None):
+    """
+    Rerun başlangıcı. Aynı anahtarla (ör. Streamlit oturum kimliği) açık kalmış bir
+    rerun varsa (st.stop / yeniden çalıştırma ile yarıda kesilmiş) önce tamamlanmamış
+    olarak kaydedilir.
+    """
+    if not ENABLED:
+        return
+    rerun = _Rerun(script, key)
+    with _lock:
+        stale = _open.pop(key, None) if key is not None else None
+        if key is not None:
+            _open[key] = rerun
+    if stale is not None:
+        _finish(stale, complete=False)
+    _local.current = rerun
+
+
+def end_rerun():
+    """Geçerli rerun'u kapatır ve kaydeder. Döner: kayıt sözlüğü (kapalıyken None)."""
+    if not ENABLED:
+        return None
+    rerun = getattr(_local, "current", None)
+    if rerun is None:
+        return None
+    _local.current = None
+    with _lock:
+        if _open.get(rerun.key) is rerun:
+            del _open[rerun.key]
+    return _finish(rerun, complete=True)
+
+
+def recent_reruns(n=None):
+    """Son rerun kayıtları (en yeni sonda)."""
+    with _lock:
+        items = list(_recent)
+    return items if n is None else items[-n:]
+
+
+def _add_span(name, seconds):
+    rerun = getattr(_local, "current", None)
+    if rerun is not None:
+        rerun.add(name, seconds)
+        return
+    # Rerun dışındaki çağrılar (ör. indirme tıklamasıyla üretilen PDF) tek başına kaydedilir
+    solo = _Rerun("-", None)
+    solo.add(name, seconds)
+    _finish(solo, complete=True)
+
+
+def _finish(rerun, complete):
+    record = rerun.record(complete)
+    with _lock:
+        _recent.append(record)
+        if TRACE_MODE == "prom":
+            tot = _prom_reruns.setdefault(record["script"], [0.0, 0])
+            tot[0] += record["total_ms"] / 1000.0
+            tot[1] += 1
+            for name, v in record["spans"].items():
+                acc = _prom_totals.setdefault((record["script"], name), [0.0, 0])
+                acc[0] += v["ms"] / 1000.0
+                acc[1] += v["count"]
+        try:
+            _write(record)
+        except OSError:
+            pass  # ölçüm yazılamazsa uygulama etkilenmez
+    return record
+
+
+def _write(record):
+    parent = os.path.dirname(METRICS_FILE)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if TRACE_MODE == "jsonl":
+        with open(METRICS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return
+
+    lines = [
+        "# HELP biolot_rerun_seconds_total Script çalıştırmalarının toplam süresi.",
+        "# TYPE biolot_rerun_seconds_total counter",
+    ]
+    lines += [f'biolot_rerun_seconds_total{{script="{s}"}} {v[0]:.6f}' for s, v in sorted(_prom_reruns.items())]
+    lines += ["# TYPE biolot_reruns_total counter"]
+    lines += [f'biolot_reruns_total{{script="{s}"}} {v[1]}' for s, v in sorted(_prom_reruns.items())]
+    lines += [
+        "# HELP biolot_span_seconds_total Bölüm (span) başına toplam süre.",
+        "# TYPE biolot_span_seconds_total counter",
+    ]
+    lines += [f'biolot_span_seconds_total{{script="{s}",span="{n}"}} {v[0]:.6f}' for (s, n), v in sorted(_prom_totals.items())]
+    lines += ["# TYPE biolot_span_calls_total counter"]
+    lines += [f'biolot_span_calls_total{{script="{s}",span="{n}"}} {v[1]}' for (s, n), v in sorted(_prom_totals.items())]
+    tmp = f"{METRICS_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, METRICS_FILE)
+
+
+def breakdown_frame(n=20):
+    """Son `n` rerun'un span dökümü (satır: rerun, kolon: span ms) — debug paneli için."""
+    import pandas as pd
+
+    rows = []
+    for r in recent_reruns(n):
+        row = {"ts": r["ts"][11:19], "script": r["script"], "toplam_ms": round(r["total_ms"], 1)}
+        row.update({k: round(v["ms"], 1) for k, v in r["spans"].items()})
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,195 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+import engine
+from engine import ENGINE_INPUT_COLUMNS, ENGINE_OUTPUT_COLUMNS, HVAC_REDUCTION_CAP, kernel
+from engine import run_batch, run_biolot, run_biolot_batch, run_scalar
+from engine.carbon import calc_scope12 as carbon_calc_scope12
+from engine.engine.engine.water import calc_water_savings as legacy_calc_water_savings
+from engine.engine.hvac import calc_hvac_savings_simple as legacy_calc_hvac_savings_simple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_engine_py():
+    # Kökteki engine.py, engine/ paketi tarafından gölgelenir; dosyadan yüklenir
+    spec = importlib.util.spec_from_file_location("biolot_engine_py", os.path.join(REPO_ROOT, "engine.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+engine_py = _load_engine_py()
+
+BASE = {
+    "electricity_kwh_year": 2_500_000.0,
+    "natural_gas_m3_year": 180_000.0,
+    "area_m2": 12_000.0,
+    "carbon_price": 85.5,
+    "grid_factor": 0.43,
+    "gas_factor": 2.0,
+    "delta_t": 2.4,
+    "energy_sensitivity": 0.04,
+    "beta": 0.5,
+    "water_baseline": 12_000.0,
+    "water_actual": 8_000.0,
+    "pump_kwh_per_m3": 0.4,
+}
+
+# Sınır durumları: negatif ΔT, %30 sınırının üstü, referansı aşan su, sıfır tüketim
+EDGE_ROWS = {
+    "base": BASE,
+    "negative_delta_t": dict(BASE, delta_t=-3.0),
+    "zero_delta_t": dict(BASE, delta_t=0.0),
+    "above_cap": dict(BASE, delta_t=1e3),
+    "at_cap": dict(BASE, delta_t=15.0),
+    "water_over_baseline": dict(BASE, water_actual=BASE["water_baseline"] + 1.0),
+    "zero_consumption": dict(
+        BASE, electricity_kwh_year=0.0, natural_gas_m3_year=0.0, water_baseline=0.0, water_actual=0.0
+    ),
+}
+
+
+def random_inputs(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = {
+        "electricity_kwh_year": rng.uniform(0.0, 2e7, n),
+        "natural_gas_m3_year": rng.uniform(0.0, 2e6, n),
+        "area_m2": rng.uniform(1.0, 1e5, n),
+        "carbon_price": rng.uniform(0.0, 200.0, n),
+        "grid_factor": rng.uniform(0.0, 1.0, n),
+        "gas_factor": rng.uniform(0.0, 3.0, n),
+        "delta_t": rng.uniform(-5.0, 15.0, n),
+        "energy_sensitivity": rng.uniform(0.0, 0.2, n),
+        "beta": rng.uniform(0.0, 1.5, n),
+        "water_baseline": rng.uniform(0.0, 5e4, n),
+        "water_actual": rng.uniform(0.0, 5e4, n),
+        "pump_kwh_per_m3": rng.uniform(0.0, 2.0, n),
+    }
+    # Sınır satırları da kolonlara eklenir
+    for row in EDGE_ROWS.values():
+        for c in ENGINE_INPUT_COLUMNS:
+            cols[c] = np.append(cols[c], row[c])
+    return cols
+
+
+def rows_of(cols):
+    return [dict(zip(ENGINE_INPUT_COLUMNS, r)) for r in zip(*(cols[c].tolist() for c in ENGINE_INPUT_COLUMNS))]
+
+
+def flatten_run_biolot(out):
+    c, h, w, t = out["carbon"], out["hvac"], out["water"], out["total_operational_gain"]
+    return (
+        c["scope1_ton"], c["scope2_ton"], c["total_ton"], c["risk_eur"],
+        h["hvac_reduction_ratio"], h["saved_kwh"], h["saved_co2_ton"], h["saved_eur"],
+        w["saved_water_m3"], w["saved_pump_kwh"], w["saved_co2_ton"], w["saved_eur"],
+        t["total_saved_kwh"], t["total_saved_co2_ton"], t["total_saved_eur"],
+    )
+
+
+# =========================
+# Skaler / toplu yol paritesi
+# =========================
+def test_scalar_batch_and_wrappers_bit_identical():
+    cols = random_inputs()
+    rows = rows_of(cols)
+    batch = run_batch(cols)
+    wrapped_batch = run_biolot_batch(cols)
+    scalar = np.array([run_scalar(**r) for r in rows], dtype=np.float64)
+    wrapped = np.array([flatten_run_biolot(run_biolot(**r)) for r in rows], dtype=np.float64)
+
+    for j, name in enumerate(ENGINE_OUTPUT_COLUMNS):
+        np.testing.assert_array_equal(scalar[:, j], batch[name], err_msg=name)
+        np.testing.assert_array_equal(wrapped[:, j], batch[name], err_msg=name)
+        np.testing.assert_array_equal(wrapped_batch[name], batch[name], err_msg=name)
+
+
+# =========================
+# Eski sarmalayıcılar
+# =========================
+@pytest.mark.parametrize("case", sorted(EDGE_ROWS))
+def test_scope12_wrappers(case):
+    r = EDGE_ROWS[case]
+    expected = dict(zip(
+        ("scope1_ton", "scope2_ton", "total_ton", "risk_eur"),
+        kernel.scope12(r["electricity_kwh_year"], r["natural_gas_m3_year"], r["grid_factor"], r["gas_factor"],
+                       r["carbon_price"]),
+    ))
+    args = (r["electricity_kwh_year"], r["natural_gas_m3_year"], r["grid_factor"], r["gas_factor"], r["carbon_price"])
+    for fn in (engine.calc_scope12, carbon_calc_scope12, engine_py.calc_scope12):
+        assert fn(*args) == expected, fn.__module__
+    assert run_biolot(**r)["carbon"] == expected
+
+
+@pytest.mark.parametrize("case", sorted(EDGE_ROWS))
+def test_hvac_wrappers(case):
+    r = EDGE_ROWS[case]
+    ratio, saved_kwh, saved_co2_ton, saved_eur = kernel.hvac(
+        r["electricity_kwh_year"], r["delta_t"], r["energy_sensitivity"], r["beta"], r["grid_factor"],
+        r["carbon_price"],
+    )
+    expected = {"hvac_reduction_ratio": ratio, "saved_kwh": saved_kwh, "saved_co2_ton": saved_co2_ton,
+                "saved_eur": saved_eur}
+    args = (r["electricity_kwh_year"], r["delta_t"], r["energy_sensitivity"], r["beta"], r["grid_factor"],
+            r["carbon_price"])
+    assert engine.calc_hvac_savings_simple(*args) == expected
+    assert engine_py.calc_hvac_savings_simple(*args) == expected
+    # engine/engine/hvac.py eski 'reduction_ratio' anahtarını da korur
+    assert legacy_calc_hvac_savings_simple(*args) == dict(expected, reduction_ratio=ratio)
+    assert run_biolot(**r)["hvac"] == expected
+
+
+@pytest.mark.parametrize("case", sorted(EDGE_ROWS))
+def test_water_wrappers(case):
+    r = EDGE_ROWS[case]
+    expected = dict(zip(
+        ("saved_water_m3", "saved_pump_kwh", "saved_co2_ton", "saved_eur"),
+        kernel.water(r["water_baseline"], r["water_actual"], r["pump_kwh_per_m3"], r["grid_factor"],
+                     r["carbon_price"]),
+    ))
+    args = (r["water_baseline"], r["water_actual"], r["pump_kwh_per_m3"], r["grid_factor"], r["carbon_price"])
+    for fn in (engine.calc_water_savings, legacy_calc_water_savings, engine_py.calc_water_savings):
+        assert fn(*args) == expected, fn.__module__
+    assert run_biolot(**r)["water"] == expected
+
+
+def test_engine_py_keeps_its_defaults():
+    # engine.py'nin varsayılan karbon fiyatı 85.0 (engine/__init__.py: 85.5)
+    assert engine_py.calc_scope12(1000.0, 0.0)["risk_eur"] == kernel.scope12(1000.0, 0.0, 0.43, 2.0, 85.0)[3]
+    assert engine.calc_scope12(1000.0, 0.0)["risk_eur"] == kernel.scope12(1000.0, 0.0, 0.43, 2.0, 85.5)[3]
+
+
+# =========================
+# Sınır durumlarının anlamı
+# =========================
+HVAC_FUNCS = (engine.calc_hvac_savings_simple, legacy_calc_hvac_savings_simple, engine_py.calc_hvac_savings_simple)
+WATER_FUNCS = (engine.calc_water_savings, legacy_calc_water_savings, engine_py.calc_water_savings)
+
+
+@pytest.mark.parametrize("fn", HVAC_FUNCS)
+def test_negative_delta_t_is_clamped_to_zero(fn):
+    out = fn(2_500_000.0, -3.0, 0.04, 0.5, 0.43, 85.5)
+    assert out["hvac_reduction_ratio"] == 0.0
+    assert out["saved_kwh"] == 0.0 and out["saved_eur"] == 0.0
+
+
+@pytest.mark.parametrize("fn", HVAC_FUNCS)
+def test_ratio_above_cap_is_clamped(fn):
+    out = fn(2_500_000.0, 1e3, 0.04, 0.5, 0.43, 85.5)
+    assert out["hvac_reduction_ratio"] == HVAC_REDUCTION_CAP
+    assert out["saved_kwh"] == 2_500_000.0 * HVAC_REDUCTION_CAP
+
+
+@pytest.mark.parametrize("fn", WATER_FUNCS)
+def test_water_over_baseline_saves_nothing(fn):
+    out = fn(12_000.0, 12_001.0, 0.4, 0.43, 85.5)
+    assert out == {"saved_water_m3": 0.0, "saved_pump_kwh": 0.0, "saved_co2_ton": 0.0, "saved_eur": 0.0}
+
+
+def test_zero_consumption_is_all_zero():
+    out = run_scalar(**EDGE_ROWS["zero_consumption"])
+    ratio_idx = ENGINE_OUTPUT_COLUMNS.index("hvac_reduction_ratio")
+    assert all(v == 0.0 for j, v in enumerate(out) if j != ratio_idx)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from engine import montecarlo
+from engine.montecarlo import MC_METRICS, run_biolot_montecarlo
+
+INPUTS = {
+    "electricity_kwh_year": 2_500_000.0,
+    "natural_gas_m3_year": 180_000.0,
+    "area_m2": 12_000.0,
+    "carbon_price": 85.5,
+    "grid_factor": 0.43,
+    "gas_factor": 2.0,
+    "delta_t": 2.4,
+    "energy_sensitivity": 0.04,
+    "beta": 0.5,
+    "water_baseline": 12_000.0,
+    "water_actual": 8_000.0,
+    "pump_kwh_per_m3": 0.4,
+}
+
+
+def test_unseeded_run_histograms_every_sample(monkeypatch):
+    # seed=None: iki geçiş aynı örnekleri görmeli; histogram dışında kalan örnek olmamalı
+    histogrammed = {}
+    real = montecarlo._hist_percentile
+
+    def spy(counts, edges, q):
+        histogrammed.setdefault(id(counts), int(counts.sum()))
+        return real(counts, edges, q)
+
+    monkeypatch.setattr(montecarlo, "_hist_percentile", spy)
+    # Farklı örnekler tek koşuda ~%25 olasılıkla yine aralığa sığar; birkaç koşu hatayı kesinleştirir
+    for _ in range(8):
+        histogrammed.clear()
+        out = run_biolot_montecarlo(INPUTS, n_samples=200, chunk_size=50, seed=None)
+
+        assert len(histogrammed) == len(MC_METRICS)
+        assert all(n == 200 for n in histogrammed.values())
+        for m in MC_METRICS:
+            row = out["metrics"][m]
+            assert row["min"] <= row["p10"] <= row["p50"] <= row["p90"] <= row["max"]
+
+
+def test_reported_seed_reproduces_unseeded_run():
+    first = run_biolot_montecarlo(INPUTS, n_samples=500, chunk_size=64, seed=None)
+    again = run_biolot_montecarlo(INPUTS, n_samples=500, chunk_size=64, seed=first["seed"])
+    assert again["seed"] == first["seed"]
+    assert again["metrics"] == first["metrics"]
+
+
+def test_explicit_seed_is_reported_unchanged():
+    out = run_biolot_montecarlo(INPUTS, n_samples=100, seed=0)
+    assert out["seed"] == 0
+    assert np.isfinite(out["metrics"]["total_saved_eur"]["p50"])
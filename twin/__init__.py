@@ -0,0 +1,10 @@
+# twin package (dijital ikiz yardımcıları)
+
+from twin.tiles import PYRAMID_DIR, TILE_SIZE, build_pyramid, ensure_pyramid, level_data_uri, load_level, pick_level
+from twin.maplayers import build_site_map, heat_rows, sensor_rows, zones_geojson
+from twin.spatial import ZoneIndex, latlon_projector, validate_sensor_zones
+from twin.timeseries import ROLLUP_LEVELS, SENSOR_FIELDS, SensorTimeSeriesStore, to_epoch_ms
+from twin.raster import IDW_KERNELS, idw_interpolate, raster_to_png_uri, readings_key, zone_temperature_raster
+from twin.allocation import ALLOCATION_SCHEMES, ALLOCATION_WEIGHTS, ZONE_KPI_KEYS, allocate_zone_kpis, zone_weights
+from twin.sitedata import SiteData, SiteDataError, file_signature, load_site_data
+from twin.planfig import add_sensor_layer, clamp_xy, plan_figure
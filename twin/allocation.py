@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# Zon KPI'ı -> (motor çıktısı bölümü, anahtar, varsayılan ağırlık)
+ZONE_KPI_SOURCES = {
+    "total_ton": ("carbon", "total_ton"),
+    "risk_eur": ("carbon", "risk_eur"),
+    "hvac_saved_kwh": ("hvac", "saved_kwh"),
+    "hvac_saved_eur": ("hvac", "saved_eur"),
+    "water_saved_m3": ("water", "saved_water_m3"),
+    "pump_saved_kwh": ("water", "saved_pump_kwh"),
+    "water_saved_eur": ("water", "saved_eur"),
+}
+ZONE_KPI_KEYS = tuple(ZONE_KPI_SOURCES) + ("total_saved_kwh", "total_saved_eur")
+
+ALLOCATION_WEIGHTS = ("area", "temp_excess", "soil_moisture", "flow")
+
+# Hazır dağıtım şemaları: KPI grubu -> ağırlık
+ALLOCATION_SCHEMES = {
+    "area": {"carbon": "area", "hvac": "area", "water": "area"},
+    "sensor": {"carbon": "area", "hvac": "temp_excess", "water": "flow"},
+}
+
+RISK_LEVELS = (50000.0, 20000.0)  # YÜKSEK / ORTA eşikleri (€)
+
+
+def _zone_sensor_means(n_zones, zone_idx, values):
+    """Sensör değerlerinin zon ortalaması (sensörsüz zon NaN). Tek bincount geçişi."""
+    ok = (zone_idx >= 0) & np.isfinite(values)
+    counts = np.bincount(zone_idx[ok], minlength=n_zones)
+    sums = np.bincount(zone_idx[ok], weights=values[ok], minlength=n_zones)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan), sums
+
+
+def zone_weights(zones, sensors, sensor_zone_ids, temp_ref=None):
+    """
+    Zon başına ham ağırlıklar (normalize edilmemiş), her biri (Z,) dizi.
+
+    - area: zon alanı (m²)
+    - temp_excess: alan × max(zon ort. sıcaklık - referans, 0); referans verilmezse
+      saha ortalaması. Sıcak zonlar HVAC tasarrufundan daha çok pay alır.
+    - soil_moisture: alan × zon ort. toprak nemi (%) — sulanan alan payı
+    - flow: zondaki sensörlerin toplam debisi (L/dk)
+    Sensörü olmayan zonlarda sensör ölçümü saha ortalamasıyla doldurulur.
+    `sensor_zone_ids` sensörlerle aynı sırada hesaplanmış zone_id listesidir.
+    """
+    ids = [z.get("id") for z in zones]
+    pos = {zid: i for i, zid in enumerate(ids)}
+    n = len(zones)
+    area = np.array([float(z.get("area_m2", 0) or 0) for z in zones], dtype=np.float64)
+    zone_idx = np.array([pos.get(zid, -1) for zid in sensor_zone_ids], dtype=np.int64)
+
+    def field(name):
+        return np.array(
+            [np.nan if (s.get("last") or {}).get(name) is None else float(s["last"][name]) for s in sensors],
+            dtype=np.float64,
+        )
+
+    temp, _ = _zone_sensor_means(n, zone_idx, field("temp_c"))
+    moist, _ = _zone_sensor_means(n, zone_idx, field("soil_moist_pct"))
+    _, flow = _zone_sensor_means(n, zone_idx, field("flow_lpm"))
+
+    site_temp = np.nanmean(temp) if np.isfinite(temp).any() else 0.0
+    temp = np.where(np.isfinite(temp), temp, site_temp)
+    moist = np.where(np.isfinite(moist), moist, np.nanmean(moist) if np.isfinite(moist).any() else 0.0)
+    ref = site_temp if temp_ref is None else float(temp_ref)
+
+    return {
+        "area": area,
+        "temp_excess": area * np.maximum(temp - ref, 0.0),
+        "soil_moisture": area * moist,
+        "flow": flow,
+    }
+
+
+def _shares(weights):
+    """Ağırlıkları paya çevirir; toplamı 0 olan ağırlık alan payına düşer."""
+    area = weights["area"]
+    area_share = area / area.sum() if area.sum() > 0 else np.full(len(area), 1.0 / max(len(area), 1))
+    out = {}
+    for name, w in weights.items():
+        total = w.sum()
+        out[name] = w / total if total > 0 else area_share
+    return out
+
+
+def allocate_zone_kpis(out, zones, weights, scheme="area"):
+    """
+    Motor çıktısını tüm zonlara tek matris işlemiyle dağıtır.
+
+    `weights` = zone_weights(...) sonucu; `scheme` ALLOCATION_SCHEMES anahtarı ya da
+    {"carbon"|"hvac"|"water": ağırlık adı} sözlüğü. Toplam tasarruf kalemleri
+    HVAC + su bileşenlerinin zon payları toplanarak bulunur (motorla aynı tanım).
+    Döner: zon başına bir satırlık DataFrame (zone_id, name, area_m2, share_*, KPI'lar, risk_flag).
+    """
+    plan = ALLOCATION_SCHEMES[scheme] if isinstance(scheme, str) else dict(scheme)
+    shares = _shares(weights)
+
+    keys = list(ZONE_KPI_SOURCES)
+    totals = np.array(
+        [float((out.get(section) or {}).get(key, 0.0)) for section, key in ZONE_KPI_SOURCES.values()],
+        dtype=np.float64,
+    )
+    # (K, Z) pay matrisi: her KPI satırı kendi grubunun ağırlığını kullanır
+    share_matrix = np.vstack([shares[plan[ZONE_KPI_SOURCES[k][0]]] for k in keys])
+    kpi = totals[:, None] * share_matrix
+
+    frame = pd.DataFrame({
+        "zone_id": [z.get("id") for z in zones],
+        "name": [z.get("name", "Zon") for z in zones],
+        "area_m2": weights["area"],
+    })
+    for group in ("carbon", "hvac", "water"):
+        frame[f"share_{group}"] = shares[plan[group]]
+    for i, k in enumerate(keys):
+        frame[k] = kpi[i]
+    frame["total_saved_kwh"] = frame["hvac_saved_kwh"] + frame["pump_saved_kwh"]
+    frame["total_saved_eur"] = frame["hvac_saved_eur"] + frame["water_saved_eur"]
+    frame["risk_flag"] = np.select(
+        [frame["risk_eur"].to_numpy() > RISK_LEVELS[0], frame["risk_eur"].to_numpy() > RISK_LEVELS[1]],
+        ["YÜKSEK", "ORTA"],
+        default="DÜŞÜK",
+    )
+    return frame
@@ -0,0 +1,108 @@
+import folium
+from folium.plugins import FastMarkerCluster, HeatMap
+
+DEFAULT_ZONE_STYLE = {"color": "#2E7D32", "fillColor": "#66BB6A", "fillOpacity": 0.25}
+
+# Kümeleme istemci tarafında: satır başına [lat, lon, ad]; marker başına JS üretilmez
+SENSOR_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6, color: "#1565C0", fill: true, fillColor: "#1E88E5", fillOpacity: 0.9
+    });
+    marker.bindTooltip(row[2]);
+    return marker;
+}
+"""
+
+
+def zones_geojson(zones):
+    """Zonları tek FeatureCollection'a çevirir ([lat, lon] -> GeoJSON [lon, lat], halka kapatılır)."""
+    features = []
+    for z in zones:
+        poly = z.get("polygon") or []
+        if not poly:
+            continue
+        ring = [[float(p[1]), float(p[0])] for p in poly]
+        if ring[0] != ring[-1]:
+            ring.append(ring[0])
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {
+                "id": z.get("id"),
+                "name": z.get("name", "Zon"),
+                "style": {**DEFAULT_ZONE_STYLE, **(z.get("style") or {})},
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def sensor_rows(sensors):
+    """Konumlu sensörler için kompakt [lat, lon, ad] satırları."""
+    return [
+        [float(s["lat"]), float(s["lon"]), str(s.get("name", "Sensör"))]
+        for s in sensors
+        if "lat" in s and "lon" in s
+    ]
+
+
+def heat_rows(sensors):
+    """Isı haritası için [lat, lon, temp_c] satırları."""
+    rows = []
+    for s in sensors:
+        temp = (s.get("last") or {}).get("temp_c")
+        if temp is not None and "lat" in s and "lon" in s:
+            rows.append([float(s["lat"]), float(s["lon"]), float(temp)])
+    return rows
+
+
+def build_site_map(center, zones_fc=None, sensors=None, heat=None, field=None, zoom_start=17):
+    """
+    Katmanları tek seferde kurar: sıcaklık alanı ImageOverlay, zonlar tek GeoJson,
+    sensörler FastMarkerCluster, sıcaklık HeatMap. None verilen katman eklenmez.
+    `field` = {"uri": PNG data URI, "bounds": [[lat0, lon0], [lat1, lon1]]}.
+    """
+    m = folium.Map(location=list(center), zoom_start=zoom_start, control_scale=True)
+
+    if field is not None:
+        folium.raster_layers.ImageOverlay(
+            image=field["uri"],
+            bounds=field["bounds"],
+            name="Sıcaklık Alanı (IDW)",
+            opacity=0.8,
+            interactive=False,
+            zindex=1,
+        ).add_to(m)
+
+    if zones_fc is not None and zones_fc["features"]:
+        def zone_style(feature):
+            st = feature["properties"]["style"]
+            return {
+                "color": st["color"],
+                "fillColor": st["fillColor"],
+                "fillOpacity": st["fillOpacity"],
+                "weight": 3,
+            }
+
+        folium.GeoJson(
+            zones_fc,
+            name="Zonlar",
+            style_function=zone_style,
+            tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+        ).add_to(m)
+
+    if sensors:
+        FastMarkerCluster(
+            sensors,
+            callback=SENSOR_MARKER_CALLBACK,
+            name="Sensörler",
+            options={"disableClusteringAtZoom": 19, "chunkedLoading": True},
+        ).add_to(m)
+
+    if heat:
+        hm_fg = folium.FeatureGroup(name="Isı Haritası (Temp)", show=True)
+        HeatMap(heat, radius=28, blur=20, min_opacity=0.25).add_to(hm_fg)
+        hm_fg.add_to(m)
+
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
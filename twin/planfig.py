@@ -0,0 +1,77 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+def clamp_xy(xy, width, height):
+    """(N, 2) piksel koordinatlarını [0, width] x [0, height] aralığına kırpar. Döner: (kırpılmış, taşma maskesi)"""
+    out = np.clip(xy, 0.0, np.array([width, height], dtype=np.float64))
+    return out, (out != xy).any(axis=1)
+
+
+def plan_figure(uri, width, height, scale, zones, show_zones=True):
+    """
+    Plan modunun statik iskeleti: arka plan + zon poligonları + eksen/layout.
+    Zon koordinatları tek dizide kırpılır.
+    Döner: (figür, kırpılan zon sayısı)
+    """
+    fig = go.Figure()
+    # Arka plan trace olarak (layout_image değil); dx/dy ile tam çözünürlük piksel koordinatı
+    fig.add_trace(go.Image(source=uri, dx=scale, dy=scale))
+
+    clipped_polys = 0
+    polys = [z for z in zones if z.get("polygon_px")] if show_zones else []
+    if polys:
+        pts = np.concatenate([np.asarray(z["polygon_px"], dtype=np.float64)[:, :2] for z in polys])
+        bounds = np.cumsum([0] + [len(z["polygon_px"]) for z in polys])
+        clipped, mask = clamp_xy(pts, width - 1, height - 1)
+        clipped_polys = int(np.count_nonzero(np.logical_or.reduceat(mask, bounds[:-1])))
+
+        for z, a, b in zip(polys, bounds[:-1], bounds[1:]):
+            ring = np.vstack([clipped[a:b], clipped[a:a + 1]])  # kapat
+            fig.add_trace(
+                go.Scatter(
+                    x=ring[:, 0],
+                    y=ring[:, 1],
+                    mode="lines",
+                    name=z.get("name", "Zon"),
+                    line=dict(width=3),
+                )
+            )
+
+    # go.Image (0,0) sol üst çalışır; y ekseni ters ki piksel mantığı tam otursun
+    fig.update_xaxes(visible=False, range=[0, width - 1], fixedrange=True)
+    fig.update_yaxes(visible=False, range=[height - 1, 0], fixedrange=True, scaleanchor="x")
+    fig.update_layout(
+        height=650,
+        margin=dict(l=0, r=0, t=0, b=0),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+    )
+    return fig, clipped_polys
+
+
+def add_sensor_layer(fig, sensors, width, height):
+    """
+    Plan koordinatlı (x, y) sensörleri tek Scatter trace olarak ekler.
+    Döner: kırpılan sensör sayısı.
+    """
+    placed = [s for s in sensors if "x" in s and "y" in s]
+    if not placed:
+        return 0
+    xy = np.array([(float(s["x"]), float(s["y"])) for s in placed], dtype=np.float64)
+    xy, mask = clamp_xy(xy, width - 1, height - 1)
+    temps = [(s.get("last") or {}).get("temp_c") for s in placed]
+
+    fig.add_trace(
+        go.Scatter(
+            x=xy[:, 0],
+            y=xy[:, 1],
+            mode="markers+text",
+            text=[s.get("name", "Sensör") for s in placed],
+            customdata=[("-" if t is None else f"{float(t):.1f} °C") for t in temps],
+            hovertemplate="%{text}<br>%{customdata}<extra></extra>",
+            textposition="top center",
+            marker=dict(size=12),
+            name="Sensörler",
+        )
+    )
+    return int(np.count_nonzero(mask))
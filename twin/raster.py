@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import json
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from twin.spatial import ZoneIndex, latlon_projector
+
+IDW_KERNELS = ("idw", "gaussian")
+
+
+def readings_key(sensors, field="temp_c"):
+    """Okuma partisinin özeti: konum + değer + zaman damgası değişmedikçe aynı kalır."""
+    rows = [
+        (s.get("id"), s.get("lat"), s.get("lon"), (s.get("last") or {}).get(field), (s.get("last") or {}).get("ts"))
+        for s in sensors
+    ]
+    return hashlib.sha1(json.dumps(rows, default=str).encode("utf-8")).hexdigest()
+
+
+def idw_interpolate(points, values, targets, kernel="idw", power=2.0, bandwidth=None, radius=None,
+                    chunk_size=4096):
+    """
+    Ters mesafe ağırlıklı enterpolasyon (vektörel, hedefler parça parça).
+
+    - kernel="idw": w = 1 / d^power
+    - kernel="gaussian": w = exp(-0.5 * (d / bandwidth)^2)
+    - `radius` verilirse daha uzak sensörlerin ağırlığı 0; hiç sensör kalmayan hedef NaN.
+    - Sensörle çakışan hedef doğrudan sensör değerini alır.
+    Döner: (T,) float64.
+    """
+    if kernel not in IDW_KERNELS:
+        raise ValueError(f"kernel {IDW_KERNELS} içinden olmalı.")
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    values = np.asarray(values, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+    out = np.full(len(targets), np.nan)
+    if len(points) == 0:
+        return out
+    if kernel == "gaussian" and not bandwidth:
+        span = np.ptp(points, axis=0).max() if len(points) > 1 else 1.0
+        bandwidth = max(span / 4.0, 1e-9)
+
+    for start in range(0, len(targets), chunk_size):
+        t = targets[start:start + chunk_size]
+        d = np.hypot(t[:, 0:1] - points[:, 0], t[:, 1:2] - points[:, 1])  # (T, S)
+        if kernel == "idw":
+            with np.errstate(divide="ignore"):
+                w = 1.0 / np.power(d, power)
+        else:
+            w = np.exp(-0.5 * (d / bandwidth) ** 2)
+        if radius is not None:
+            w = np.where(d <= radius, w, 0.0)
+        exact = d == 0.0
+        hit = exact.any(axis=1)
+        w[hit] = exact[hit].astype(np.float64)
+        wsum = w.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[start:start + chunk_size] = np.where(wsum > 0, (w @ values) / wsum, np.nan)
+    return out
+
+
+def zone_temperature_raster(zones, sensors, cell_m=2.0, max_cells=256, field="temp_c", index=None, **idw_kwargs):
+    """
+    Zon poligonlarına kırpılmış sıcaklık ızgarası ve zon bazlı istatistikler.
+
+    Izgara zonların ortak sınır kutusunu yerel metre düzleminde `cell_m` adımla
+    (eksen başına en çok `max_cells` hücre) kaplar. Hücre merkezleri ZoneIndex ile
+    zonlara atanır; zon dışı hücreler NaN. Hazır bir lat/lon `index` (ör. SiteData.zone_index())
+    verilirse yeniden kurulmaz.
+    Döner: {"grid": (ny, nx), "zone": (ny, nx) zon indeksi, "bounds": [[lat0, lon0], [lat1, lon1]],
+            "stats": [{"zone_id", "name", "cells", "min", "mean", "max"}], ...}
+    """
+    zones = [z for z in zones if z.get("polygon")]
+    index = index or ZoneIndex.from_zones(zones, field="polygon")
+    lat0 = np.radians(np.mean([np.mean([p[0] for p in z["polygon"]]) for z in zones]))
+    project = latlon_projector(lat0)
+
+    all_pts = np.concatenate([np.asarray(z["polygon"], dtype=np.float64) for z in zones])
+    lat_min, lon_min = all_pts.min(axis=0)
+    lat_max, lon_max = all_pts.max(axis=0)
+    (x0, y0), (x1, y1) = project([[lat_min, lon_min], [lat_max, lon_max]])
+    step = max(cell_m, (x1 - x0) / max_cells, (y1 - y0) / max_cells)
+    nx = max(1, int(np.ceil((x1 - x0) / step)))
+    ny = max(1, int(np.ceil((y1 - y0) / step)))
+
+    # Hücre merkezleri (lat/lon), satır 0 = güney
+    lats = lat_min + (np.arange(ny) + 0.5) * (lat_max - lat_min) / ny
+    lons = lon_min + (np.arange(nx) + 0.5) * (lon_max - lon_min) / nx
+    glat, glon = np.meshgrid(lats, lons, indexing="ij")
+    centers = np.column_stack([glat.ravel(), glon.ravel()])
+
+    zone_of = index.locate(centers)
+    inside = zone_of >= 0
+
+    readings = [
+        (float(s["lat"]), float(s["lon"]), float((s.get("last") or {})[field]))
+        for s in sensors
+        if "lat" in s and "lon" in s and (s.get("last") or {}).get(field) is not None
+    ]
+    grid = np.full(len(centers), np.nan)
+    if readings:
+        r = np.array(readings)
+        grid[inside] = idw_interpolate(project(r[:, :2]), r[:, 2], project(centers[inside]), **idw_kwargs)
+
+    # Zon istatistikleri: bincount + sıralı min/max (döngü yok)
+    stats = []
+    valid = inside & np.isfinite(grid)
+    zi, gv = zone_of[valid], grid[valid]
+    n_z = len(zones)
+    cells = np.bincount(zi, minlength=n_z)
+    sums = np.bincount(zi, weights=gv, minlength=n_z)
+    zmin = np.full(n_z, np.nan)
+    zmax = np.full(n_z, np.nan)
+    if len(zi):
+        order = np.lexsort((gv, zi))
+        zs, vs = zi[order], gv[order]
+        first = np.flatnonzero(np.r_[True, zs[1:] != zs[:-1]])
+        last = np.r_[first[1:] - 1, len(zs) - 1]
+        zmin[zs[first]] = vs[first]
+        zmax[zs[first]] = vs[last]
+    for j, z in enumerate(zones):
+        stats.append({
+            "zone_id": z.get("id"),
+            "name": z.get("name", "Zon"),
+            "cells": int(cells[j]),
+            "min": float(zmin[j]) if cells[j] else None,
+            "mean": float(sums[j] / cells[j]) if cells[j] else None,
+            "max": float(zmax[j]) if cells[j] else None,
+        })
+
+    return {
+        "grid": grid.reshape(ny, nx),
+        "zone": zone_of.reshape(ny, nx),
+        "bounds": [[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]],
+        "cell_m": float(step),
+        "stats": stats,
+    }
+
+
+def raster_to_png_uri(grid, vmin=None, vmax=None, alpha=170):
+    """
+    Izgarayı mavi->kırmızı renk skalasında PNG data URI'ye çevirir (NaN saydam).
+    Satır 0 güney olduğundan görüntü dikeyde çevrilir (üst = kuzey).
+    """
+    g = np.asarray(grid, dtype=np.float64)[::-1]
+    finite = np.isfinite(g)
+    lo = np.nanmin(g) if vmin is None and finite.any() else (vmin or 0.0)
+    hi = np.nanmax(g) if vmax is None and finite.any() else (vmax or 1.0)
+    t = np.clip((np.where(finite, g, lo) - lo) / max(hi - lo, 1e-9), 0.0, 1.0)
+    rgba = np.empty(g.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = (255 * t).astype(np.uint8)
+    rgba[..., 1] = (255 * (1.0 - np.abs(2.0 * t - 1.0)) * 0.8).astype(np.uint8)
+    rgba[..., 2] = (255 * (1.0 - t)).astype(np.uint8)
+    rgba[..., 3] = np.where(finite, alpha, 0).astype(np.uint8)
+
+    buf = BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("utf-8")
@@ -0,0 +1,226 @@
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from twin.spatial import ZoneIndex, latlon_projector
+
+SENSOR_READING_FIELDS = ("temp_c", "rh_pct", "soil_moist_pct", "flow_lpm")
+
+
+class SiteDataError(ValueError):
+    """zones.json / sensors.json şema hatası; `errors` tüm bulunan hataları taşır."""
+
+    def __init__(self, path, errors):
+        self.path = path
+        self.errors = list(errors)
+        super().__init__(f"{path}: " + "; ".join(self.errors[:5]) + (" ..." if len(self.errors) > 5 else ""))
+
+
+def file_signature(path):
+    """(mtime_ns, boyut): dosya değişince imza değişir."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _points(value, where, errors, lat_lon=False):
+    """[[a, b], ...] listesini (N, 2) float64 diziye çevirir; geçersizse None."""
+    try:
+        arr = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        errors.append(f"{where}: sayısal [a, b] çiftleri bekleniyor")
+        return None
+    if arr.ndim != 2 or arr.shape[1] < 2 or len(arr) < 3:
+        errors.append(f"{where}: en az 3 köşe ([a, b]) gerekli")
+        return None
+    arr = np.ascontiguousarray(arr[:, :2])
+    if not np.isfinite(arr).all():
+        errors.append(f"{where}: sonlu olmayan koordinat")
+        return None
+    if lat_lon and ((np.abs(arr[:, 0]) > 90).any() or (np.abs(arr[:, 1]) > 180).any()):
+        errors.append(f"{where}: lat/lon aralık dışında")
+        return None
+    return arr
+
+
+def parse_zones(raw, path="zones.json"):
+    """
+    zones.json içeriğini doğrular. Döner: (zon sözlükleri, lat/lon dizileri, piksel dizileri).
+    Zon sözlükleri orijinal alanları korur; area_m2 float, polygon/polygon_px float listesi olur.
+    """
+    items = raw.get("zones") if isinstance(raw, dict) else None
+    if not isinstance(items, list) or not items:
+        raise SiteDataError(path, ["'zones' listesi boş ya da yok"])
+
+    errors, seen = [], set()
+    zones, polys, polys_px = [], [], []
+    for i, z in enumerate(items):
+        where = f"zones[{i}]"
+        if not isinstance(z, dict):
+            errors.append(f"{where}: nesne bekleniyor")
+            continue
+        zid = z.get("id")
+        if not isinstance(zid, str) or not zid:
+            errors.append(f"{where}: 'id' gerekli")
+        elif zid in seen:
+            errors.append(f"{where}: tekrarlanan id '{zid}'")
+        seen.add(zid)
+        try:
+            area = float(z.get("area_m2", 0) or 0)
+        except (TypeError, ValueError):
+            errors.append(f"{where}.area_m2: sayı bekleniyor")
+            area = 0.0
+        if area < 0:
+            errors.append(f"{where}.area_m2: negatif olamaz")
+        poly = _points(z.get("polygon"), f"{where}.polygon", errors, lat_lon=True)
+        poly_px = _points(z["polygon_px"], f"{where}.polygon_px", errors) if z.get("polygon_px") else None
+        if z.get("style") is not None and not isinstance(z["style"], dict):
+            errors.append(f"{where}.style: nesne bekleniyor")
+
+        zone = dict(z, name=str(z.get("name", "Zon")), area_m2=area)
+        if poly is not None:
+            zone["polygon"] = poly.tolist()
+        if poly_px is not None:
+            zone["polygon_px"] = poly_px.tolist()
+        zones.append(zone)
+        polys.append(poly)
+        polys_px.append(poly_px)
+
+    if errors:
+        raise SiteDataError(path, errors)
+    return zones, polys, polys_px
+
+
+def parse_sensors(raw, path="sensors.json"):
+    """
+    sensors.json içeriğini doğrular. Koordinatlar ve okumalar float'a çevrilir.
+    Döner: (sensör sözlükleri, uyarılar).
+    """
+    items = raw.get("sensors", []) if isinstance(raw, dict) else None
+    if not isinstance(items, list):
+        raise SiteDataError(path, ["'sensors' listesi bekleniyor"])
+
+    errors, warnings, seen = [], [], set()
+    sensors = []
+    for i, s in enumerate(items):
+        where = f"sensors[{i}]"
+        if not isinstance(s, dict):
+            errors.append(f"{where}: nesne bekleniyor")
+            continue
+        sid = s.get("id")
+        if not isinstance(sid, str) or not sid:
+            errors.append(f"{where}: 'id' gerekli")
+        elif sid in seen:
+            errors.append(f"{where}: tekrarlanan id '{sid}'")
+        seen.add(sid)
+
+        sensor = dict(s, name=str(s.get("name", "Sensör")))
+        for a, b in (("lat", "lon"), ("x", "y")):
+            if (a in s) != (b in s):
+                warnings.append(f"{sid}: '{a}'/'{b}' birlikte verilmeli; konum yok sayıldı")
+                sensor.pop(a, None)
+                sensor.pop(b, None)
+            elif a in s:
+                try:
+                    sensor[a], sensor[b] = float(s[a]), float(s[b])
+                except (TypeError, ValueError):
+                    errors.append(f"{where}.{a}/{b}: sayı bekleniyor")
+                    sensor.pop(a, None)
+                    sensor.pop(b, None)
+                    continue
+                if not (math.isfinite(sensor[a]) and math.isfinite(sensor[b])):
+                    errors.append(f"{where}.{a}/{b}: sonlu olmayan koordinat")
+                    sensor.pop(a, None)
+                    sensor.pop(b, None)
+                    continue
+                if a == "lat" and (abs(sensor["lat"]) > 90 or abs(sensor["lon"]) > 180):
+                    errors.append(f"{where}: lat/lon aralık dışında")
+
+        last = s.get("last")
+        if last is not None:
+            if not isinstance(last, dict):
+                errors.append(f"{where}.last: nesne bekleniyor")
+            else:
+                last = dict(last)
+                for f in SENSOR_READING_FIELDS:
+                    if last.get(f) is None:
+                        continue
+                    try:
+                        last[f] = float(last[f])
+                    except (TypeError, ValueError):
+                        warnings.append(f"{sid}: last.{f} sayı değil; yok sayıldı")
+                        last.pop(f)
+                        continue
+                    if not math.isfinite(last[f]):
+                        warnings.append(f"{sid}: last.{f} sonlu değil; yok sayıldı")
+                        last.pop(f)
+                sensor["last"] = last
+        sensors.append(sensor)
+
+    if errors:
+        raise SiteDataError(path, errors)
+    return sensors, warnings
+
+
+class SiteData:
+    """
+    Doğrulanmış saha verisi. Poligonlar bir kez NumPy dizisine çevrilir;
+    zon indeksi ilk ihtiyaçta kurulur ve nesneyle birlikte önbellekte kalır.
+    """
+
+    def __init__(self, zones, zone_polygons, zone_polygons_px, sensors, warnings=(), key=()):
+        self.zones = zones
+        self.zone_polygons = zone_polygons
+        self.zone_polygons_px = zone_polygons_px
+        self.sensors = sensors
+        self.warnings = list(warnings)
+        self.key = key
+        self.zone_ids = [z["id"] for z in zones]
+        self.placed_sensors = [s for s in sensors if "lat" in s and "lon" in s]
+        self.sensor_latlon = np.array(
+            [(s["lat"], s["lon"]) for s in self.placed_sensors], dtype=np.float64
+        ).reshape(-1, 2)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def zone_index(self):
+        """lat/lon zon indeksi (metre projeksiyonu); bir kez kurulur."""
+        with self._lock:
+            if self._index is None:
+                lat0 = np.radians(np.mean([p[:, 0].mean() for p in self.zone_polygons]))
+                self._index = ZoneIndex(self.zone_polygons, ids=self.zone_ids, project=latlon_projector(lat0))
+            return self._index
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_site_cache = {}
+_site_cache_lock = threading.Lock()
+
+
+def load_site_data(zones_path, sensors_path):
+    """
+    zones.json + sensors.json'u okur, doğrular ve SiteData döner.
+    Süreç genelinde önbelleklidir (oturumlar arasında paylaşılır); iki dosyanın
+    (mtime_ns, boyut) imzası değişmedikçe yeniden okunmaz.
+    Hatalar: FileNotFoundError, json.JSONDecodeError, SiteDataError.
+    """
+    zones_path, sensors_path = os.fspath(zones_path), os.fspath(sensors_path)
+    key = (file_signature(zones_path), file_signature(sensors_path))
+    cache_key = (os.path.abspath(zones_path), os.path.abspath(sensors_path))
+    with _site_cache_lock:
+        hit = _site_cache.get(cache_key)
+        if hit is not None and hit.key == key:
+            return hit
+
+    zones, polys, polys_px = parse_zones(_read_json(zones_path), zones_path)
+    sensors, warnings = parse_sensors(_read_json(sensors_path), sensors_path)
+    site = SiteData(zones, polys, polys_px, sensors, warnings, key=key)
+    with _site_cache_lock:
+        _site_cache[cache_key] = site
+    return site
@@ -0,0 +1,212 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+class ZoneIndex:
+    """
+    Zon poligonları üzerinde düzgün ızgara (uniform grid) indeksi.
+
+    - Her hücre, sınır kutusu (bbox) hücreyle kesişen zonların listesini tutar (CSR).
+    - `locate` noktaları hücreye düşürür, yalnızca aday (nokta, zon) çiftleri için
+      vektörel ışın atma (ray casting) yapar; doğrusal tarama yoktur.
+    - Koordinatlar düzlemseldir; lat/lon için `from_zones` yerel metrik
+      projeksiyon (eşdikdörtgen) kurar, mesafeler metre cinsinden döner.
+    """
+
+    def __init__(self, polygons, ids=None, project=None, cells_per_axis=None):
+        self._project = project or (lambda pts: np.asarray(pts, dtype=np.float64).reshape(-1, 2))
+        self.polygons = [self._project(p) for p in polygons]
+        self.ids = list(ids) if ids is not None else list(range(len(self.polygons)))
+        n = len(self.polygons)
+        if n == 0:
+            raise ValueError("En az bir poligon gerekli.")
+
+        self.bboxes = np.array(
+            [(p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max()) for p in self.polygons],
+            dtype=np.float64,
+        )
+        # Kenarlar: zon başına (E, 4) dizisi [x0, y0, x1, y1]
+        self.edges = [np.hstack([p, np.roll(p, -1, axis=0)]) for p in self.polygons]
+
+        self.origin = self.bboxes[:, :2].min(axis=0)
+        extent = np.maximum(self.bboxes[:, 2:].max(axis=0) - self.origin, 1e-12)
+        k = int(cells_per_axis or max(1, int(np.ceil(np.sqrt(n)))))
+        self.shape = (k, k)
+        self.cell = extent / k
+
+        # Zon bbox'larını hücre aralıklarına çevir ve CSR listesine aç
+        lo = self._cell_of(self.bboxes[:, :2])
+        hi = self._cell_of(self.bboxes[:, 2:])
+        cells, owners = [], []
+        for z in range(n):
+            cx, cy = np.meshgrid(np.arange(lo[z, 0], hi[z, 0] + 1), np.arange(lo[z, 1], hi[z, 1] + 1))
+            flat = (cx * k + cy).ravel()
+            cells.append(flat)
+            owners.append(np.full(flat.shape, z))
+        cells = np.concatenate(cells)
+        owners = np.concatenate(owners)
+        order = np.lexsort((owners, cells))
+        self._cell_zones = owners[order]
+        self._cell_ptr = np.searchsorted(cells[order], np.arange(k * k + 1))
+
+    @classmethod
+    def from_zones(cls, zones, field="polygon", **kwargs):
+        """
+        zones.json kayıtlarından indeks. `field="polygon"` ([lat, lon], metre
+        projeksiyonu) ya da `field="polygon_px"` ([x, y] plan pikseli).
+        """
+        zones = [z for z in zones if z.get(field)]
+        project = None
+        if field == "polygon":
+            lat0 = np.radians(np.mean([np.mean([p[0] for p in z[field]]) for z in zones]))
+            project = latlon_projector(lat0)
+        return cls([z[field] for z in zones], ids=[z.get("id") for z in zones], project=project, **kwargs)
+
+    def _cell_of(self, xy):
+        c = np.floor((xy - self.origin) / self.cell).astype(np.int64)
+        return np.clip(c, 0, np.array(self.shape) - 1)
+
+    def _inside(self, xy, z):
+        """Noktaların `z` zonu içinde olup olmadığı (çift-tek kuralı), (N,) bool."""
+        e = self.edges[z]
+        x, y = xy[:, 0:1], xy[:, 1:2]
+        x0, y0, x1, y1 = e[:, 0], e[:, 1], e[:, 2], e[:, 3]
+        crosses = (y0 > y) != (y1 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        return np.count_nonzero(crosses & (x < x_at), axis=1) % 2 == 1
+
+    def locate(self, points, chunk_size=200_000):
+        """
+        Her nokta için içinde bulunduğu zonun indeksi (-1: hiçbiri).
+        Çakışan zonlarda en küçük indeks kazanır. Döner: (N,) int64.
+        """
+        pts = self._project(points)
+        result = np.full(len(pts), -1, dtype=np.int64)
+        for start in range(0, len(pts), chunk_size):
+            xy = pts[start:start + chunk_size]
+            in_grid = np.all((xy >= self.origin) & (xy <= self.origin + self.cell * self.shape), axis=1)
+            idx = np.flatnonzero(in_grid)
+            c = self._cell_of(xy[idx])
+            flat = c[:, 0] * self.shape[0] + c[:, 1]
+            counts = self._cell_ptr[flat + 1] - self._cell_ptr[flat]
+            # (nokta, aday zon) çiftleri
+            pair_pt = np.repeat(idx, counts)
+            offs = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_zone = self._cell_zones[np.repeat(self._cell_ptr[flat], counts) + offs]
+            # bbox ön-elemesi
+            b = self.bboxes[pair_zone]
+            p = xy[pair_pt]
+            keep = (p[:, 0] >= b[:, 0]) & (p[:, 0] <= b[:, 2]) & (p[:, 1] >= b[:, 1]) & (p[:, 1] <= b[:, 3])
+            pair_pt, pair_zone = pair_pt[keep], pair_zone[keep]
+
+            out = result[start:start + chunk_size]
+            for z in np.unique(pair_zone)[::-1]:
+                sel = pair_pt[pair_zone == z]
+                hit = sel[self._inside(xy[sel], z)]
+                out[hit] = z
+        return result
+
+    def nearest(self, points, chunk_size=16_384):
+        """
+        En yakın zon ve sınıra uzaklık (içerideki noktalar için 0).
+        Dışarıdaki noktalarda bbox uzaklığı alt sınır olarak kullanılır; bir zonun
+        kenarları yalnızca alt sınırı mevcut en iyi uzaklıktan küçük noktalar için hesaplanır.
+        Döner: (zon indeksleri (N,), uzaklıklar (N,)).
+        """
+        pts = self._project(points)
+        zone = self.locate(points)
+        dist = np.zeros(len(pts), dtype=np.float64)
+        outside = np.flatnonzero(zone < 0)
+        b = self.bboxes
+        for start in range(0, len(outside), chunk_size):
+            sel = outside[start:start + chunk_size]
+            xy = pts[sel]
+            # (Z, n) bbox uzaklığı karesi: zon başına satır bitişik
+            gx = np.maximum(np.maximum(b[:, 0:1] - xy[:, 0], xy[:, 0] - b[:, 2:3]), 0.0)
+            gy = np.maximum(np.maximum(b[:, 1:2] - xy[:, 1], xy[:, 1] - b[:, 3:4]), 0.0)
+            lower2 = gx * gx + gy * gy
+
+            # Başlangıç: her nokta için bbox'ı en yakın zonun gerçek uzaklığı (sıkı üst sınır)
+            first = lower2.argmin(axis=0)
+            best = np.empty(len(sel))
+            order = np.argsort(first, kind="stable")
+            splits = np.flatnonzero(np.diff(first[order])) + 1
+            for m in np.split(order, splits):
+                best[m] = _point_segment_distance(xy[m], self.edges[first[m[0]]]).min(axis=1)
+            best_z = first.copy()
+
+            for z in range(len(self.edges)):
+                cand = np.flatnonzero(lower2[z] < best * best)
+                if not len(cand):
+                    continue
+                d = _point_segment_distance(xy[cand], self.edges[z]).min(axis=1)
+                better = d < best[cand]
+                best[cand[better]] = d[better]
+                best_z[cand[better]] = z
+            zone[sel] = best_z
+            dist[sel] = best
+        return zone, dist
+
+    def query_bbox(self, bbox):
+        """(xmin, ymin, xmax, ymax) kutusuyla bbox'ı kesişen zon indeksleri."""
+        lo = self._project([bbox[:2]])[0]
+        hi = self._project([bbox[2:]])[0]
+        lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+        b = self.bboxes
+        hit = (b[:, 0] <= hi[0]) & (b[:, 2] >= lo[0]) & (b[:, 1] <= hi[1]) & (b[:, 3] >= lo[1])
+        return np.flatnonzero(hit)
+
+    def zone_ids(self, indices):
+        return [self.ids[i] if i >= 0 else None for i in np.asarray(indices).tolist()]
+
+
+def latlon_projector(lat0_rad):
+    """[lat, lon] derece -> yerel düzlem metre [x, y] (eşdikdörtgen, küçük alanlar için)."""
+    kx = EARTH_RADIUS_M * np.cos(lat0_rad)
+
+    def project(pts):
+        a = np.radians(np.asarray(pts, dtype=np.float64).reshape(-1, 2))
+        return np.column_stack([a[:, 1] * kx, a[:, 0] * EARTH_RADIUS_M])
+
+    return project
+
+
+def _point_segment_distance(xy, e):
+    """(N,2) noktalar ile (E,4) kenarlar arası uzaklık matrisi (N, E)."""
+    ax, ay, bx, by = e[:, 0], e[:, 1], e[:, 2], e[:, 3]
+    dx, dy = bx - ax, by - ay
+    px = xy[:, 0:1] - ax
+    py = xy[:, 1:2] - ay
+    seg2 = dx * dx + dy * dy
+    t = np.clip((px * dx + py * dy) / np.where(seg2 > 0, seg2, 1.0), 0.0, 1.0)
+    return np.hypot(px - t * dx, py - t * dy)
+
+
+def validate_sensor_zones(index, sensors, lat_key="lat", lon_key="lon"):
+    """
+    Sensörlerin elle yazılmış `zone_id` etiketini konumdan hesaplanan zonla karşılaştırır.
+    `index` lat/lon (`field="polygon"`) ile kurulmuş olmalı.
+    Döner: uyuşmayan ya da hiçbir zonda olmayan sensörler için
+    {"sensor_id", "zone_id", "computed_zone_id", "nearest_zone_id", "distance_m"} listesi.
+    """
+    placed = [s for s in sensors if lat_key in s and lon_key in s]
+    if not placed:
+        return []
+    pts = np.array([(float(s[lat_key]), float(s[lon_key])) for s in placed], dtype=np.float64)
+    zone, dist = index.nearest(pts)
+    inside = dist == 0.0
+    computed = index.zone_ids(zone)
+    issues = []
+    for s, z, d, ok in zip(placed, computed, dist.tolist(), inside.tolist()):
+        label = s.get("zone_id")
+        if not ok or label != z:
+            issues.append({
+                "sensor_id": s.get("id"),
+                "zone_id": label,
+                "computed_zone_id": z if ok else None,
+                "nearest_zone_id": z,
+                "distance_m": d,
+            })
+    return issues
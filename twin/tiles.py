@@ -0,0 +1,154 @@
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+TILE_SIZE = 512
+TILE_FORMAT = "PNG"
+MANIFEST_FILE = "pyramid.json"
+PYRAMID_DIR = os.path.join(tempfile.gettempdir(), "biolot_plan_tiles")
+
+
+def source_signature(img_path):
+    """Kaynak görselin (yol, mtime_ns, boyut) imzası; değişince piramit yeniden kurulur."""
+    st = os.stat(img_path)
+    return {"path": os.path.abspath(img_path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def pyramid_path(img_path, root=PYRAMID_DIR):
+    sig = source_signature(img_path)
+    digest = hashlib.sha1(f"{sig['path']}|{sig['mtime_ns']}|{sig['size']}".encode("utf-8")).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(img_path))[0]
+    return os.path.join(root, f"{stem}-{digest}")
+
+
+def _write_level(img, level_dir, tile_size):
+    os.makedirs(level_dir, exist_ok=True)
+    w, h = img.size
+    rows = -(-h // tile_size)
+    cols = -(-w // tile_size)
+    for r in range(rows):
+        for c in range(cols):
+            box = (c * tile_size, r * tile_size, min(w, (c + 1) * tile_size), min(h, (r + 1) * tile_size))
+            img.crop(box).save(os.path.join(level_dir, f"{r}_{c}.png"), format=TILE_FORMAT)
+    return rows, cols
+
+
+def build_pyramid(img_path, out_dir, tile_size=TILE_SIZE):
+    """
+    Görselden çok çözünürlüklü karo piramidi kurar. Seviye 0 tam çözünürlük,
+    her seviye bir öncekinin yarısıdır; en üst seviye tek karoya sığar.
+    Kurulum geçici klasörde yapılır ve tek adımda yerine taşınır.
+    Döner: manifest sözlüğü.
+    """
+    sig = source_signature(img_path)
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".build-", dir=parent)
+    try:
+        with Image.open(img_path) as src:
+            img = src.convert("RGBA")
+        manifest = {"source": sig, "tile_size": tile_size, "width": img.size[0], "height": img.size[1], "levels": []}
+        level = 0
+        while True:
+            rows, cols = _write_level(img, os.path.join(tmp, f"L{level}"), tile_size)
+            manifest["levels"].append({
+                "level": level,
+                "scale": 2 ** level,
+                "width": img.size[0],
+                "height": img.size[1],
+                "rows": rows,
+                "cols": cols,
+            })
+            if max(img.size) <= tile_size:
+                break
+            img = img.reduce(2)
+            level += 1
+        with open(os.path.join(tmp, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        try:
+            os.replace(tmp, out_dir)
+        except OSError:
+            # Başka bir süreç aynı piramidi önce kurduysa onunkini kullan
+            if not os.path.exists(os.path.join(out_dir, MANIFEST_FILE)):
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+        return manifest
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def ensure_pyramid(img_path, root=PYRAMID_DIR, tile_size=TILE_SIZE):
+    """Güncel piramidi döner; yoksa ya da kaynak değiştiyse kurar. Döner: (klasör, manifest)."""
+    out_dir = pyramid_path(img_path, root)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("tile_size") == tile_size:
+            return out_dir, manifest
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return out_dir, build_pyramid(img_path, out_dir, tile_size)
+
+
+def pick_level(manifest, max_side):
+    """En uzun kenarı `max_side` değerini aşmayan en detaylı seviye (yoksa en küçük seviye)."""
+    for lv in manifest["levels"]:
+        if max(lv["width"], lv["height"]) <= max_side:
+            return lv
+    return manifest["levels"][-1]
+
+
+def load_level(out_dir, manifest, level, bbox=None):
+    """
+    Seviyeyi karolardan birleştirir. `bbox` = (x0, y0, x1, y1) tam çözünürlük
+    pikselinde verilirse yalnızca kesişen karolar okunur.
+    Döner: (PIL görsel, (ox, oy)) — ox/oy görselin tam çözünürlükteki sol-üst köşesi.
+    """
+    lv = manifest["levels"][level]
+    ts = manifest["tile_size"]
+    scale = lv["scale"]
+    if bbox is None:
+        r0, c0, r1, c1 = 0, 0, lv["rows"] - 1, lv["cols"] - 1
+    else:
+        x0, y0, x1, y1 = (int(v // scale) for v in bbox)
+        c0, r0 = max(0, x0 // ts), max(0, y0 // ts)
+        c1, r1 = min(lv["cols"] - 1, x1 // ts), min(lv["rows"] - 1, y1 // ts)
+    w = min(lv["width"], (c1 + 1) * ts) - c0 * ts
+    h = min(lv["height"], (r1 + 1) * ts) - r0 * ts
+    out = Image.new("RGBA", (max(1, w), max(1, h)))
+    for r in range(r0, r1 + 1):
+        for c in range(c0, c1 + 1):
+            with Image.open(os.path.join(out_dir, f"L{level}", f"{r}_{c}.png")) as tile:
+                out.paste(tile, ((c - c0) * ts, (r - r0) * ts))
+    return out, (c0 * ts * scale, r0 * ts * scale)
+
+
+def level_data_uri(img_path, max_side):
+    """
+    Görselin `max_side` sınırına sığan piramit seviyesini PNG data URI olarak döner.
+    Döner: (uri, tam genişlik, tam yükseklik, seviye ölçeği)
+    """
+    out_dir, manifest = ensure_pyramid(img_path)
+    lv = pick_level(manifest, max_side)
+    img, _ = load_level(out_dir, manifest, lv["level"])
+
+    buf = BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+    return "data:image/png;base64," + b64, manifest["width"], manifest["height"], lv["scale"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Ön-işleme: python -m twin.tiles assets/site_plan.jpg
+    for p in sys.argv[1:]:
+        d, m = ensure_pyramid(p)
+        print(d, [f"L{lv['level']} {lv['width']}x{lv['height']}" for lv in m["levels"]])
@@ -0,0 +1,420 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+SENSOR_FIELDS = ("temp_c", "rh_pct", "soil_moist_pct", "flow_lpm")
+ROLLUP_LEVELS = {"1m": 60_000, "15m": 900_000, "1h": 3_600_000}  # kova genişliği (ms)
+ROLLUP_STATS = ("mean", "min", "max")
+STATE_FILE = "state.json"
+
+
+def to_epoch_ms(ts):
+    """
+    datetime / ISO metin / sayı -> epoch milisaniye (int).
+    Sayılar (int ya da float) depolamayla aynı birimde, epoch ms kabul edilir;
+    epoch saniye için datetime.fromtimestamp(..., timezone.utc) verin.
+    """
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    if isinstance(ts, (float, np.floating)):
+        return int(round(float(ts)))
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(round(ts.timestamp() * 1000))
+
+
+def _safe_name(sensor_id):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(sensor_id))
+
+
+class _Column:
+    """Sabit tipli, yalnızca sona eklenen ikili kolon dosyası; okumalar memmap ile."""
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+
+    def append(self, values):
+        with open(self.path, "ab") as f:
+            f.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.path) // self.dtype.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def read(self, start=0, stop=None):
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        mm = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(n,))
+        return np.array(mm[start:stop])
+
+
+class _Series:
+    """Tek sensör için ham zaman serisi: ts (int64 ms) + alan başına float32 kolonlar."""
+
+    def __init__(self, root, fields):
+        os.makedirs(root, exist_ok=True)
+        self.ts = _Column(os.path.join(root, "ts.i8"), np.int64)
+        self.cols = {f: _Column(os.path.join(root, f"{f}.f4"), np.float32) for f in fields}
+
+    def __len__(self):
+        # Yarım kalmış yazımda en kısa kolon geçerli uzunluktur
+        return min([len(self.ts)] + [len(c) for c in self.cols.values()])
+
+    def append(self, ts, values):
+        self.ts.append(ts)
+        for f, col in self.cols.items():
+            col.append(values[f])
+
+    def range(self, start_ms, end_ms):
+        n = len(self)
+        if n == 0:
+            return 0, 0
+        ts = np.memmap(self.ts.path, dtype=np.int64, mode="r", shape=(n,))
+        return int(np.searchsorted(ts, start_ms, "left")), int(np.searchsorted(ts, end_ms, "left"))
+
+
+class _Ring:
+    """Son `size` örnek için bellek içi halka tampon."""
+
+    def __init__(self, size, n_fields):
+        self.ts = np.zeros(size, dtype=np.int64)
+        self.values = np.full((size, n_fields), np.nan, dtype=np.float32)
+        self.head = 0
+        self.count = 0
+
+    def extend(self, ts, values):
+        size = len(self.ts)
+        if len(ts) >= size:
+            ts, values = ts[-size:], values[-size:]
+        pos = (self.head + np.arange(len(ts))) % size
+        self.ts[pos] = ts
+        self.values[pos] = values
+        self.head = (self.head + len(ts)) % size
+        self.count = min(size, self.count + len(ts))
+
+    def ordered(self):
+        size = len(self.ts)
+        idx = (self.head - self.count + np.arange(self.count)) % size
+        return self.ts[idx], self.values[idx]
+
+
+class SensorTimeSeriesStore:
+    """
+    Gömülü sensör zaman serisi deposu.
+
+    - Son örnekler sensör başına halka tamponda (`ring_size`) tutulur.
+    - Ham geçmiş `raw/<sensör>/` altında sona eklenen kolon dosyalarına yazılır
+      (`flush_rows` örnekte bir ya da flush() ile); okumalar memmap + searchsorted.
+    - 1m / 15m / 1h özetleri (n, mean, min, max) ingest sırasında güncellenir;
+      açık kova bellekte, kapanan kovalar `rollup/<seviye>/<sensör>/` dosyalarına eklenir.
+    - Sensör başına zaman damgaları artan olmalı; eski/eşit damgalı örnekler atlanır.
+    - Tek yazıcı süreç varsayılır; süreç içinde thread-safe'tir.
+    """
+
+    def __init__(self, root, fields=SENSOR_FIELDS, ring_size=4096, flush_rows=1024):
+        if flush_rows > ring_size:
+            raise ValueError("flush_rows, ring_size değerinden büyük olamaz.")
+        self.root = root
+        self.fields = tuple(fields)
+        self.ring_size = int(ring_size)
+        self.flush_rows = int(flush_rows)
+        self.rejected = 0
+        self._lock = threading.RLock()
+        self._series = {}
+        self._rollups = {}
+        self._rings = {}
+        self._pending = {}
+        self._pending_rows = {}
+        self._last_ts = {}
+        self._open = {}
+        os.makedirs(root, exist_ok=True)
+        self._load_state()
+
+    # --- iç yapı ---
+
+    def _raw(self, sid):
+        s = self._series.get(sid)
+        if s is None:
+            s = self._series[sid] = _Series(os.path.join(self.root, "raw", _safe_name(sid)), self.fields)
+        return s
+
+    def _rollup(self, sid, level):
+        key = (sid, level)
+        r = self._rollups.get(key)
+        if r is None:
+            names = ["n"] + [f"{f}.{stat}" for f in self.fields for stat in ROLLUP_STATS]
+            r = self._rollups[key] = _Series(os.path.join(self.root, "rollup", level, _safe_name(sid)), names)
+        return r
+
+    def _ring(self, sid):
+        ring = self._rings.get(sid)
+        if ring is None:
+            ring = self._rings[sid] = _Ring(self.ring_size, len(self.fields))
+            raw = self._raw(sid)
+            n = len(raw)
+            if n:
+                start = max(0, n - self.ring_size)
+                ts = raw.ts.read(start, n)
+                vals = np.column_stack([raw.cols[f].read(start, n) for f in self.fields])
+                ring.extend(ts, vals)
+                self._last_ts.setdefault(sid, int(ts[-1]))
+        return ring
+
+    def _load_state(self):
+        path = os.path.join(self.root, STATE_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self._last_ts.update({sid: int(v) for sid, v in state.get("last_ts", {}).items()})
+        for sid, levels in state.get("open", {}).items():
+            for level, b in levels.items():
+                self._open[(sid, level)] = {
+                    "bucket": int(b["bucket"]),
+                    "n": int(b["n"]),
+                    "sum": np.array(b["sum"], dtype=np.float64),
+                    "cnt": np.array(b["cnt"], dtype=np.int64),
+                    "min": np.array([np.inf if v is None else v for v in b["min"]], dtype=np.float64),
+                    "max": np.array([-np.inf if v is None else v for v in b["max"]], dtype=np.float64),
+                }
+
+    def _save_state(self):
+        state = {"last_ts": self._last_ts, "open": {}}
+        for (sid, level), b in self._open.items():
+            state["open"].setdefault(sid, {})[level] = {
+                "bucket": b["bucket"],
+                "n": b["n"],
+                "sum": b["sum"].tolist(),
+                "cnt": b["cnt"].tolist(),
+                "min": [v if np.isfinite(v) else None for v in b["min"].tolist()],
+                "max": [v if np.isfinite(v) else None for v in b["max"].tolist()],
+            }
+        path = os.path.join(self.root, STATE_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def _update_rollups(self, sid, ts, values):
+        """Artan sıralı örnekleri her seviyede kovalara indirger; kapanan kovaları diske ekler."""
+        finite = np.isfinite(values)
+        v0 = np.where(finite, values, 0.0).astype(np.float64)
+        vmin = np.where(finite, values, np.inf).astype(np.float64)
+        vmax = np.where(finite, values, -np.inf).astype(np.float64)
+        for level, width in ROLLUP_LEVELS.items():
+            buckets = ts // width
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            b_ids = buckets[starts]
+            agg = {
+                "n": np.diff(np.r_[starts, len(ts)]),
+                "sum": np.add.reduceat(v0, starts, axis=0),
+                "cnt": np.add.reduceat(finite.astype(np.int64), starts, axis=0),
+                "min": np.minimum.reduceat(vmin, starts, axis=0),
+                "max": np.maximum.reduceat(vmax, starts, axis=0),
+            }
+            key = (sid, level)
+            prev = self._open.get(key)
+            if prev is not None and prev["bucket"] == b_ids[0]:
+                agg["n"][0] += prev["n"]
+                agg["sum"][0] += prev["sum"]
+                agg["cnt"][0] += prev["cnt"]
+                agg["min"][0] = np.minimum(agg["min"][0], prev["min"])
+                agg["max"][0] = np.maximum(agg["max"][0], prev["max"])
+            elif prev is not None:
+                self._write_buckets(sid, level, *self._bucket_rows(
+                    np.array([prev["bucket"]]), np.array([prev["n"]]), prev["sum"][None], prev["cnt"][None],
+                    prev["min"][None], prev["max"][None], width,
+                ))
+            last = len(b_ids) - 1
+            if last > 0:
+                self._write_buckets(sid, level, *self._bucket_rows(
+                    b_ids[:last], agg["n"][:last], agg["sum"][:last], agg["cnt"][:last],
+                    agg["min"][:last], agg["max"][:last], width,
+                ))
+            self._open[key] = {
+                "bucket": int(b_ids[last]),
+                "n": int(agg["n"][last]),
+                "sum": agg["sum"][last].copy(),
+                "cnt": agg["cnt"][last].copy(),
+                "min": agg["min"][last].copy(),
+                "max": agg["max"][last].copy(),
+            }
+
+    def _bucket_rows(self, b_ids, n, sums, cnt, vmin, vmax, width):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(cnt > 0, sums / np.maximum(cnt, 1), np.nan)
+        vmin = np.where(cnt > 0, vmin, np.nan)
+        vmax = np.where(cnt > 0, vmax, np.nan)
+        return b_ids * width, n, mean, vmin, vmax
+
+    def _write_buckets(self, sid, level, ts, n, mean, vmin, vmax):
+        values = {"n": n.astype(np.float32)}
+        for j, f in enumerate(self.fields):
+            values[f"{f}.mean"] = mean[:, j]
+            values[f"{f}.min"] = vmin[:, j]
+            values[f"{f}.max"] = vmax[:, j]
+        self._rollup(sid, level).append(ts, values)
+
+    # --- yazma ---
+
+    def append_batch(self, sensor_id, ts, values):
+        """
+        Tek sensöre toplu örnek ekler. `ts`: epoch ms dizisi (artan),
+        `values`: alan -> dizi (eksik alanlar NaN). Döner: kabul edilen örnek sayısı.
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        if ts.size == 0:
+            return 0
+        vals = np.full((len(ts), len(self.fields)), np.nan, dtype=np.float32)
+        for j, f in enumerate(self.fields):
+            if f in values and values[f] is not None:
+                vals[:, j] = np.asarray(values[f], dtype=np.float32)
+        with self._lock:
+            ring = self._ring(sensor_id)
+            last = self._last_ts.get(sensor_id)
+            # Artan sıra: önceki son damgadan ve kendinden öncekinden büyük olmalı
+            keep = np.r_[True, ts[1:] > np.maximum.accumulate(ts)[:-1]]
+            if last is not None:
+                keep &= ts > last
+            self.rejected += int(len(ts) - keep.sum())
+            ts, vals = ts[keep], vals[keep]
+            if ts.size == 0:
+                return 0
+            ring.extend(ts, vals)
+            self._pending.setdefault(sensor_id, []).append((ts, vals))
+            self._pending_rows[sensor_id] = self._pending_rows.get(sensor_id, 0) + len(ts)
+            self._last_ts[sensor_id] = int(ts[-1])
+            self._update_rollups(sensor_id, ts, vals)
+            if self._pending_rows[sensor_id] >= self.flush_rows:
+                self._flush_sensor(sensor_id)
+            return int(ts.size)
+
+    def append(self, sensor_id, ts, **values):
+        """Tek örnek ekler; `ts` datetime / ISO metin / epoch ms olabilir."""
+        return self.append_batch(sensor_id, [to_epoch_ms(ts)], {k: [v] for k, v in values.items()})
+
+    def ingest_snapshot(self, sensors):
+        """sensors.json biçimindeki `last` okumalarını (yeniyse) ekler. Döner: eklenen örnek sayısı."""
+        added = 0
+        for s in sensors:
+            last = s.get("last") or {}
+            if "ts" not in last or "id" not in s:
+                continue
+            added += self.append(s["id"], last["ts"], **{f: last[f] for f in self.fields if f in last})
+        return added
+
+    def _flush_sensor(self, sid):
+        chunks = self._pending.pop(sid, [])
+        self._pending_rows.pop(sid, None)
+        if not chunks:
+            return
+        ts = np.concatenate([t for t, _ in chunks])
+        vals = np.concatenate([v for _, v in chunks])
+        self._raw(sid).append(ts, {f: vals[:, j] for j, f in enumerate(self.fields)})
+
+    def flush(self):
+        """Bekleyen ham örnekleri diske yazar ve açık kova durumunu kaydeder."""
+        with self._lock:
+            for sid in list(self._pending):
+                self._flush_sensor(sid)
+            self._save_state()
+
+    close = flush
+
+    # --- okuma ---
+
+    def sensors(self):
+        with self._lock:
+            ids = set(self._last_ts)
+        return sorted(ids)
+
+    def latest(self, sensor_id):
+        """Son örnek: {"ts": epoch ms, alan: değer} ya da None."""
+        with self._lock:
+            ring = self._ring(sensor_id)
+            if ring.count == 0:
+                return None
+            ts, vals = ring.ordered()
+            return {"ts": int(ts[-1]), **{f: float(v) for f, v in zip(self.fields, vals[-1].tolist())}}
+
+    def recent(self, sensor_id, n=None, fields=None):
+        """Halka tampondan son `n` örnek (disk erişimi yok)."""
+        fields = tuple(fields or self.fields)
+        with self._lock:
+            ts, vals = self._ring(sensor_id).ordered()
+        if n is not None:
+            ts, vals = ts[-n:], vals[-n:]
+        return {"ts": ts, **{f: vals[:, self.fields.index(f)] for f in fields}}
+
+    def read_range(self, sensor_id, start, end, fields=None, resolution="raw"):
+        """
+        [start, end) aralığını okur (sınırlar datetime / ISO metin / epoch ms).
+        `resolution`: "raw" ya da ROLLUP_LEVELS anahtarı.
+        Yalnızca aralıktaki dilim memmap'ten kopyalanır; yazılmamış ham örnekler
+        halka tampondan, açık kova bellekten eklenir.
+        Döner: {"ts": int64 ms, alan: float32 ...}; özetlerde "n" ve "<alan>.mean/min/max".
+        """
+        start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+        fields = tuple(fields or self.fields)
+        with self._lock:
+            if resolution == "raw":
+                raw = self._raw(sensor_id)
+                names = list(fields)
+                i0, i1 = raw.range(start_ms, end_ms)
+                out = {"ts": raw.ts.read(i0, i1), **{f: raw.cols[f].read(i0, i1) for f in fields}}
+                pending = self._pending.get(sensor_id)
+                if pending:
+                    ts = np.concatenate([t for t, _ in pending])
+                    vals = np.concatenate([v for _, v in pending])
+                    m = (ts >= start_ms) & (ts < end_ms)
+                    out["ts"] = np.concatenate([out["ts"], ts[m]])
+                    for f in names:
+                        out[f] = np.concatenate([out[f], vals[m, self.fields.index(f)]])
+                return out
+
+            if resolution not in ROLLUP_LEVELS:
+                raise KeyError(f"Bilinmeyen çözünürlük: {resolution}")
+            width = ROLLUP_LEVELS[resolution]
+            start_ms -= start_ms % width  # başlangıcı içeren kova da dahil
+            roll = self._rollup(sensor_id, resolution)
+            names = ["n"] + [f"{f}.{stat}" for f in fields for stat in ROLLUP_STATS]
+            i0, i1 = roll.range(start_ms, end_ms)
+            out = {"ts": roll.ts.read(i0, i1), **{c: roll.cols[c].read(i0, i1) for c in names}}
+            b = self._open.get((sensor_id, resolution))
+            if b is not None and start_ms <= b["bucket"] * width < end_ms:
+                bts, n, mean, vmin, vmax = self._bucket_rows(
+                    np.array([b["bucket"]]), np.array([b["n"]]), b["sum"][None], b["cnt"][None],
+                    b["min"][None], b["max"][None], width,
+                )
+                row = {"ts": bts, "n": n.astype(np.float32)}
+                for j, f in enumerate(self.fields):
+                    if f in fields:
+                        row[f"{f}.mean"], row[f"{f}.min"], row[f"{f}.max"] = mean[:, j], vmin[:, j], vmax[:, j]
+                for c, v in row.items():
+                    out[c] = np.concatenate([out[c], v.astype(out[c].dtype)])
+            return out
+
+    def read_auto(self, sensor_id, start, end, max_points=2000, fields=None):
+        """Aralığı `max_points` noktayı aşmayan en ince çözünürlükte okur. Döner: (çözünürlük, veri)."""
+        start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+        with self._lock:
+            i0, i1 = self._raw(sensor_id).range(start_ms, end_ms)
+            n_raw = (i1 - i0) + self._pending_rows.get(sensor_id, 0)
+        if n_raw <= max_points:
+            return "raw", self.read_range(sensor_id, start, end, fields, "raw")
+        span = end_ms - start_ms
+        for level, width in ROLLUP_LEVELS.items():
+            if span / width <= max_points:
+                break
+        return level, self.read_range(sensor_id, start, end, fields, level)